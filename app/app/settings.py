@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/3.0/ref/settings/
 """
 
+import datetime
 import os
 
 # Build paths inside the project like this: os.path.join(BASE_DIR, ...)
@@ -49,10 +50,13 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.QueryInspectionMiddleware',
+    'core.middleware.ThrottleHeadersMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.middleware.ProfilingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -83,12 +87,28 @@ WSGI_APPLICATION = 'app.wsgi.application'
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        # Transactions start with BEGIN IMMEDIATE, see core.backends.sqlite3
+        'ENGINE': 'core.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        'OPTIONS': {'timeout': 20},
     }
 }
 
 
+# Cache
+# File based so that every worker process on the machine shares it; the
+# order app keeps its pick lists here for PICK_LIST_CACHE_TIMEOUT seconds.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(BASE_DIR, 'cache'),
+    }
+}
+
+PICK_LIST_CACHE_TIMEOUT = 60 * 60
+
+
 # Password validation
 # https://docs.djangoproject.com/en/3.0/ref/settings/#auth-password-validators
 
@@ -128,4 +148,73 @@ USE_TZ = True
 STATIC_URL = '/static/'
 
 
-AUTH_USER_MODEL = 'core.User'
\ No newline at end of file
+AUTH_USER_MODEL = 'core.User'
+
+
+# Django REST framework
+# https://www.django-rest-framework.org/api-guide/throttling/
+
+REST_FRAMEWORK = {
+    'DEFAULT_THROTTLE_CLASSES': [
+        'core.throttling.ReadTokenBucketThrottle',
+        'core.throttling.WriteTokenBucketThrottle',
+    ],
+    'DEFAULT_THROTTLE_RATES': {
+        'read': '600/min',
+        'write': '120/min',
+    },
+    # Anonymous clients are throttled by REMOTE_ADDR. Behind a reverse proxy
+    # set this to the number of proxies so X-Forwarded-For is read instead.
+    'NUM_PROXIES': int(os.environ.get('NUM_PROXIES', 0)),
+}
+
+# Token buckets are kept in this SQLite file so every worker process on the
+# machine shares the same counters. Tests and the load test use a temporary
+# file instead.
+THROTTLE_DATABASE = os.path.join(BASE_DIR, 'throttle.sqlite3')
+
+
+# Delta sync
+# Deletions are remembered for SYNC_TOMBSTONE_RETENTION; older watermarks get a
+# full snapshot. Watermarks trail the server clock by SYNC_WATERMARK_LAG so
+# rows committed late are sent again rather than missed.
+
+SYNC_TOMBSTONE_RETENTION = datetime.timedelta(days=30)
+
+SYNC_WATERMARK_LAG = datetime.timedelta(seconds=5)
+
+
+# Request profiling
+# Staff can profile a request with an `X-Profile: 1` header or `?profile=1`;
+# a share of all requests can be sampled with PROFILING_SAMPLE_RATE (0-1).
+
+PROFILING_DIR = os.path.join(BASE_DIR, 'profiles')
+
+PROFILING_MAX_FILES = 200
+
+PROFILING_SAMPLE_RATE = 0.0
+
+
+# Live order board
+# Order and item changes are pushed to /api/order/events/ (Server-Sent Events,
+# served by the ASGI application). The last ORDER_EVENTS_HISTORY events can be
+# resumed with Last-Event-ID; a subscriber more than ORDER_EVENTS_BUFFER events
+# behind is disconnected and resumes on reconnect.
+
+ORDER_EVENTS_HISTORY = 1000
+
+ORDER_EVENTS_BUFFER = 100
+
+ORDER_EVENTS_HEARTBEAT = 15
+
+
+# Query inspection
+# In development every request is checked for repeated (N+1) queries, which
+# are logged. Views may declare a `query_budget`; app/test_settings.py turns
+# the inspection on and enforces the budgets while running the test suite.
+
+QUERY_INSPECTION = DEBUG
+
+QUERY_BUDGETS_ENFORCED = False
+
+QUERY_REPEAT_THRESHOLD = 3
@@ -0,0 +1,30 @@
+"""
+Settings for the test suite: `manage.py test` picks them up by default.
+Files the app writes at runtime go to a temporary directory that is
+removed when the run ends.
+"""
+import tempfile
+
+from .settings import *  # noqa: F401,F403
+
+TEST_FILES = tempfile.TemporaryDirectory(prefix='bogazici-test-')
+
+# A file database lets the threaded tests' connections wait for each
+# other's write locks instead of failing on shared-cache table locks.
+DATABASES['default']['TEST'] = {
+    'NAME': os.path.join(TEST_FILES.name, 'test.sqlite3'),
+}
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+THROTTLE_DATABASE = os.path.join(TEST_FILES.name, 'throttle.sqlite3')
+
+PROFILING_DIR = os.path.join(TEST_FILES.name, 'profiles')
+
+QUERY_INSPECTION = True
+
+QUERY_BUDGETS_ENFORCED = True
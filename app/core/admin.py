@@ -1,5 +1,7 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from django.urls import reverse
+from django.utils.html import format_html
 from core.models import User, Address, Customer, Product, Category, OrderItem, Order, City, District, Neighborhood
 
 class UserAdmin(BaseUserAdmin):
@@ -24,14 +26,159 @@ class UserAdmin(BaseUserAdmin):
             },
         ),
     )
-    
+
+
+class CityAdmin(admin.ModelAdmin):
+    search_fields = ['name']
+
+
+class DistrictAdmin(admin.ModelAdmin):
+    list_display = ['name', 'nick', 'city']
+    list_select_related = ['city']
+    search_fields = ['name', 'nick']
+    autocomplete_fields = ['city']
+
+
+class NeighborhoodAdmin(admin.ModelAdmin):
+    list_display = ['name', 'district']
+    list_select_related = ['district']
+    search_fields = ['name']
+    autocomplete_fields = ['district']
+
+
+class AddressAdmin(admin.ModelAdmin):
+    list_display = ['__str__', 'city']
+    list_select_related = ['city', 'district', 'neighborhood']
+    search_fields = ['extra_info', 'district__name', 'neighborhood__name']
+    autocomplete_fields = ['city', 'district', 'neighborhood']
+
+
+class CustomerAdmin(admin.ModelAdmin):
+    list_display = ['nick', 'user', 'phone1', 'phone2', 'address']
+    list_select_related = [
+        'user', 'address__district', 'address__neighborhood'
+    ]
+    search_fields = [
+        'nick', 'phone1', 'phone2', 'user__email',
+        'user__first_name', 'user__last_name'
+    ]
+    autocomplete_fields = ['user', 'address']
+
+
+class CategoryAdmin(admin.ModelAdmin):
+    search_fields = ['name']
+
+
+class ProductAdmin(admin.ModelAdmin):
+    list_display = ['__str__', 'distribution_unit', 'price', 'purchase_price']
+    list_select_related = ['category']
+    search_fields = ['name', 'category__name']
+
+
+class OrderItemAdmin(admin.ModelAdmin):
+    list_display = ['__str__', 'is_deleted']
+    list_select_related = ['product']
+    search_fields = ['product__name']
+    autocomplete_fields = ['product']
+
+
+class OrderItemInline(admin.TabularInline):
+    model = Order.items.through
+    fields = ['item', 'product', 'quantity', 'price', 'is_deleted']
+    readonly_fields = fields
+    extra = 0
+    verbose_name = 'Sipariş Ürünü'
+    verbose_name_plural = 'Sipariş Ürünleri'
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related(
+            'orderitem__product'
+        )
+
+    @admin.display(description='Sipariş Ürünü')
+    def item(self, obj):
+        return format_html(
+            '<a href="{}">{}</a>',
+            reverse('admin:core_orderitem_change', args=[obj.orderitem_id]),
+            obj.orderitem_id
+        )
+
+    @admin.display(description='Ürün Adı')
+    def product(self, obj):
+        return obj.orderitem.product.name
+
+    @admin.display(description='Miktar')
+    def quantity(self, obj):
+        return (
+            f"{obj.orderitem.quantity} "
+            f"{obj.orderitem.product.get_distribution_unit_display()}"
+        )
+
+    @admin.display(description='Fiyat')
+    def price(self, obj):
+        return obj.orderitem.price
+
+    @admin.display(description='Silindi', boolean=True)
+    def is_deleted(self, obj):
+        return obj.orderitem.is_deleted
+
+
+class OrderItemAddInline(admin.TabularInline):
+    """Blank rows to attach existing order items to the order"""
+    model = Order.items.through
+    raw_id_fields = ['orderitem']
+    extra = 1
+    verbose_name = 'Yeni Sipariş Ürünü'
+    verbose_name_plural = 'Yeni Sipariş Ürünleri'
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).none()
+
+
+class OrderAdmin(admin.ModelAdmin):
+    list_display = [
+        '__str__', 'nick', 'delivery_date', 'total_price',
+        'is_delivered', 'is_paid'
+    ]
+    list_filter = ['delivery_date', 'is_delivered', 'is_paid']
+    list_select_related = ['customer__user']
+    search_fields = [
+        'nick', 'instagram_username', 'customer__nick',
+        'customer__phone1', 'customer__user__email'
+    ]
+    autocomplete_fields = ['customer']
+    exclude = ['items']
+    inlines = [OrderItemInline, OrderItemAddInline]
+
+    def save_formset(self, request, form, formset, change):
+        """
+        Attach and detach items through the order's M2M manager, so totals,
+        stock, the order list and live events follow the change
+        """
+        if formset.model is not Order.items.through:
+            return super().save_formset(request, form, formset, change)
+        added = formset.save(commit=False)
+        order = form.instance
+        removed = [link.orderitem_id for link in formset.deleted_objects]
+        if removed:
+            order.items.remove(*removed)
+        if added:
+            order.items.add(*[link.orderitem_id for link in added])
+
+
 admin.site.register(User, UserAdmin)
-admin.site.register(Address)
-admin.site.register(Customer)
-admin.site.register(Product)
-admin.site.register(Category)
-admin.site.register(OrderItem)
-admin.site.register(Order)
-admin.site.register(City)
-admin.site.register(District)
-admin.site.register(Neighborhood)
+admin.site.register(Address, AddressAdmin)
+admin.site.register(Customer, CustomerAdmin)
+admin.site.register(Product, ProductAdmin)
+admin.site.register(Category, CategoryAdmin)
+admin.site.register(OrderItem, OrderItemAdmin)
+admin.site.register(Order, OrderAdmin)
+admin.site.register(City, CityAdmin)
+admin.site.register(District, DistrictAdmin)
+admin.site.register(Neighborhood, NeighborhoodAdmin)
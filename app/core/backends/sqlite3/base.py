@@ -0,0 +1,15 @@
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    SQLite backend whose transactions start with BEGIN IMMEDIATE.
+
+    A deferred transaction that reads before it writes fails at once with
+    "database is locked" when another connection is writing, instead of
+    waiting for the busy timeout. Taking the write lock when the
+    transaction starts makes concurrent writers queue up.
+    """
+
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute('BEGIN IMMEDIATE')
@@ -0,0 +1,132 @@
+import asyncio
+import json
+import threading
+import time
+from collections import deque
+
+
+class Event:
+    __slots__ = ('id', 'type', 'data')
+
+    def __init__(self, id, type, data):
+        self.id = id
+        self.type = type
+        self.data = data
+
+    def encode(self):
+        """Format the event for a text/event-stream response"""
+        return (
+            f"id: {self.id}\n"
+            f"event: {self.type}\n"
+            f"data: {json.dumps(self.data, default=str)}\n\n"
+        )
+
+
+class Subscription:
+    """
+    Bounded queue of events for one subscriber, fed from any thread.
+
+    A subscriber that falls more than `buffer_size` events behind is
+    closed; the client reconnects with Last-Event-ID and is replayed from
+    the broadcaster's history instead of holding memory on the server.
+    """
+
+    def __init__(self, broadcaster, loop, buffer_size, predicate=None):
+        self.broadcaster = broadcaster
+        self.loop = loop
+        self.buffer_size = buffer_size
+        self.queue = asyncio.Queue(buffer_size + 1)
+        self.predicate = predicate
+        self.closed = False
+
+    def push(self, event):
+        if self.predicate is not None and not self.predicate(event):
+            return
+        try:
+            self.loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:
+            self.broadcaster.unsubscribe(self)
+
+    def _put(self, event):
+        if self.closed:
+            return
+        if self.queue.qsize() < self.buffer_size:
+            self.queue.put_nowait(event)
+        else:
+            self.closed = True
+            self.queue.put_nowait(None)
+            self.broadcaster.unsubscribe(self)
+
+    async def get(self, timeout):
+        """Return the next event, None when closed, or raise TimeoutError"""
+        return await asyncio.wait_for(self.queue.get(), timeout)
+
+
+class Broadcaster:
+    """
+    In-process fan-out of events to async subscribers.
+
+    Event ids are '<epoch>-<sequence>'. The last `history_size` events are
+    kept so a reconnecting client can resume from its Last-Event-ID; a
+    client whose id is unknown (too old, or from before a restart) gets a
+    'reset' event telling it to reload its data.
+    """
+
+    def __init__(self, history_size=1000, buffer_size=100):
+        self.lock = threading.Lock()
+        self.history = deque(maxlen=history_size)
+        self.buffer_size = buffer_size
+        self.subscribers = set()
+        self.epoch = str(int(time.time()))
+        self.sequence = 0
+
+    def publish(self, type, data):
+        with self.lock:
+            self.sequence += 1
+            event = Event(f'{self.epoch}-{self.sequence}', type, data)
+            self.history.append(event)
+            subscribers = list(self.subscribers)
+        for subscription in subscribers:
+            subscription.push(event)
+        return event
+
+    def subscribe(self, last_event_id=None, predicate=None):
+        """Subscribe from the running event loop, replaying missed events"""
+        subscription = Subscription(
+            self,
+            asyncio.get_running_loop(),
+            self.buffer_size,
+            predicate
+        )
+        with self.lock:
+            backlog = self._backlog(last_event_id)
+            self.subscribers.add(subscription)
+        for event in backlog:
+            if event.type == 'reset' or predicate is None or predicate(event):
+                subscription._put(event)
+        return subscription
+
+    def _backlog(self, last_event_id):
+        if not last_event_id:
+            return []
+        epoch, _, sequence = last_event_id.partition('-')
+        oldest = self.history[0] if self.history else None
+        if (
+            epoch != self.epoch
+            or not sequence.isdigit()
+            or int(sequence) > self.sequence
+            or (oldest is not None
+                and int(sequence) < int(oldest.id.partition('-')[2]) - 1)
+        ):
+            return [Event(f'{self.epoch}-{self.sequence}', 'reset', {})]
+        return [
+            event for event in self.history
+            if int(event.id.partition('-')[2]) > int(sequence)
+        ]
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            self.subscribers.discard(subscription)
+
+
+order_events = Broadcaster()
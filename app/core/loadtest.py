@@ -0,0 +1,363 @@
+import datetime
+import http.client
+import json
+import random
+import threading
+import time
+from collections import defaultdict
+
+from django.contrib.auth import get_user_model
+from django.core.servers.basehttp import ThreadedWSGIServer, WSGIRequestHandler
+from rest_framework.authtoken.models import Token
+
+from core.models import (Address, Category, City, Customer, District,
+                         Neighborhood, Order, Product)
+from core.text import normalize_name
+
+SCENARIOS = ('catalogue', 'address', 'order', 'bulk')
+DEFAULT_MIX = {'catalogue': 50, 'address': 25, 'order': 15, 'bulk': 10}
+PERCENTILES = (50, 90, 95, 99)
+
+
+def parse_mix(value):
+    """Parse 'catalogue=50,order=10' into a weight per scenario"""
+    mix = {}
+    for part in value.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise ValueError(f'Unknown scenario {name}')
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def seed(customers=200, products=50):
+    """Create the users, catalogue and customers the scenarios rely on"""
+    User = get_user_model()
+    staff = User.objects.create_superuser('loadtest-staff@example.com', 'pass')
+    users = User.objects.bulk_create([
+        User(email=f'loadtest-{index}@example.com')
+        for index in range(customers)
+    ])
+    tokens = Token.objects.bulk_create([
+        Token(key=Token.generate_key(), user=user) for user in [staff, *users]
+    ])
+
+    categories = Category.objects.bulk_create([
+        Category(name=f'Kategori {index}') for index in range(5)
+    ])
+    Product.objects.bulk_create([
+        Product(
+            category=categories[index % len(categories)],
+            name=f'Ürün {index}',
+            search_name=normalize_name(f'Ürün {index}'),
+            distribution_unit=index % 4 + 1,
+            price=10 + index,
+            purchase_price=5 + index
+        )
+        for index in range(products)
+    ])
+
+    city = City.objects.create(name='İstanbul')
+    districts = District.objects.bulk_create([
+        District(
+            city=city,
+            name=f'İlçe {index}',
+            search_name=normalize_name(f'İlçe {index}'),
+            nick=f'D{index:03d}'
+        )
+        for index in range(10)
+    ])
+    neighborhoods = Neighborhood.objects.bulk_create([
+        Neighborhood(
+            district=districts[index % 10],
+            name=f'Mahalle {index}',
+            search_name=normalize_name(f'Mahalle {index}')
+        )
+        for index in range(100)
+    ])
+    addresses = Address.objects.bulk_create([
+        Address(
+            city=city,
+            district=neighborhoods[index % 100].district,
+            neighborhood=neighborhoods[index % 100],
+            extra_info=f'Sokak {index}'
+        )
+        for index in range(customers)
+    ])
+    customers = Customer.objects.bulk_create([
+        Customer(
+            user=user,
+            nick=f'LT{index:07d}',
+            phone1=f'500{index:07d}',
+            address=address
+        )
+        for index, (user, address) in enumerate(zip(users, addresses))
+    ])
+    orders = Order.objects.bulk_create([
+        Order(
+            customer=customer,
+            nick=f'LT{index:012d}',
+            delivery_date=datetime.date.today()
+        )
+        for index, customer in enumerate(customers)
+    ])
+    return {
+        'staff_token': tokens[0].key,
+        'tokens': [token.key for token in tokens[1:]],
+        'product_ids': list(Product.objects.values_list('pk', flat=True)),
+        'address_ids': [address.pk for address in addresses],
+        'district_ids': [district.pk for district in districts],
+        'customer_ids': [customer.pk for customer in customers],
+        'order_ids': [order.pk for order in orders],
+    }
+
+
+class QuietWSGIRequestHandler(WSGIRequestHandler):
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_wsgi_server(host='127.0.0.1', port=0):
+    """Serve the project's WSGI application from a background thread"""
+    from django.core.wsgi import get_wsgi_application
+
+    server = ThreadedWSGIServer((host, port), QuietWSGIRequestHandler)
+    server.daemon_threads = True
+    server.set_app(get_wsgi_application())
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    def stop():
+        server.shutdown()
+        server.server_close()
+    return server.server_address[1], stop
+
+
+def start_asgi_server(host='127.0.0.1', port=8765):
+    """Serve the project's ASGI application with uvicorn in a thread"""
+    import uvicorn
+    from django.core.asgi import get_asgi_application
+
+    server = uvicorn.Server(uvicorn.Config(
+        get_asgi_application(),
+        host=host,
+        port=port,
+        log_level='warning',
+        lifespan='off'
+    ))
+    server.install_signal_handlers = lambda: None
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+
+    def stop():
+        server.should_exit = True
+        thread.join(timeout=5)
+    return port, stop
+
+
+class Session:
+    """A keep-alive HTTP connection of one simulated client"""
+
+    def __init__(self, host, port, token):
+        self.host = host
+        self.port = port
+        self.token = token
+        self.etags = {}
+        self.connection = None
+
+    def request(self, method, path, body=None, cache=False):
+        headers = {'Authorization': f'Token {self.token}'}
+        if body is not None:
+            body = json.dumps(body)
+            headers['Content-Type'] = 'application/json'
+        if cache and path in self.etags:
+            headers['If-None-Match'] = self.etags[path]
+        for attempt in range(2):
+            if self.connection is None:
+                self.connection = http.client.HTTPConnection(
+                    self.host, self.port, timeout=30
+                )
+            try:
+                self.connection.request(method, path, body, headers)
+                response = self.connection.getresponse()
+                data = response.read()
+                break
+            except (http.client.HTTPException, ConnectionError):
+                self.connection.close()
+                self.connection = None
+                if attempt:
+                    raise
+        if cache and response.getheader('ETag'):
+            self.etags[path] = response.getheader('ETag')
+        if response.status >= 400:
+            raise http.client.HTTPException(
+                f'{method} {path} -> {response.status}'
+            )
+        return json.loads(data) if data and response.status != 304 else None
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+
+
+class Client(threading.Thread):
+    """Simulated client picking weighted scenarios until the deadline"""
+
+    def __init__(self, index, host, port, data, mix, deadline, results):
+        super().__init__(daemon=True)
+        self.random = random.Random(index)
+        self.data = data
+        self.mix = mix
+        self.deadline = deadline
+        self.results = results
+        self.created_orders = []
+        self.session = Session(
+            host, port, data['tokens'][index % len(data['tokens'])]
+        )
+        self.staff_session = Session(host, port, data['staff_token'])
+
+    def run(self):
+        names = list(self.mix)
+        weights = [self.mix[name] for name in names]
+        try:
+            while time.monotonic() < self.deadline:
+                name = self.random.choices(names, weights)[0]
+                started = time.perf_counter()
+                try:
+                    getattr(self, f'scenario_{name}')()
+                    error = None
+                except Exception as exception:
+                    error = str(exception)[:200]
+                self.results.append(
+                    (name, time.perf_counter() - started, error)
+                )
+        finally:
+            self.session.close()
+            self.staff_session.close()
+
+    def scenario_catalogue(self):
+        self.session.request('GET', '/api/product/products/', cache=True)
+
+    def scenario_address(self):
+        address_id = self.random.choice(self.data['address_ids'])
+        district_id = self.random.choice(self.data['district_ids'])
+        self.session.request('GET', f'/api/user/addresses/{address_id}/')
+        self.session.request(
+            'GET',
+            f'/api/user/neighborhoods/?district={district_id}'
+        )
+
+    def scenario_order(self):
+        items = [
+            self.session.request('POST', '/api/order/order-items/', {
+                'product': self.random.choice(self.data['product_ids']),
+                'quantity': self.random.randint(1, 5),
+            })['id']
+            for _ in range(self.random.randint(1, 3))
+        ]
+        order = self.session.request('POST', '/api/order/orders/', {
+            'customer': self.random.choice(self.data['customer_ids']),
+            'delivery_date': (
+                datetime.date.today() + datetime.timedelta(days=1)
+            ).isoformat(),
+            'items': items,
+        })
+        self.created_orders.append(order['id'])
+
+    def scenario_bulk(self):
+        order_ids = self.created_orders[-5:] or self.random.sample(
+            self.data['order_ids'], 5
+        )
+        for order_id in order_ids:
+            self.staff_session.request(
+                'PATCH',
+                f'/api/order/orders/{order_id}/',
+                {'is_delivered': True}
+            )
+
+
+def percentile(sorted_values, percent):
+    if not sorted_values:
+        return None
+    index = max(int(round(percent / 100 * len(sorted_values))) - 1, 0)
+    return sorted_values[min(index, len(sorted_values) - 1)]
+
+
+def summarize(samples, elapsed):
+    latencies = sorted(latency * 1000 for latency, _ in samples)
+    errors = sum(1 for _, error in samples if error)
+    summary = {
+        'requests': len(samples),
+        'errors': errors,
+        'error_rate': errors / len(samples) if samples else 0.0,
+        'throughput_rps': len(samples) / elapsed if elapsed else 0.0,
+        'latency_ms': {
+            'mean': sum(latencies) / len(latencies) if latencies else None,
+            'max': latencies[-1] if latencies else None,
+            **{f'p{p}': percentile(latencies, p) for p in PERCENTILES},
+        },
+    }
+    return summary
+
+
+def run_load(host, port, data, clients, duration, mix):
+    """Drive the server with concurrent clients and return the report"""
+    results = []
+    deadline = time.monotonic() + duration
+    started = time.monotonic()
+    threads = [
+        Client(index, host, port, data, mix, deadline, results)
+        for index in range(clients)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+
+    by_scenario = defaultdict(list)
+    sample_errors = defaultdict(set)
+    for name, latency, error in results:
+        by_scenario[name].append((latency, error))
+        if error and len(sample_errors[name]) < 5:
+            sample_errors[name].add(error)
+    scenarios = {
+        name: {
+            **summarize(samples, elapsed),
+            'sample_errors': sorted(sample_errors[name]),
+        }
+        for name, samples in sorted(by_scenario.items())
+    }
+    return {
+        'elapsed_s': elapsed,
+        'total': summarize(
+            [(latency, error) for _, latency, error in results],
+            elapsed
+        ),
+        'scenarios': scenarios,
+    }
+
+
+def compare(report, baseline):
+    """Yield (scenario, metric, old, new, change) rows between two runs"""
+    pairs = [('total', report['total'], baseline.get('total', {}))]
+    pairs += [
+        (name, summary, baseline.get('scenarios', {}).get(name, {}))
+        for name, summary in report['scenarios'].items()
+    ]
+    for name, new, old in pairs:
+        for metric, new_value, old_value in [
+            ('throughput_rps', new.get('throughput_rps'),
+             old.get('throughput_rps')),
+            ('p95_ms', new.get('latency_ms', {}).get('p95'),
+             old.get('latency_ms', {}).get('p95')),
+            ('error_rate', new.get('error_rate'), old.get('error_rate')),
+        ]:
+            change = None
+            if new_value is not None and old_value:
+                change = (new_value - old_value) / old_value * 100
+            yield name, metric, old_value, new_value, change
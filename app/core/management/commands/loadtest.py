@@ -0,0 +1,152 @@
+import json
+import os
+import platform
+import shutil
+import tempfile
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test.utils import (override_settings, setup_databases,
+                               teardown_databases)
+from django.utils import timezone
+
+from core import loadtest
+
+
+class Command(BaseCommand):
+    help = (
+        'Start the app on a local WSGI or ASGI server backed by a throwaway '
+        'file database and drive it with concurrent simulated clients. '
+        'Throughput, latency percentiles and error rates are written to a '
+        'JSON report that can be compared with a previous run.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--server',
+            choices=['wsgi', 'asgi'],
+            default='wsgi',
+            help='asgi requires uvicorn to be installed'
+        )
+        parser.add_argument('--port', type=int, default=0)
+        parser.add_argument('--clients', type=int, default=20)
+        parser.add_argument('--duration', type=float, default=30.0)
+        parser.add_argument(
+            '--mix',
+            default=','.join(
+                f'{name}={weight}'
+                for name, weight in loadtest.DEFAULT_MIX.items()
+            ),
+            help='Scenario weights, scenarios: ' + ', '.join(loadtest.SCENARIOS)
+        )
+        parser.add_argument('--customers', type=int, default=200)
+        parser.add_argument('--output', default='loadtest-report.json')
+        parser.add_argument(
+            '--compare',
+            help='Previous report to compare this run with'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            mix = loadtest.parse_mix(options['mix'])
+        except ValueError as error:
+            raise CommandError(error)
+        baseline = None
+        if options['compare']:
+            with open(options['compare']) as stream:
+                baseline = json.load(stream)
+
+        directory = tempfile.mkdtemp(prefix='loadtest-')
+        for connection in connections.all():
+            if connection.vendor == 'sqlite':
+                connection.settings_dict['TEST']['NAME'] = os.path.join(
+                    directory, f'{connection.alias}.sqlite3'
+                )
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            with override_settings(THROTTLE_DATABASE=os.path.join(
+                directory, 'throttle.sqlite3'
+            )):
+                data = loadtest.seed(customers=options['customers'])
+                report = self.run_server(options, data, mix)
+        finally:
+            connections.close_all()
+            teardown_databases(old_config, verbosity=0)
+            shutil.rmtree(directory, ignore_errors=True)
+
+        report['meta'] = {
+            'started_at': timezone.now().isoformat(),
+            'server': options['server'],
+            'clients': options['clients'],
+            'duration_s': options['duration'],
+            'mix': mix,
+            'database': connections['default'].vendor,
+            'django': django.get_version(),
+            'python': platform.python_version(),
+        }
+        with open(options['output'], 'w') as stream:
+            json.dump(report, stream, indent=2)
+
+        self.print_report(report)
+        if baseline is not None:
+            self.print_comparison(report, baseline)
+        self.stdout.write(self.style.SUCCESS(
+            f"Report written to {options['output']}"
+        ))
+
+    def run_server(self, options, data, mix):
+        if options['server'] == 'asgi':
+            try:
+                port, stop = loadtest.start_asgi_server(
+                    port=options['port'] or 8765
+                )
+            except ImportError:
+                raise CommandError('--server asgi requires uvicorn')
+        else:
+            port, stop = loadtest.start_wsgi_server(port=options['port'])
+        try:
+            return loadtest.run_load(
+                '127.0.0.1',
+                port,
+                data,
+                options['clients'],
+                options['duration'],
+                mix
+            )
+        finally:
+            stop()
+
+    def print_report(self, report):
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f"{'scenario':<10} {'requests':>9} {'rps':>8} {'errors':>7} "
+            f"{'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}"
+        ))
+        for name, summary in [
+            *report['scenarios'].items(),
+            ('total', report['total']),
+        ]:
+            latency = summary['latency_ms']
+            self.stdout.write(
+                f"{name:<10} {summary['requests']:>9} "
+                f"{summary['throughput_rps']:>8.1f} "
+                f"{summary['error_rate']:>7.1%} "
+                + ' '.join(
+                    f"{latency[key] or 0:>8.1f}"
+                    for key in ('p50', 'p95', 'p99', 'max')
+                )
+            )
+            for error in summary.get('sample_errors', []):
+                self.stdout.write(self.style.WARNING(f'    {error}'))
+
+    def print_comparison(self, report, baseline):
+        self.stdout.write(self.style.MIGRATE_HEADING('Compared with baseline'))
+        for name, metric, old, new, change in loadtest.compare(
+            report,
+            baseline
+        ):
+            change = f'{change:+.1f}%' if change is not None else '-'
+            self.stdout.write(
+                f'{name:<10} {metric:<15} {old if old is not None else "-":>10} '
+                f'-> {new if new is not None else "-":>10} {change:>8}'
+            )
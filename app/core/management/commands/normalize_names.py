@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+
+from core.models import City, District, Neighborhood, Product
+from core.text import normalize_name
+
+
+class Command(BaseCommand):
+    help = 'Backfill the normalized search_name of places and products'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        for model in (City, District, Neighborhood, Product):
+            updated = self.backfill(model, options['batch_size'])
+            self.stdout.write(
+                f'{model._meta.verbose_name_plural}: {updated} updated'
+            )
+
+    def backfill(self, model, batch_size):
+        updated = 0
+        last_id = 0
+        while True:
+            rows = list(
+                model.objects.filter(pk__gt=last_id)
+                .order_by('pk')
+                .only('id', 'name', 'search_name')[:batch_size]
+            )
+            if not rows:
+                return updated
+            last_id = rows[-1].pk
+            changed = []
+            for row in rows:
+                search_name = normalize_name(row.name)
+                if row.search_name != search_name:
+                    row.search_name = search_name
+                    changed.append(row)
+            model.objects.bulk_update(changed, ['search_name'])
+            updated += len(changed)
@@ -0,0 +1,74 @@
+import io
+import os
+import pstats
+from collections import Counter
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.profiling import list_profiles, load_profile_meta, profile_dir
+
+
+class Command(BaseCommand):
+    help = (
+        'List saved request profiles, or summarize one profile with its '
+        'hottest functions and slowest SQL'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('name', nargs='?', help='Profile to summarize')
+        parser.add_argument(
+            '--sort',
+            default='cumulative',
+            help='pstats sort key, e.g. cumulative, tottime, ncalls'
+        )
+        parser.add_argument('--limit', type=int, default=25)
+
+    def handle(self, *args, **options):
+        if options['name']:
+            self.summarize(options['name'], options['sort'], options['limit'])
+            return
+
+        names = list_profiles()
+        if not names:
+            self.stdout.write(f'No profiles in {profile_dir()}')
+        for name in names[-options['limit']:]:
+            meta = load_profile_meta(name)
+            self.stdout.write(
+                f"{name}  {meta['status']}  {meta['duration_ms']:8.1f} ms  "
+                f"{meta['query_count']:4d} queries  "
+                f"{meta['query_time_ms']:8.1f} ms SQL  {meta['path']}"
+            )
+
+    def summarize(self, name, sort, limit):
+        stats_path = os.path.join(profile_dir(), f'{name}.prof')
+        if not os.path.exists(stats_path):
+            raise CommandError(f'Profile {name} not found')
+        meta = load_profile_meta(name)
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f"{meta['method']} {meta['path']} -> {meta['status']} "
+            f"in {meta['duration_ms']:.1f} ms"
+            f"{' (sampled)' if meta['sampled'] else ''}"
+        ))
+
+        stream = io.StringIO()
+        pstats.Stats(stats_path, stream=stream).sort_stats(sort).print_stats(limit)
+        self.stdout.write(stream.getvalue(), ending='')
+
+        queries = meta['queries']
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f"{meta['query_count']} queries, "
+            f"{meta['query_time_ms']:.1f} ms total"
+        ))
+        for query in sorted(
+            queries,
+            key=lambda query: query['duration_ms'],
+            reverse=True
+        )[:10]:
+            self.stdout.write(f"{query['duration_ms']:8.2f} ms  {query['sql']}")
+
+        repeated = Counter(query['sql'] for query in queries).most_common(5)
+        repeated = [(sql, count) for sql, count in repeated if count > 1]
+        if repeated:
+            self.stdout.write(self.style.MIGRATE_HEADING('Repeated queries'))
+            for sql, count in repeated:
+                self.stdout.write(f'{count:6d} x  {sql}')
@@ -0,0 +1,135 @@
+import cProfile
+import logging
+import random
+import time
+
+from django.conf import settings
+from django.db import connection
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.exceptions import AuthenticationFailed
+
+from core.profiling import QueryRecorder, save_profile
+from core.querycheck import (QueryBudgetExceeded, QueryInspector,
+                             view_query_budget)
+
+logger = logging.getLogger(__name__)
+
+
+class ProfilingMiddleware:
+    """
+    Run a request under cProfile and save the stats with its SQL log.
+
+    A request is profiled when a staff user sends an `X-Profile: 1` header
+    or a `profile=1` query parameter, or when it is picked by
+    PROFILING_SAMPLE_RATE. The staff check (session or token) runs before
+    the profiler starts, so other clients cannot trigger profiling.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        requested = (
+            request.headers.get('X-Profile') == '1'
+            or request.GET.get('profile') == '1'
+        ) and self.is_staff(request)
+        sampled = (
+            not requested
+            and random.random() < settings.PROFILING_SAMPLE_RATE
+        )
+        if not (requested or sampled):
+            return self.get_response(request)
+
+        profiler = cProfile.Profile()
+        recorder = QueryRecorder()
+        started = time.perf_counter()
+        with connection.execute_wrapper(recorder):
+            profiler.enable()
+            try:
+                response = self.get_response(request)
+            finally:
+                profiler.disable()
+        duration = time.perf_counter() - started
+
+        name = save_profile(
+            request, response, profiler, recorder, duration, sampled
+        )
+        if requested:
+            response['X-Profile-Name'] = name
+        return response
+
+    def is_staff(self, request):
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated:
+            return user.is_staff
+        try:
+            credentials = TokenAuthentication().authenticate(request)
+        except AuthenticationFailed:
+            return False
+        return credentials is not None and credentials[0].is_staff
+
+
+class ThrottleHeadersMiddleware:
+    """Expose the token bucket quota of a throttled request as headers"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        quota = getattr(request, 'throttle_quota', None)
+        if quota is not None:
+            response['X-RateLimit-Limit'] = quota['limit']
+            response['X-RateLimit-Remaining'] = quota['remaining']
+            response['X-RateLimit-Reset'] = f"{quota['reset']:.0f}"
+        return response
+
+
+class QueryInspectionMiddleware:
+    """
+    Development and test guard against N+1 queries.
+
+    Every query of a request is grouped by its shape; shapes repeated
+    QUERY_REPEAT_THRESHOLD times with different parameters are logged in
+    DEBUG with the app code line that ran them. Views may declare a
+    `query_budget`; with QUERY_BUDGETS_ENFORCED a request running more
+    queries raises QueryBudgetExceeded, which fails the test.
+
+    Only queries run on the request thread before the response is returned
+    are seen. The async OrderEventsView queries through sync_to_async on
+    other threads, and a streaming body is iterated after this middleware
+    has returned, so neither is counted.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.QUERY_INSPECTION:
+            return self.get_response(request)
+
+        inspector = QueryInspector(settings.QUERY_REPEAT_THRESHOLD)
+        with connection.execute_wrapper(inspector):
+            response = self.get_response(request)
+
+        report = inspector.format_report()
+        if report and settings.DEBUG:
+            logger.warning(
+                'Repeated queries in %s %s:\n%s',
+                request.method,
+                request.path,
+                report
+            )
+        budget = view_query_budget(request)
+        if (
+            budget is not None
+            and inspector.count > budget
+            and settings.QUERY_BUDGETS_ENFORCED
+        ):
+            raise QueryBudgetExceeded(
+                f'{request.method} {request.path} ran {inspector.count} '
+                f'queries, the budget is {budget}'
+                + (f'\nRepeated queries:\n{report}' if report else '')
+            )
+        response['X-Query-Count'] = inspector.count
+        return response
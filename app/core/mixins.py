@@ -0,0 +1,174 @@
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.http import http_date, parse_etags, parse_http_date_safe
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from core.text import normalize_name
+
+
+class ConditionalGetMixin:
+    """
+    Answer list and retrieve requests with 304 Not Modified when nothing
+    in the filtered queryset changed since the client's last response.
+
+    The validator is built from one aggregate query (row count plus the
+    latest value of every field in `conditional_fields`), so an unchanged
+    resource is never serialized.
+    """
+    conditional_fields = ('updated_at',)
+
+    def get_conditional_fields(self):
+        return self.conditional_fields
+
+    def get_validator(self, queryset):
+        """Return (etag, last_modified) for the given queryset"""
+        fields = self.get_conditional_fields()
+        aggregates = {
+            f'max_{index}': Max(field)
+            for index, field in enumerate(fields)
+        }
+        if not queryset.query.is_sliced:
+            queryset = queryset.order_by()
+        result = queryset.aggregate(
+            count=Count('pk', distinct=True),
+            **aggregates
+        )
+        timestamps = [result[f'max_{index}'] for index in range(len(fields))]
+        last_modified = max(
+            (value for value in timestamps if value is not None),
+            default=None
+        )
+        raw = '|'.join([
+            self.request.get_full_path(),
+            str(result['count']),
+            *[value.isoformat() if value else '' for value in timestamps],
+        ])
+        etag = 'W/"%s"' % hashlib.md5(raw.encode()).hexdigest()
+        return etag, last_modified
+
+    def is_not_modified(self, etag, last_modified):
+        if_none_match = self.request.META.get('HTTP_IF_NONE_MATCH')
+        if if_none_match:
+            etags = parse_etags(if_none_match)
+            return '*' in etags or etag in etags
+        if_modified_since = parse_http_date_safe(
+            self.request.META.get('HTTP_IF_MODIFIED_SINCE')
+        )
+        if if_modified_since and last_modified:
+            return int(last_modified.timestamp()) <= if_modified_since
+        return False
+
+    def conditional_response(self, queryset, handler, *args, **kwargs):
+        etag, last_modified = self.get_validator(queryset)
+        if self.is_not_modified(etag, last_modified):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = handler(self.request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            if last_modified:
+                response['Last-Modified'] = http_date(
+                    last_modified.timestamp()
+                )
+        return response
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        return self.conditional_response(
+            queryset, super().list, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        queryset = self.filter_queryset(self.get_queryset()).filter(
+            **{self.lookup_field: kwargs[lookup_url_kwarg]}
+        )
+        return self.conditional_response(
+            queryset, super().retrieve, *args, **kwargs
+        )
+
+
+class NameSearchMixin:
+    """
+    Filter a list by the indexed `search_name` column.
+
+    `?prefix=` becomes a range scan on the index (search_name >= term and
+    < term + U+FFFF), which works on every backend regardless of LIKE
+    collation; `?search=` matches anywhere in the name. Both ignore case
+    and Turkish diacritics and return at most `search_max_results` rows.
+    """
+    search_max_results = 50
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.action != 'list':
+            return queryset
+        prefix = normalize_name(self.request.query_params.get('prefix', ''))
+        search = normalize_name(self.request.query_params.get('search', ''))
+        if not (prefix or search):
+            return queryset
+        if prefix:
+            queryset = queryset.filter(
+                search_name__gte=prefix,
+                search_name__lt=prefix + '\uffff'
+            )
+        if search:
+            queryset = queryset.filter(search_name__contains=search)
+        return queryset.order_by('search_name')[:self.search_max_results]
+
+
+class BatchRetrieveMixin:
+    """
+    Fetch many objects in one request with `?ids=3,1,2`.
+
+    The rows are loaded with one query (plus the viewset's own
+    select/prefetch_related), returned in the requested order, and ids
+    that do not exist are listed under `missing`.
+    """
+    max_batch_size = 50
+
+    def get_batch_ids(self):
+        raw = self.request.query_params.get('ids', None)
+        if raw is None:
+            return None
+        try:
+            ids = list(dict.fromkeys(
+                int(value) for value in raw.split(',') if value.strip()
+            ))
+        except ValueError:
+            raise ValidationError({'ids': 'Virgülle ayrılmış sayılar olmalı'})
+        if not ids:
+            raise ValidationError({'ids': 'En az bir id gerekli'})
+        if len(ids) > self.max_batch_size:
+            raise ValidationError({
+                'ids': f'En fazla {self.max_batch_size} id istenebilir'
+            })
+        return ids
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.action == 'list':
+            ids = self.get_batch_ids()
+            if ids is not None:
+                queryset = queryset.filter(pk__in=ids)
+        return queryset
+
+    def list(self, request, *args, **kwargs):
+        ids = self.get_batch_ids()
+        if ids is None:
+            return super().list(request, *args, **kwargs)
+        found = {
+            obj.pk: obj
+            for obj in self.filter_queryset(self.get_queryset())
+        }
+        serializer = self.get_serializer(
+            [found[pk] for pk in ids if pk in found],
+            many=True
+        )
+        return Response({
+            'results': serializer.data,
+            'missing': [pk for pk in ids if pk not in found],
+        })
@@ -3,8 +3,11 @@ from django.contrib.auth.models import (AbstractBaseUser, BaseUserManager,
                                         PermissionsMixin)
 from django.core.validators import MinValueValidator
 from django.db import models
-from django.db.models.signals import m2m_changed, post_save
+from django.db.models.signals import m2m_changed, post_delete, post_save
 from django.dispatch import receiver
+from django.utils import timezone
+
+from core.text import normalize_name
 
 
 class UserManager(BaseUserManager):
@@ -60,7 +63,27 @@ class User(AbstractBaseUser, PermissionsMixin):
         return self.email
 
 
-class City(models.Model):
+class NormalizedNameModel(models.Model):
+    """Keeps an indexed, accent and case folded copy of `name` for search"""
+    search_name = models.CharField(
+        max_length=100,
+        db_index=True,
+        editable=False,
+        default=''
+        )
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        self.search_name = normalize_name(self.name)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'name' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'search_name'}
+        super().save(*args, **kwargs)
+
+
+class City(NormalizedNameModel):
     name = models.CharField(max_length=30)
 
     class Meta:
@@ -70,7 +93,7 @@ class City(models.Model):
         return self.name
 
 
-class District(models.Model):
+class District(NormalizedNameModel):
     city = models.ForeignKey(City, on_delete=models.CASCADE)
     name = models.CharField(max_length=30)
     nick = models.CharField(
@@ -87,7 +110,7 @@ class District(models.Model):
         return self.name
 
 
-class Neighborhood(models.Model):
+class Neighborhood(NormalizedNameModel):
     district = models.ForeignKey(District, on_delete=models.CASCADE)
     name = models.CharField(max_length=30)
 
@@ -123,7 +146,9 @@ class Address(models.Model):
         )
 
     def get_full_address(self):
-        return f"{self.neighborhood.name} Mahallesi {self.extra_info} {self.district.name}/{self.city.name}"
+        neighborhood = f"{self.neighborhood.name} Mahallesi " if self.neighborhood else ""
+        region = "/".join(place.name for place in (self.district, self.city) if place)
+        return f"{neighborhood}{self.extra_info} {region}".strip()
 
     def __str__(self):
         return f"{self.district.name.upper()} {self.neighborhood.name.upper()} {self.extra_info.upper()}"
@@ -162,6 +187,12 @@ class Customer(models.Model):
     def __str__(self):
         return f"{self.user}"
 
+    def save(self, *args, **kwargs):
+        if not self.nick:
+            from core.nicks import reserve_customer_nicks
+            self.nick = reserve_customer_nicks(self.address.district)[0]
+        super().save(*args, **kwargs)
+
     class Meta:
         ordering = ['user']
 
@@ -169,13 +200,13 @@ class Customer(models.Model):
 class Category(models.Model):
     name = models.CharField(max_length=50, verbose_name="Kategori Adı")
     createt_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         return self.name
 
 
-class Product(models.Model):
+class Product(NormalizedNameModel):
     class DistributionUnitEnum(models.IntegerChoices):
         PIECE = 1, 'Adet'
         LITER = 2, 'Litre'
@@ -197,7 +228,7 @@ class Product(models.Model):
         verbose_name="Alış Fiyatı",
         )
     createt_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         return f"{self.category.name} - {self.name}"
@@ -220,7 +251,7 @@ class OrderItem(models.Model):
         )
 
     createt_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         return f"{self.product.name}\
@@ -285,11 +316,20 @@ class Order(models.Model):
         )
     
     createt_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         return f"Customer: {self.customer} - Total: {self.total_price} - Delivered: {self.is_delivered}"
 
+    def save(self, *args, **kwargs):
+        if not self.nick:
+            from core.nicks import reserve_order_nicks
+            self.nick = reserve_order_nicks(
+                self.customer.address.district,
+                self.delivery_date
+            )[0]
+        super().save(*args, **kwargs)
+
     def total_price_update(self):
         if not self.is_delivered:
             total_price = 0
@@ -304,6 +344,28 @@ class Order(models.Model):
 
     class Meta:
         ordering = ['-delivery_date']
+        indexes = [
+            models.Index(fields=['customer', 'delivery_date', 'id']),
+        ]
+
+
+class NickCounter(models.Model):
+    """Sequence used to hand out customer and order nicks"""
+    scope = models.CharField(max_length=30, unique=True)
+    value = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.scope}: {self.value}"
+
+
+class Tombstone(models.Model):
+    """Record of a deleted row, read by delta sync clients"""
+    model = models.CharField(max_length=30)
+    object_id = models.IntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f"{self.model} {self.object_id} deleted at {self.deleted_at}"
 
 
 @receiver(post_save, sender=OrderItem)
@@ -327,3 +389,29 @@ def order_item_receiver_for_update(sender, instance, *args, **kwargs):
     for item in instance.orderitem_set.all():
         item.price = instance.price
         item.save()
+
+
+@receiver(m2m_changed, sender=Order.items.through)
+def touch_order_receiver(sender, instance, action, reverse, pk_set,
+                         *args, **kwargs):
+    """Bump updated_at of orders whose items changed, for delta sync"""
+    if not reverse and action in ('post_add', 'post_remove', 'post_clear'):
+        order_ids = [instance.pk]
+    elif reverse and action in ('post_add', 'post_remove'):
+        order_ids = pk_set
+    elif reverse and action == 'pre_clear':
+        order_ids = list(instance.order_item.values_list('pk', flat=True))
+    else:
+        return
+    Order.objects.filter(pk__in=order_ids).update(updated_at=timezone.now())
+
+
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Product)
+@receiver(post_delete, sender=OrderItem)
+@receiver(post_delete, sender=Order)
+def tombstone_receiver(sender, instance, *args, **kwargs):
+    Tombstone.objects.create(
+        model=sender._meta.model_name,
+        object_id=instance.pk
+    )
@@ -0,0 +1,92 @@
+import datetime
+import re
+
+from django.db import transaction
+from django.db.models import F
+
+from core.models import Customer, NickCounter, Order
+
+DEFAULT_PREFIX = 'X'
+
+
+def reserve_sequence(scope, count=1, seed=None):
+    """
+    Advance the counter of a scope by count and return the reserved range.
+
+    The counter is incremented with a single UPDATE before it is read, so
+    the row is write-locked for the rest of the transaction and concurrent
+    callers always receive disjoint ranges. A missing counter starts at
+    `seed()` when given, e.g. the highest number already handed out.
+    """
+    with transaction.atomic():
+        counters = NickCounter.objects.filter(scope=scope)
+        if not counters.update(value=F('value') + count):
+            NickCounter.objects.get_or_create(
+                scope=scope,
+                defaults={'value': seed() if seed is not None else 0}
+            )
+            counters.update(value=F('value') + count)
+        value = counters.values_list('value', flat=True).get()
+    return range(value - count + 1, value + 1)
+
+
+def district_prefix(district):
+    """Return the nick prefix of a district"""
+    if district is None:
+        return DEFAULT_PREFIX
+    prefix = district.nick or district.name.replace(' ', '')[:4]
+    return prefix.upper() or DEFAULT_PREFIX
+
+
+def _format_nicks(prefix, sequence, max_length):
+    width = max_length - len(prefix)
+    if len(str(sequence[-1])) > width:
+        raise ValueError(f'Nick sequence exhausted for prefix {prefix}')
+    return [f"{prefix}{number:0{width}d}" for number in sequence]
+
+
+def _highest_number(model, prefix, max_length):
+    """Highest sequence number among the model's nicks with the prefix"""
+    width = max_length - len(prefix)
+    nick = model.objects.filter(
+        nick__regex=rf'^{re.escape(prefix)}[0-9]{{{width}}}$'
+    ).order_by('-nick').values_list('nick', flat=True).first()
+    return int(nick[len(prefix):]) if nick else 0
+
+
+def _reserve_nicks(model, scope, prefix, count):
+    """
+    Reserve count nicks of a model, skipping numbers already used by
+    nicks that were entered by hand or imported
+    """
+    max_length = model._meta.get_field('nick').max_length
+    nicks = []
+    while len(nicks) < count:
+        candidates = _format_nicks(
+            prefix,
+            reserve_sequence(
+                scope,
+                count - len(nicks),
+                seed=lambda: _highest_number(model, prefix, max_length)
+            ),
+            max_length
+        )
+        taken = set(model.objects.filter(
+            nick__in=candidates
+        ).values_list('nick', flat=True))
+        nicks += [nick for nick in candidates if nick not in taken]
+    return nicks
+
+
+def reserve_customer_nicks(district, count=1):
+    """Reserve count customer nicks for a district"""
+    prefix = district_prefix(district)
+    return _reserve_nicks(Customer, f'customer:{prefix}', prefix, count)
+
+
+def reserve_order_nicks(district, delivery_date, count=1):
+    """Reserve count order nicks for a district and day"""
+    if isinstance(delivery_date, str):
+        delivery_date = datetime.date.fromisoformat(delivery_date)
+    prefix = f"{delivery_date:%y%m%d}{district_prefix(district)}"
+    return _reserve_nicks(Order, f'order:{prefix}', prefix, count)
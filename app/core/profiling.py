@@ -0,0 +1,89 @@
+import json
+import os
+import re
+import time
+
+from django.conf import settings
+from django.utils import timezone
+
+
+class QueryRecorder:
+    """
+    Database execute wrapper collecting SQL with its duration. Parameters
+    are not kept: they include token keys and other credentials.
+    """
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append({
+                'sql': sql,
+                'duration_ms': (time.perf_counter() - started) * 1000,
+            })
+
+
+def profile_dir():
+    return settings.PROFILING_DIR
+
+
+def profile_name(request):
+    slug = re.sub(r'[^A-Za-z0-9]+', '-', request.path).strip('-') or 'root'
+    stamp = timezone.now().strftime('%Y%m%dT%H%M%S%f')
+    return f'{stamp}-{request.method}-{slug[:60]}'
+
+
+def save_profile(request, response, profiler, recorder, duration, sampled):
+    """Write the stats and the SQL log of a request, dropping old ones"""
+    directory = profile_dir()
+    os.makedirs(directory, exist_ok=True)
+    name = profile_name(request)
+    profiler.dump_stats(os.path.join(directory, f'{name}.prof'))
+    user = getattr(request, 'user', None)
+    meta = {
+        'name': name,
+        'method': request.method,
+        'path': request.path,
+        'status': response.status_code,
+        'user': str(user) if user and user.is_authenticated else None,
+        'sampled': sampled,
+        'duration_ms': duration * 1000,
+        'query_count': len(recorder.queries),
+        'query_time_ms': sum(query['duration_ms'] for query in recorder.queries),
+        'queries': recorder.queries,
+    }
+    with open(os.path.join(directory, f'{name}.json'), 'w') as stream:
+        json.dump(meta, stream, indent=1)
+    prune_profiles(settings.PROFILING_MAX_FILES)
+    return name
+
+
+def list_profiles():
+    """Return the names of saved profiles, oldest first"""
+    directory = profile_dir()
+    if not os.path.isdir(directory):
+        return []
+    return sorted(
+        filename[:-len('.json')]
+        for filename in os.listdir(directory)
+        if filename.endswith('.json')
+    )
+
+
+def load_profile_meta(name):
+    with open(os.path.join(profile_dir(), f'{name}.json')) as stream:
+        return json.load(stream)
+
+
+def prune_profiles(max_files):
+    names = list_profiles()
+    for name in names[:max(len(names) - max_files, 0)]:
+        for extension in ('.prof', '.json'):
+            try:
+                os.remove(os.path.join(profile_dir(), name + extension))
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,111 @@
+import linecache
+import os
+import re
+import sys
+from collections import Counter, defaultdict
+
+from django.conf import settings
+
+_IN_LIST = re.compile(r'\bIN\s*\((?:\s*%s\s*,?)+\)', re.IGNORECASE)
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_SPACE = re.compile(r'\s+')
+_SKIPPED_FILES = (
+    os.path.join('core', 'querycheck.py'),
+    os.path.join('core', 'middleware.py'),
+)
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def fingerprint(sql):
+    """Shape of a query: literals, parameters and IN lists collapsed"""
+    sql = _STRING.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    sql = _IN_LIST.sub('IN (...)', sql)
+    return _SPACE.sub(' ', sql).strip()
+
+
+def query_origin():
+    """File, line, function and source of the app code running a query"""
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if (
+            filename.startswith(str(settings.BASE_DIR))
+            and 'site-packages' not in filename
+            and not filename.endswith(_SKIPPED_FILES)
+        ):
+            return (
+                os.path.relpath(filename, settings.BASE_DIR),
+                frame.f_lineno,
+                frame.f_code.co_name,
+                linecache.getline(filename, frame.f_lineno).strip(),
+            )
+        frame = frame.f_back
+    return None
+
+
+class QueryInspector:
+    """
+    Database execute wrapper grouping the SQL of a request by shape.
+
+    A shape run `threshold` times or more with different parameters is
+    reported as a repeated (N+1) query, with the app code line that ran it
+    most often.
+    """
+
+    def __init__(self, threshold=3):
+        self.threshold = threshold
+        self.count = 0
+        self.shapes = defaultdict(list)
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        self.shapes[fingerprint(sql)].append((repr(params), query_origin()))
+        return execute(sql, params, many, context)
+
+    def repeated(self):
+        report = []
+        for shape, runs in self.shapes.items():
+            distinct = len({params for params, _ in runs})
+            if len(runs) < self.threshold or distinct < 2:
+                continue
+            origins = Counter(origin for _, origin in runs if origin)
+            report.append({
+                'sql': shape,
+                'count': len(runs),
+                'origin': origins.most_common(1)[0][0] if origins else None,
+            })
+        return sorted(report, key=lambda entry: -entry['count'])
+
+    def format_report(self):
+        lines = []
+        for entry in self.repeated():
+            lines.append(f"{entry['count']}x {entry['sql'][:300]}")
+            if entry['origin']:
+                path, line, function, code = entry['origin']
+                lines.append(f'    at {path}:{line} in {function}: {code}')
+        return '\n'.join(lines)
+
+
+def view_query_budget(request):
+    """
+    The `query_budget` a view declares for this request: an int, or a
+    dict keyed by viewset action or lower-case HTTP method.
+    """
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return None
+    view_class = (
+        getattr(match.func, 'cls', None)
+        or getattr(match.func, 'view_class', None)
+    )
+    budget = getattr(view_class, 'query_budget', None)
+    if isinstance(budget, dict):
+        method = request.method.lower()
+        action = getattr(match.func, 'actions', {}).get(method, method)
+        budget = budget.get(action)
+    return budget
@@ -0,0 +1,67 @@
+from django.conf import settings
+from django.utils import timezone
+
+from core.models import Category, Order, OrderItem, Product, Tombstone
+from order.serializers import OrderItemSerializer, OrderSerializer
+from product.serializers import CategorySerializer, ProductSerializer
+
+SYNC_MODELS = {
+    'categories': (Category.objects.all(), CategorySerializer),
+    'products': (Product.objects.select_related('category'), ProductSerializer),
+    'orders': (Order.objects.prefetch_related('items'), OrderSerializer),
+    'order_items': (OrderItem.objects.all(), OrderItemSerializer),
+}
+
+
+def sync_changes(since=None, delivery_date=None):
+    """
+    Return the rows changed after `since` plus tombstones of deleted rows.
+
+    Clients send back the returned watermark. It trails the current time
+    by SYNC_WATERMARK_LAG so rows saved by transactions still open while
+    this ran are sent again next time, and clients upsert by id. Without
+    `since`, or when it predates the tombstone retention window, a full
+    snapshot is returned instead and `full` is true.
+
+    Changes are found by `updated_at`, which save() and changes of an
+    order's items bump. QuerySet.update() and bulk_update() do not, so
+    code writing synced rows that way must set updated_at itself, as
+    order.totals does. Addresses, cities and districts are not synced:
+    their renames do not reach clients through this endpoint.
+    """
+    now = timezone.now()
+    horizon = now - settings.SYNC_TOMBSTONE_RETENTION
+    full = since is None or since < horizon
+
+    data = {
+        'watermark': (now - settings.SYNC_WATERMARK_LAG).isoformat(),
+        'full': full,
+    }
+    for name, (queryset, serializer_class) in SYNC_MODELS.items():
+        queryset = queryset.filter(updated_at__lte=now)
+        if not full:
+            queryset = queryset.filter(updated_at__gt=since)
+        if delivery_date is not None and name == 'orders':
+            queryset = queryset.filter(delivery_date=delivery_date)
+        if delivery_date is not None and name == 'order_items':
+            queryset = queryset.filter(
+                order_item__delivery_date=delivery_date
+            ).distinct()
+        data[name] = serializer_class(queryset, many=True).data
+
+    deleted = {'category': [], 'product': [], 'order': [], 'orderitem': []}
+    if not full:
+        tombstones = Tombstone.objects.filter(
+            deleted_at__gt=since,
+            deleted_at__lte=now
+        ).values_list('model', 'object_id')
+        for model, object_id in tombstones:
+            deleted.setdefault(model, []).append(object_id)
+    data['deleted'] = deleted
+    return data
+
+
+def prune_tombstones():
+    """Delete tombstones older than the retention window"""
+    horizon = timezone.now() - settings.SYNC_TOMBSTONE_RETENTION
+    return Tombstone.objects.filter(deleted_at__lt=horizon).delete()[0]
@@ -1,7 +1,14 @@
+import datetime
+
 from django.test import TestCase, Client
 from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
+from core.models import (Address, Category, City, Customer, District,
+                         Neighborhood, Order, OrderItem, Product)
+
 
 class AdminSiteTests(TestCase):
 
@@ -37,4 +44,151 @@ class AdminSiteTests(TestCase):
         url = reverse('admin:core_user_add')
         res = self.client.get(url)
 
-        self.assertEqual(res.status_code, 200)
\ No newline at end of file
+        self.assertEqual(res.status_code, 200)
+
+
+class OrderAdminTests(TestCase):
+
+    def setUp(self):
+        self.client = Client()
+        self.admin_user = get_user_model().objects.create_superuser(
+            email="admin@emre.com",
+            password="123456"
+        )
+        self.client.force_login(self.admin_user)
+        city = City.objects.create(name='İstanbul')
+        self.district = District.objects.create(city=city, name='Maltepe')
+        self.neighborhood = Neighborhood.objects.create(
+            district=self.district,
+            name='Aydınevler'
+        )
+        category = Category.objects.create(name='Tavuk')
+        self.product = Product.objects.create(
+            category=category,
+            name='Bütün Tavuk',
+            distribution_unit=1,
+            price=100,
+            purchase_price=70
+        )
+        self.order = Order.objects.create(
+            customer=self.create_customers(1)[0],
+            nick='ORDER1',
+            delivery_date=datetime.date.today()
+        )
+        self.order.items.add(
+            OrderItem.objects.create(product=self.product, quantity=2)
+        )
+
+    def create_customers(self, count):
+        customers = []
+        for index in range(count):
+            address = Address.objects.create(
+                city=self.district.city,
+                district=self.district,
+                neighborhood=self.neighborhood,
+                extra_info=f'Poyraz sokak No {index}'
+            )
+            customers.append(Customer.objects.create(
+                user=get_user_model().objects.create_user(
+                    email=f'customer{Customer.objects.count()}@emre.com'
+                ),
+                nick=f'C{Customer.objects.count()}',
+                phone1=f'533{Customer.objects.count():07d}',
+                address=address
+            ))
+        return customers
+
+    def count_change_page_queries(self):
+        url = reverse('admin:core_order_change', args=[self.order.id])
+        with CaptureQueriesContext(connection) as context:
+            res = self.client.get(url)
+        self.assertEqual(res.status_code, 200)
+        return len(context)
+
+    def test_order_change_page_query_count_is_bounded(self):
+        """Test that the order page does not grow with related rows"""
+        self.count_change_page_queries()
+        baseline = self.count_change_page_queries()
+        self.create_customers(30)
+        self.order.items.add(*[
+            OrderItem.objects.create(product=self.product, quantity=1)
+            for _ in range(30)
+        ])
+
+        self.assertEqual(self.count_change_page_queries(), baseline)
+
+    def test_order_change_page_lists_items(self):
+        """Test that the order page shows its items with links"""
+        item = self.order.items.get()
+        url = reverse('admin:core_order_change', args=[self.order.id])
+
+        res = self.client.get(url)
+
+        self.assertContains(res, 'Bütün Tavuk')
+        self.assertContains(
+            res,
+            reverse('admin:core_orderitem_change', args=[item.pk])
+        )
+
+    def change_page_data(self):
+        """POST data of the order change page as it is rendered"""
+        url = reverse('admin:core_order_change', args=[self.order.id])
+        res = self.client.get(url)
+        form = res.context['adminform'].form
+        data = {
+            name: form[name].value()
+            for name in form.fields
+            if form[name].value() is not None
+        }
+        for inline in res.context['inline_admin_formsets']:
+            management = inline.formset.management_form
+            data.update({
+                f'{management.prefix}-{name}': value
+                for name, value in management.initial.items()
+            })
+        data['Order_items-0-id'] = self.order.items.through.objects.get().pk
+        data['Order_items-0-order'] = self.order.pk
+        return url, data
+
+    def test_order_change_page_adds_items(self):
+        """Test that attaching an item from the order page updates totals"""
+        item = OrderItem.objects.create(product=self.product, quantity=3)
+        url, data = self.change_page_data()
+        data['Order_items-2-0-orderitem'] = item.pk
+
+        res = self.client.post(url, data)
+
+        self.assertEqual(res.status_code, 302)
+        self.assertIn(item, self.order.items.all())
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.total_price, 500)
+
+    def test_order_change_page_removes_items(self):
+        """Test that removing an item from the order page updates totals"""
+        url, data = self.change_page_data()
+        data['Order_items-0-DELETE'] = 'on'
+
+        res = self.client.post(url, data)
+
+        self.assertEqual(res.status_code, 302)
+        self.assertFalse(self.order.items.exists())
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.total_price, 0)
+
+    def test_orders_listed_in_constant_queries(self):
+        """Test that the order changelist selects customers in one query"""
+        url = reverse('admin:core_order_changelist')
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(url)
+        baseline = len(context)
+        for customer in self.create_customers(5):
+            Order.objects.create(
+                customer=customer,
+                nick=f'ORDER-{customer.pk}',
+                delivery_date=datetime.date.today()
+            )
+
+        with CaptureQueriesContext(connection) as context:
+            res = self.client.get(url)
+        self.assertContains(res, 'ORDER-')
+        self.assertEqual(len(context), baseline)
@@ -26,9 +26,10 @@ def sample_address(city='İstanbul', district='Maltepe', neighborhood='Aydınevl
     return address
 
 
-def sample_product(name='Bütün Tavuk', distribution_unit=1, price=100, purchase_price=70):
+def sample_product(name='Bütün Tavuk', distribution_unit=1, price=100, purchase_price=70, category=None):
     """Create a sample product"""
-    category = Category.objects.create(name='Tavuk')
+    if category is None:
+        category, _ = Category.objects.get_or_create(name='Tavuk')
     product = Product.objects.create(
         category=category,
         name=name,
@@ -0,0 +1,137 @@
+import datetime
+import threading
+
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+
+from core.models import City, Customer, District, Order
+from core.nicks import (reserve_customer_nicks, reserve_order_nicks,
+                        reserve_sequence)
+from core.tests.test_models import sample_address, sample_user
+
+
+class NickTests(TestCase):
+
+    def setUp(self):
+        city = City.objects.create(name='İstanbul')
+        self.district = District.objects.create(
+            city=city,
+            name='Maltepe',
+            nick='MLT'
+        )
+
+    def test_reserve_sequence_is_sequential(self):
+        """Test that reserved ranges never overlap"""
+        self.assertEqual(list(reserve_sequence('test')), [1])
+        self.assertEqual(list(reserve_sequence('test', 3)), [2, 3, 4])
+        self.assertEqual(list(reserve_sequence('other')), [1])
+
+    def test_customer_nicks_use_district_prefix(self):
+        """Test that customer nicks are prefixed with the district nick"""
+        nicks = reserve_customer_nicks(self.district, 2)
+
+        self.assertEqual(nicks, ['MLT000001', 'MLT000002'])
+
+    def test_order_nicks_are_per_day(self):
+        """Test that order nick counters restart each delivery day"""
+        monday = datetime.date(2021, 5, 3)
+        tuesday = datetime.date(2021, 5, 4)
+
+        self.assertEqual(
+            reserve_order_nicks(self.district, monday, 2),
+            ['210503MLT00001', '210503MLT00002']
+        )
+        self.assertEqual(
+            reserve_order_nicks(self.district, tuesday),
+            ['210504MLT00001']
+        )
+
+    def test_nicks_generated_on_save(self):
+        """Test that customers and orders without a nick get one"""
+        customer = Customer.objects.create(
+            user=sample_user(),
+            address=sample_address(),
+            phone1='5331234578'
+        )
+        order = Order.objects.create(
+            customer=customer,
+            delivery_date=datetime.date(2021, 5, 3)
+        )
+
+        self.assertEqual(customer.nick, 'MALT00001')
+        self.assertEqual(order.nick, '210503MALT0001')
+
+    def test_counter_starts_after_existing_nicks(self):
+        """Test that a new counter continues after nicks already in use"""
+        customer = Customer.objects.create(
+            user=sample_user(),
+            address=sample_address(),
+            phone1='5331234578',
+            nick='MLT000041'
+        )
+        Order.objects.create(
+            customer=customer,
+            nick='210503MLT00007',
+            delivery_date=datetime.date(2021, 5, 3)
+        )
+
+        self.assertEqual(reserve_customer_nicks(self.district), ['MLT000042'])
+        self.assertEqual(
+            reserve_order_nicks(self.district, datetime.date(2021, 5, 3)),
+            ['210503MLT00008']
+        )
+
+    def test_taken_nicks_are_skipped(self):
+        """Test that numbers used by hand-entered nicks are skipped"""
+        reserve_customer_nicks(self.district)
+        Customer.objects.create(
+            user=sample_user(),
+            address=sample_address(),
+            phone1='5331234578',
+            nick='MLT000003'
+        )
+
+        self.assertEqual(
+            reserve_customer_nicks(self.district, 2),
+            ['MLT000002', 'MLT000004']
+        )
+
+
+class ConcurrentNickTests(TransactionTestCase):
+
+    def test_parallel_orders_get_distinct_nicks(self):
+        """Test that orders created in parallel never share a nick"""
+        customer = Customer.objects.create(
+            user=sample_user(),
+            address=sample_address(),
+            phone1='5331234578'
+        )
+        barrier = threading.Barrier(8)
+        errors = []
+
+        def create_orders():
+            try:
+                barrier.wait()
+                for _ in range(5):
+                    Order.objects.create(
+                        customer=customer,
+                        delivery_date=datetime.date(2021, 5, 3)
+                    )
+            except Exception as error:
+                errors.append(error)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=create_orders) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        nicks = list(Order.objects.values_list('nick', flat=True))
+        self.assertEqual(len(nicks), 40)
+        self.assertEqual(
+            sorted(nicks),
+            [f'210503MALT{number:04d}' for number in range(1, 41)]
+        )
@@ -0,0 +1,88 @@
+import io
+import json
+import tempfile
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from core.profiling import list_profiles, load_profile_meta
+
+PRODUCTS_URL = reverse('product:product-list')
+
+
+class ProfilingMiddlewareTests(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        # The staff check of a requested profile is one query on top of
+        # the view's budget.
+        override = override_settings(
+            PROFILING_DIR=self.directory.name,
+            PROFILING_MAX_FILES=2,
+            QUERY_BUDGETS_ENFORCED=False
+        )
+        override.enable()
+        self.addCleanup(override.disable)
+        self.client = APIClient()
+        self.staff = get_user_model().objects.create_superuser(
+            email='admin@emre.com',
+            password='123456'
+        )
+
+    def test_staff_request_is_profiled(self):
+        """Test a staff request with the header saves a profile"""
+        token = Token.objects.create(user=self.staff)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+
+        res = self.client.get(
+            PRODUCTS_URL,
+            {'token': 'secret'},
+            HTTP_X_PROFILE='1'
+        )
+
+        self.assertEqual(list_profiles(), [res['X-Profile-Name']])
+        meta = load_profile_meta(res['X-Profile-Name'])
+        self.assertEqual(meta['path'], PRODUCTS_URL)
+        self.assertGreaterEqual(meta['query_count'], 1)
+        saved = json.dumps(meta)
+        self.assertNotIn(token.key, saved)
+        self.assertNotIn('secret', saved)
+        self.assertNotIn('params', meta['queries'][0])
+
+    def test_non_staff_request_is_not_profiled(self):
+        """Test the profiling header is ignored for regular users"""
+        user = get_user_model().objects.create_user('user@emre.com', '123456')
+        token = Token.objects.create(user=user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+
+        res = self.client.get(PRODUCTS_URL, {'profile': '1'})
+
+        self.assertNotIn('X-Profile-Name', res)
+        self.assertEqual(list_profiles(), [])
+
+    def test_anonymous_request_is_not_profiled(self):
+        """Test the profiler never starts for anonymous requests"""
+        with mock.patch('cProfile.Profile') as profile:
+            res = self.client.get(PRODUCTS_URL, HTTP_X_PROFILE='1')
+
+        self.assertEqual(res.status_code, 401)
+        profile.assert_not_called()
+        self.assertEqual(list_profiles(), [])
+
+    @override_settings(PROFILING_SAMPLE_RATE=1.0)
+    def test_sampled_requests_are_bounded(self):
+        """Test sampling profiles requests and keeps only the newest ones"""
+        self.client.force_authenticate(self.staff)
+        for _ in range(3):
+            self.client.get(PRODUCTS_URL)
+
+        self.assertEqual(len(list_profiles()), 2)
+        stdout = io.StringIO()
+        call_command('profiles', list_profiles()[0], stdout=stdout)
+        self.assertIn(PRODUCTS_URL, stdout.getvalue())
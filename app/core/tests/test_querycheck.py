@@ -0,0 +1,110 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core.models import Address, City, District, Neighborhood
+from core.querycheck import QueryBudgetExceeded, QueryInspector, fingerprint
+from user.views import AddressViewSet
+
+ADDRESSES_URL = reverse('address-list')
+
+
+def sample_addresses(count):
+    """Create addresses in as many districts"""
+    city = City.objects.create(name='İstanbul')
+    addresses = []
+    for index in range(count):
+        district = District.objects.create(city=city, name=f'İlçe {index}')
+        addresses.append(Address.objects.create(
+            city=city,
+            district=district,
+            neighborhood=Neighborhood.objects.create(
+                district=district,
+                name=f'Mahalle {index}'
+            ),
+            extra_info=f'Poyraz sokak No {index}'
+        ))
+    return addresses
+
+
+class QueryInspectorTests(TestCase):
+
+    def test_fingerprint_collapses_parameters(self):
+        """Test that queries differing only in values share a shape"""
+        self.assertEqual(
+            fingerprint('SELECT * FROM t WHERE id IN (%s, %s, %s) AND n = 5'),
+            fingerprint("SELECT *  FROM t WHERE id IN (%s) AND n = 'x'")
+        )
+
+    def test_repeated_query_reports_code_line(self):
+        """Test that an N+1 loop is reported with the line running it"""
+        sample_addresses(4)
+        inspector = QueryInspector(threshold=3)
+
+        with connection.execute_wrapper(inspector):
+            names = [str(address) for address in Address.objects.all()]
+
+        self.assertEqual(len(names), 4)
+        repeated = inspector.repeated()
+        self.assertEqual(len(repeated), 2)
+        self.assertEqual(repeated[0]['count'], 4)
+        path, _, function, code = repeated[0]['origin']
+        self.assertEqual(path, 'core/models.py')
+        self.assertEqual(function, '__str__')
+        self.assertIn('self.district.name', code)
+
+    def test_same_parameters_are_not_reported(self):
+        """Test that re-running the very same query is not an N+1"""
+        inspector = QueryInspector(threshold=2)
+
+        with connection.execute_wrapper(inspector):
+            for _ in range(3):
+                list(Address.objects.filter(pk=1))
+
+        self.assertEqual(inspector.repeated(), [])
+
+
+class QueryBudgetTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_user('test@emre.com', '123456')
+        )
+        sample_addresses(3)
+
+    @override_settings(QUERY_INSPECTION=True, QUERY_BUDGETS_ENFORCED=True)
+    def test_request_within_budget(self):
+        """Test that a request under its budget reports its query count"""
+        res = self.client.get(ADDRESSES_URL)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res['X-Query-Count'], '1')
+
+    @override_settings(QUERY_INSPECTION=True, QUERY_BUDGETS_ENFORCED=True)
+    def test_request_over_budget_fails(self):
+        """Test that exceeding a budget raises with the repeated queries"""
+        with mock.patch.object(
+            AddressViewSet, 'queryset', Address.objects.all()
+        ), self.assertRaises(QueryBudgetExceeded) as context:
+            self.client.get(ADDRESSES_URL)
+
+        message = str(context.exception)
+        self.assertIn('ran 10 queries, the budget is 2', message)
+        self.assertIn('3x SELECT', message)
+        self.assertIn('user/serializers.py', message)
+
+    @override_settings(QUERY_INSPECTION=True, QUERY_BUDGETS_ENFORCED=False)
+    def test_budget_not_enforced_outside_tests(self):
+        """Test that an exceeded budget only raises when enforced"""
+        with mock.patch.object(
+            AddressViewSet, 'queryset', Address.objects.all()
+        ):
+            res = self.client.get(ADDRESSES_URL)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res['X-Query-Count'], '10')
@@ -0,0 +1,118 @@
+import datetime
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core.models import Category, Customer, Order, OrderItem, Tombstone
+from core.sync import prune_tombstones
+from core.tests.test_models import sample_address, sample_product, sample_user
+
+SYNC_URL = reverse('core:sync')
+
+
+@override_settings(SYNC_WATERMARK_LAG=datetime.timedelta(0))
+class SyncApiTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_user('test@emre.com', '123456')
+        )
+        self.category = Category.objects.create(name='Tavuk')
+        self.chicken = sample_product(category=self.category)
+        self.wing = sample_product(name='Kanat', category=self.category)
+
+    def test_first_sync_returns_snapshot(self):
+        """Test that a client without a watermark gets every row"""
+        res = self.client.get(SYNC_URL)
+
+        self.assertTrue(res.data['full'])
+        self.assertEqual(len(res.data['products']), 2)
+        self.assertEqual(len(res.data['categories']), 1)
+
+    def test_delta_returns_changes_and_tombstones(self):
+        """Test that only rows changed since the watermark are returned"""
+        watermark = self.client.get(SYNC_URL).data['watermark']
+        self.chicken.price = 110
+        self.chicken.save()
+        wing_id = self.wing.id
+        self.wing.delete()
+
+        res = self.client.get(SYNC_URL, {'since': watermark})
+
+        self.assertFalse(res.data['full'])
+        self.assertEqual(
+            [product['id'] for product in res.data['products']],
+            [self.chicken.id]
+        )
+        self.assertEqual(res.data['categories'], [])
+        self.assertEqual(res.data['deleted']['product'], [wing_id])
+
+    def test_unencoded_plus_in_watermark_accepted(self):
+        """Test that a watermark whose '+' was decoded as a space works"""
+        watermark = self.client.get(SYNC_URL).data['watermark']
+        self.assertIn('+', watermark)
+
+        res = self.client.get(f"{SYNC_URL}?since={watermark}")
+
+        self.assertEqual(res.status_code, 200)
+        self.assertFalse(res.data['full'])
+
+    def test_item_changes_bump_delivered_order(self):
+        """Test that adding items to a delivered order syncs the order"""
+        order = Order.objects.create(
+            customer=Customer.objects.create(
+                user=sample_user('customer@emre.com'),
+                address=sample_address(),
+                phone1='5331234578'
+            ),
+            delivery_date=datetime.date(2021, 5, 3),
+            is_delivered=True
+        )
+        watermark = self.client.get(SYNC_URL).data['watermark']
+
+        order.items.add(
+            OrderItem.objects.create(product=self.chicken, quantity=1)
+        )
+        res = self.client.get(SYNC_URL, {'since': watermark})
+
+        self.assertEqual(
+            [synced['id'] for synced in res.data['orders']],
+            [order.id]
+        )
+
+    def test_old_watermark_gets_full_snapshot(self):
+        """Test that watermarks older than the retention resync fully"""
+        since = timezone.now() - datetime.timedelta(days=60)
+
+        res = self.client.get(SYNC_URL, {'since': since.isoformat()})
+
+        self.assertTrue(res.data['full'])
+
+    def test_prune_tombstones(self):
+        """Test that expired tombstones are deleted"""
+        self.wing.delete()
+        Tombstone.objects.update(
+            deleted_at=timezone.now() - datetime.timedelta(days=31)
+        )
+
+        self.assertEqual(prune_tombstones(), 1)
+
+    def test_impossible_dates_rejected(self):
+        """Test that well formed but impossible dates return 400"""
+        for params in (
+            {'delivery_date': '2021-02-30'},
+            {'since': '2021-02-30T00:00:00+00:00'},
+        ):
+            res = self.client.get(SYNC_URL, params)
+
+            self.assertEqual(res.status_code, 400)
+
+    def test_naive_watermark_rejected(self):
+        """Test that a watermark without timezone is rejected"""
+        res = self.client.get(SYNC_URL, {'since': '2021-05-03T10:00:00'})
+
+        self.assertEqual(res.status_code, 400)
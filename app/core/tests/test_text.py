@@ -0,0 +1,33 @@
+import io
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from core.models import City
+from core.text import normalize_name
+
+
+class NormalizedNameTests(TestCase):
+
+    def test_normalize_turkish_name(self):
+        """Test Turkish letters fold to lowercase ASCII"""
+        self.assertEqual(normalize_name('İSTANBUL'), 'istanbul')
+        self.assertEqual(normalize_name('Aydınevler'), 'aydinevler')
+        self.assertEqual(normalize_name('  Çağlayan   Şişli '), 'caglayan sisli')
+
+    def test_search_name_maintained_on_save(self):
+        """Test that saving a city stores its normalized name"""
+        city = City.objects.create(name='İstanbul')
+        city.name = 'Iğdır'
+        city.save(update_fields=['name'])
+
+        city.refresh_from_db()
+        self.assertEqual(city.search_name, 'igdir')
+
+    def test_backfill_command(self):
+        """Test that the backfill fixes rows written without save()"""
+        City.objects.bulk_create([City(name='Muğla')])
+
+        call_command('normalize_names', stdout=io.StringIO())
+
+        self.assertEqual(City.objects.get().search_name, 'mugla')
@@ -0,0 +1,94 @@
+import os
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from core.throttling import store
+
+CATEGORIES_URL = reverse('product:category-list')
+CREATE_USER_URL = reverse('create')
+
+
+class TokenBucketThrottleTests(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        override = override_settings(
+            THROTTLE_DATABASE=os.path.join(self.directory.name, 'throttle.db'),
+            REST_FRAMEWORK={
+                'DEFAULT_THROTTLE_RATES': {'read': '3/min', 'write': '1/min'},
+                'NUM_PROXIES': 0,
+            }
+        )
+        override.enable()
+        self.addCleanup(override.disable)
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_superuser('admin@emre.com', '123456')
+        )
+
+    def test_read_budget_exhausted(self):
+        """Test that reads beyond the bucket capacity are throttled"""
+        remaining = [
+            self.client.get(CATEGORIES_URL)['X-RateLimit-Remaining']
+            for _ in range(3)
+        ]
+        res = self.client.get(CATEGORIES_URL)
+
+        self.assertEqual(remaining, ['2', '1', '0'])
+        self.assertEqual(res.status_code, 429)
+        self.assertIn('Retry-After', res)
+        self.assertEqual(res['X-RateLimit-Limit'], '3')
+
+    def test_write_budget_is_separate(self):
+        """Test that reads and writes use separate buckets"""
+        for _ in range(3):
+            self.client.get(CATEGORIES_URL)
+
+        first = self.client.post(CATEGORIES_URL, {'name': 'Tavuk'})
+        second = self.client.post(CATEGORIES_URL, {'name': 'Süt'})
+
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(second.status_code, 429)
+
+    def test_token_clients_keyed_by_user(self):
+        """Test that the bucket key does not store the auth token"""
+        token = Token.objects.create(
+            user=get_user_model().objects.create_superuser(
+                'staff@emre.com',
+                '123456'
+            )
+        )
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+
+        client.get(CATEGORIES_URL)
+
+        keys = [key for key, in store.connection().execute(
+            'SELECT key FROM throttle_bucket'
+        )]
+        self.assertEqual(keys, [f'read:user:{token.user_id}'])
+
+    def test_anonymous_clients_keyed_by_remote_address(self):
+        """Test that a spoofed X-Forwarded-For does not get a new bucket"""
+        client = APIClient()
+
+        first = client.post(CREATE_USER_URL, HTTP_X_FORWARDED_FOR='10.0.0.1')
+        second = client.post(CREATE_USER_URL, HTTP_X_FORWARDED_FOR='10.0.0.2')
+
+        self.assertEqual(first.status_code, 400)
+        self.assertEqual(second.status_code, 429)
+
+    def test_bucket_refills_over_time(self):
+        """Test that tokens are refilled at the configured rate"""
+        self.assertTrue(store.take('test', capacity=1, rate=1e-9)[0])
+        self.assertFalse(store.take('test', capacity=1, rate=1e-9)[0])
+
+        allowed, tokens = store.take('test', capacity=1, rate=1e9)
+        self.assertTrue(allowed)
+        self.assertEqual(tokens, 0)
@@ -0,0 +1,27 @@
+import re
+import unicodedata
+
+TURKISH_ASCII = str.maketrans({
+    'İ': 'i', 'I': 'i', 'ı': 'i', 'Î': 'i', 'î': 'i',
+    'Ç': 'c', 'ç': 'c',
+    'Ğ': 'g', 'ğ': 'g',
+    'Ö': 'o', 'ö': 'o',
+    'Ş': 's', 'ş': 's',
+    'Ü': 'u', 'ü': 'u', 'Û': 'u', 'û': 'u',
+    'Â': 'a', 'â': 'a',
+})
+
+
+def normalize_name(value):
+    """
+    Fold a name to lowercase ASCII the way Turkish users type it, so
+    'İstanbul', 'ISTANBUL' and 'istanbul' or 'Aydınevler' and 'aydinevler'
+    compare equal.
+    """
+    value = (value or '').translate(TURKISH_ASCII)
+    value = unicodedata.normalize('NFKD', value)
+    value = ''.join(
+        character for character in value
+        if not unicodedata.combining(character)
+    )
+    return re.sub(r'\s+', ' ', value.lower()).strip()
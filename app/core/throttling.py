@@ -0,0 +1,133 @@
+import random
+import sqlite3
+import threading
+import time
+
+from django.conf import settings
+from rest_framework.settings import api_settings
+from rest_framework.throttling import SimpleRateThrottle
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+CREATE_TABLE = '''
+CREATE TABLE IF NOT EXISTS throttle_bucket (
+    key TEXT PRIMARY KEY,
+    tokens REAL NOT NULL,
+    updated REAL NOT NULL,
+    allowed INTEGER NOT NULL
+) WITHOUT ROWID
+'''
+
+# One statement refills the bucket for the elapsed time, takes a token if
+# one is available and reports whether it did. SET expressions all read
+# the old row, so the refill is computed from the previous state.
+TAKE_TOKEN = '''
+INSERT INTO throttle_bucket (key, tokens, updated, allowed)
+VALUES (:key, :capacity - 1, :now, 1)
+ON CONFLICT (key) DO UPDATE SET
+    allowed = MIN(:capacity, tokens + (:now - updated) * :rate) >= 1,
+    tokens = MIN(:capacity, tokens + (:now - updated) * :rate)
+        - (MIN(:capacity, tokens + (:now - updated) * :rate) >= 1),
+    updated = :now
+RETURNING tokens, allowed
+'''
+
+PRUNE = 'DELETE FROM throttle_bucket WHERE updated < ?'
+
+
+class BucketStore:
+    """
+    Token buckets kept in a local SQLite file, shared by every worker
+    process on the machine. Each thread holds its own connection and a
+    check is a single UPSERT, so no lock is held between requests.
+    """
+    prune_probability = 0.001
+    prune_after = 24 * 60 * 60
+
+    def __init__(self):
+        self.local = threading.local()
+
+    def connection(self):
+        path = settings.THROTTLE_DATABASE
+        connections = getattr(self.local, 'connections', None)
+        if connections is None:
+            connections = self.local.connections = {}
+        if path not in connections:
+            connection = sqlite3.connect(
+                path,
+                timeout=5,
+                isolation_level=None,
+                check_same_thread=False
+            )
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=OFF')
+            connection.execute(CREATE_TABLE)
+            connections[path] = connection
+        return connections[path]
+
+    def take(self, key, capacity, rate):
+        """Try to take a token, returning (allowed, tokens left)"""
+        connection = self.connection()
+        now = time.time()
+        tokens, allowed = connection.execute(TAKE_TOKEN, {
+            'key': key,
+            'capacity': capacity,
+            'rate': rate,
+            'now': now,
+        }).fetchone()
+        if random.random() < self.prune_probability:
+            connection.execute(PRUNE, (now - self.prune_after,))
+        return bool(allowed), tokens
+
+
+store = BucketStore()
+
+
+class TokenBucketThrottle(SimpleRateThrottle):
+    """
+    Token bucket throttle. The rate 'N/period' of the scope is the bucket
+    capacity, refilled continuously at N per period. Clients are keyed by
+    their user id, or by IP address when anonymous; X-Forwarded-For is
+    only read when NUM_PROXIES says the app runs behind proxies.
+    """
+    methods = None
+
+    def get_rate(self):
+        return api_settings.DEFAULT_THROTTLE_RATES.get(self.scope)
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            ident = f'user:{request.user.pk}'
+        else:
+            ident = f'ip:{self.get_ident(request)}'
+        return f'{self.scope}:{ident}'
+
+    def allow_request(self, request, view):
+        if self.rate is None or request.method not in self.methods:
+            return True
+        capacity = self.num_requests
+        self.refill_rate = capacity / self.duration
+        allowed, self.tokens = store.take(
+            self.get_cache_key(request, view),
+            capacity,
+            self.refill_rate
+        )
+        request._request.throttle_quota = {
+            'limit': capacity,
+            'remaining': int(self.tokens),
+            'reset': (capacity - self.tokens) / self.refill_rate,
+        }
+        return allowed
+
+    def wait(self):
+        return max(1 - self.tokens, 0) / self.refill_rate
+
+
+class ReadTokenBucketThrottle(TokenBucketThrottle):
+    scope = 'read'
+    methods = SAFE_METHODS
+
+
+class WriteTokenBucketThrottle(TokenBucketThrottle):
+    scope = 'write'
+    methods = ('POST', 'PUT', 'PATCH', 'DELETE')
@@ -1,3 +1,43 @@
-from django.shortcuts import render
+import re
 
-# Create your views here.
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from core.sync import sync_changes
+
+UNENCODED_OFFSET = re.compile(r' (\d{2}(?::?\d{2})?)$')
+
+
+class SyncView(APIView):
+    """Rows changed since a client watermark, for offline clients"""
+    authentication_classes = (TokenAuthentication,)
+    permission_classes = (IsAuthenticated,)
+    query_budget = 6
+
+    def get(self, request, *args, **kwargs):
+        since = request.query_params.get('since', None)
+        if since is not None:
+            # An unencoded '+' of the UTC offset arrives as a space.
+            try:
+                since = parse_datetime(UNENCODED_OFFSET.sub(r'+\1', since))
+            except ValueError:
+                raise ValidationError({'since': 'Geçersiz zaman'})
+            if since is None or since.tzinfo is None:
+                raise ValidationError({
+                    'since': 'Saat dilimi içeren ISO 8601 zaman olmalı'
+                })
+        delivery_date = request.query_params.get('delivery_date', None)
+        if delivery_date is not None:
+            try:
+                delivery_date = parse_date(delivery_date)
+            except ValueError:
+                raise ValidationError({'delivery_date': 'Geçersiz tarih'})
+            if delivery_date is None:
+                raise ValidationError({
+                    'delivery_date': 'Tarih YYYY-MM-DD formatında olmalı'
+                })
+        return Response(sync_changes(since, delivery_date))
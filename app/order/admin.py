@@ -1,3 +1,48 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import (ArchivedOrder, ArchivedOrderItem, RecurringOrderTemplate,
+                     RecurringOrderTemplateItem)
+
+
+class ArchivedOrderItemInline(admin.TabularInline):
+    model = ArchivedOrderItem
+    fields = ['product_name', 'distribution_unit', 'quantity', 'price']
+    readonly_fields = fields
+    extra = 0
+    can_delete = False
+
+
+class ArchivedOrderAdmin(admin.ModelAdmin):
+    list_display = ['nick', 'customer', 'delivery_date', 'total_price']
+    list_select_related = ['customer__user']
+    list_filter = ['delivery_date']
+    search_fields = ['nick', 'customer__nick', 'customer__phone1']
+    raw_id_fields = ['customer']
+    inlines = [ArchivedOrderItemInline]
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+admin.site.register(ArchivedOrder, ArchivedOrderAdmin)
+
+
+class RecurringOrderTemplateItemInline(admin.TabularInline):
+    model = RecurringOrderTemplateItem
+    autocomplete_fields = ['product']
+    extra = 1
+
+
+class RecurringOrderTemplateAdmin(admin.ModelAdmin):
+    list_display = [
+        'customer', 'weekday', 'interval_weeks', 'starts_on', 'ends_on',
+        'is_active',
+    ]
+    list_select_related = ['customer__user']
+    list_filter = ['is_active', 'weekday']
+    search_fields = ['customer__nick', 'customer__phone1']
+    autocomplete_fields = ['customer']
+    inlines = [RecurringOrderTemplateItemInline]
+
+
+admin.site.register(RecurringOrderTemplate, RecurringOrderTemplateAdmin)
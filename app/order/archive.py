@@ -0,0 +1,104 @@
+from django.db import transaction
+
+from core.models import Order, OrderItem
+
+from .models import ArchivedOrder, ArchivedOrderItem
+
+ARCHIVED_ORDER_FIELDS = [
+    'id', 'customer_id', 'nick', 'delivery_date', 'payment_method',
+    'is_delivered', 'is_paid', 'total_price', 'received_money',
+    'remaining_debt', 'service_fee', 'is_instagram', 'instagram_username',
+    'notes', 'createt_at', 'updated_at',
+]
+
+
+def archivable_orders(cutoff):
+    """Orders delivered and paid before the cutoff date"""
+    return Order.objects.filter(
+        is_delivered=True,
+        is_paid=True,
+        delivery_date__lt=cutoff
+    )
+
+
+def archive_batch(order_ids):
+    """
+    Copy a batch of orders and their live items to the archive tables and
+    remove them from the hot tables. Runs in one transaction, so an
+    interrupted run leaves each batch either fully archived or untouched.
+    Orders whose nick is already in the archive stay live and are returned
+    as conflicts instead of failing the batch.
+    """
+    with transaction.atomic():
+        orders = list(Order.objects.filter(pk__in=order_ids).values(
+            *ARCHIVED_ORDER_FIELDS
+        ))
+        taken = set(ArchivedOrder.objects.filter(
+            nick__in=[order['nick'] for order in orders]
+        ).values_list('nick', flat=True))
+        conflicts = [order['id'] for order in orders if order['nick'] in taken]
+        order_ids = [
+            order['id'] for order in orders if order['nick'] not in taken
+        ]
+        ArchivedOrder.objects.bulk_create([
+            ArchivedOrder(**order)
+            for order in orders if order['nick'] not in taken
+        ])
+        links = Order.items.through.objects.filter(
+            order_id__in=order_ids
+        ).select_related('orderitem__product')
+        item_ids = set()
+        archived_items = []
+        for link in links:
+            item = link.orderitem
+            item_ids.add(item.pk)
+            if item.is_deleted:
+                continue
+            archived_items.append(ArchivedOrderItem(
+                order_id=link.order_id,
+                item_id=item.pk,
+                product=item.product,
+                product_name=item.product.name,
+                distribution_unit=item.product.distribution_unit,
+                price=item.price,
+                quantity=item.quantity,
+                createt_at=item.createt_at,
+                updated_at=item.updated_at,
+            ))
+        ArchivedOrderItem.objects.bulk_create(archived_items)
+        Order.objects.filter(pk__in=order_ids).delete()
+        OrderItem.objects.filter(
+            pk__in=item_ids,
+            order_item__isnull=True
+        ).delete()
+    return len(order_ids), len(archived_items), conflicts
+
+
+def archive_orders(cutoff, batch_size=500):
+    """
+    Archive orders before the cutoff batch by batch, yielding counts and
+    the ids of orders skipped for a nick conflict
+    """
+    queryset = archivable_orders(cutoff).order_by('pk')
+    last_pk = 0
+    while True:
+        order_ids = list(queryset.filter(pk__gt=last_pk).values_list(
+            'pk',
+            flat=True
+        )[:batch_size])
+        if not order_ids:
+            return
+        last_pk = order_ids[-1]
+        yield archive_batch(order_ids)
+
+
+def purge_deleted_items(batch_size=500):
+    """Delete soft-deleted order items batch by batch, yielding counts"""
+    queryset = OrderItem.objects.filter(is_deleted=True).order_by('pk')
+    while True:
+        item_ids = list(queryset.values_list('pk', flat=True)[:batch_size])
+        if not item_ids:
+            return
+        with transaction.atomic():
+            OrderItem.objects.filter(pk__in=item_ids).delete()
+        yield len(item_ids)
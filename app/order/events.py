@@ -0,0 +1,80 @@
+import threading
+
+from django.conf import settings
+from django.db import transaction
+
+from core.events import Broadcaster
+from core.models import Order, OrderItem
+
+ORDER_EVENT_FIELDS = (
+    'id', 'nick', 'customer_id', 'delivery_date', 'payment_method',
+    'is_delivered', 'is_paid', 'total_price', 'received_money',
+    'remaining_debt', 'service_fee', 'updated_at',
+)
+ITEM_EVENT_FIELDS = (
+    'id', 'product_id', 'price', 'quantity', 'is_deleted', 'updated_at',
+)
+
+board = Broadcaster(
+    history_size=settings.ORDER_EVENTS_HISTORY,
+    buffer_size=settings.ORDER_EVENTS_BUFFER
+)
+_local = threading.local()
+
+
+def _pending():
+    if not hasattr(_local, 'pending'):
+        _local.pending = {'order': set(), 'item': set()}
+    return _local.pending
+
+
+def queue_change(kind, pk):
+    """
+    Publish the state of an order or item once the transaction commits.
+
+    Changes are collected per thread and flushed by the first on_commit
+    callback, so the several saves a single write triggers (item price,
+    order total, ...) become one event per object read with one query.
+    """
+    _pending()[kind].add(pk)
+    transaction.on_commit(flush_changes)
+
+
+def publish_on_commit(type, data):
+    transaction.on_commit(lambda: board.publish(type, data))
+
+
+def flush_changes():
+    pending = _pending()
+    order_ids, item_ids = pending['order'], pending['item']
+    if not (order_ids or item_ids):
+        return
+    _local.pending = {'order': set(), 'item': set()}
+
+    for order in Order.objects.filter(
+        pk__in=order_ids
+    ).order_by('pk').values(*ORDER_EVENT_FIELDS):
+        order['delivery_date'] = order['delivery_date'].isoformat()
+        board.publish('order', order)
+
+    if not item_ids:
+        return
+    orders = {}
+    for item_id, order_id, delivery_date in Order.items.through.objects.filter(
+        orderitem_id__in=item_ids
+    ).values_list('orderitem_id', 'order_id', 'order__delivery_date'):
+        orders.setdefault(item_id, []).append(
+            {'id': order_id, 'delivery_date': delivery_date.isoformat()}
+        )
+    for item in OrderItem.objects.filter(
+        pk__in=item_ids
+    ).order_by('pk').values(*ITEM_EVENT_FIELDS):
+        item['orders'] = orders.get(item['id'], [])
+        board.publish('item', item)
+
+
+def delivery_dates(event):
+    """Delivery dates an event concerns, for per-subscriber filtering"""
+    if 'orders' in event.data:
+        return {order['delivery_date'] for order in event.data['orders']}
+    return {event.data.get('delivery_date')}
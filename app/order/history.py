@@ -0,0 +1,124 @@
+import datetime
+
+from django.db.models import Q
+
+from core.models import Order
+
+from .models import ArchivedOrder, ArchivedOrderItem
+
+HISTORY_ORDER_FIELDS = [
+    'id', 'nick', 'delivery_date', 'payment_method', 'is_delivered',
+    'is_paid', 'total_price', 'received_money', 'remaining_debt',
+    'service_fee', 'is_instagram', 'notes',
+]
+SUBTOTAL_FIELDS = ['total_price', 'service_fee', 'received_money', 'remaining_debt']
+
+
+def encode_cursor(order):
+    return f"{order['delivery_date'].isoformat()}.{order['id']}"
+
+
+def decode_cursor(cursor):
+    """Return (delivery_date, id) from a cursor, raising ValueError"""
+    delivery_date, _, order_id = cursor.partition('.')
+    return datetime.date.fromisoformat(delivery_date), int(order_id)
+
+
+def _page(queryset, cursor, limit):
+    if cursor is not None:
+        delivery_date, order_id = cursor
+        queryset = queryset.filter(
+            Q(delivery_date__lt=delivery_date)
+            | Q(delivery_date=delivery_date, id__lt=order_id)
+        )
+    return list(
+        queryset.order_by('-delivery_date', '-id')
+        .values(*HISTORY_ORDER_FIELDS)[:limit + 1]
+    )
+
+
+def _live_items(order_ids):
+    links = Order.items.through.objects.filter(
+        order_id__in=order_ids
+    ).values(
+        'order_id',
+        'orderitem__product__name',
+        'orderitem__product__distribution_unit',
+        'orderitem__quantity',
+        'orderitem__price',
+        'orderitem__is_deleted',
+    ).order_by('orderitem_id')
+    for link in links:
+        yield link['order_id'], {
+            'product': link['orderitem__product__name'],
+            'distribution_unit': link['orderitem__product__distribution_unit'],
+            'quantity': link['orderitem__quantity'],
+            'price': link['orderitem__price'],
+            'is_deleted': link['orderitem__is_deleted'],
+        }
+
+
+def _archived_items(order_ids):
+    items = ArchivedOrderItem.objects.filter(order_id__in=order_ids).values(
+        'order_id', 'product_name', 'distribution_unit', 'quantity', 'price'
+    )
+    for item in items:
+        yield item['order_id'], {
+            'product': item['product_name'],
+            'distribution_unit': item['distribution_unit'],
+            'quantity': item['quantity'],
+            'price': item['price'],
+            'is_deleted': False,
+        }
+
+
+def customer_order_history(customer_id, cursor=None, limit=20):
+    """
+    Return one page of a customer's orders, newest delivery first.
+
+    Live and archived orders are read with the same (delivery_date, id)
+    keyset, so only limit + 1 rows of each are ever loaded, and the items
+    of the page are fetched with one query per source.
+    """
+    live = _page(Order.objects.filter(customer_id=customer_id), cursor, limit)
+    archived = _page(
+        ArchivedOrder.objects.filter(customer_id=customer_id),
+        cursor,
+        limit
+    )
+    for order in live:
+        order['archived'] = False
+    for order in archived:
+        order['archived'] = True
+    orders = sorted(
+        [*live, *archived],
+        key=lambda order: (order['delivery_date'], order['id']),
+        reverse=True
+    )
+    has_more = len(orders) > limit
+    orders = orders[:limit]
+
+    by_id = {order['id']: order for order in orders}
+    for order in orders:
+        order['items'] = []
+    for order_id, item in [
+        *_live_items([o['id'] for o in orders if not o['archived']]),
+        *_archived_items([o['id'] for o in orders if o['archived']]),
+    ]:
+        by_id[order_id]['items'].append(item)
+
+    subtotal = {
+        field: sum(order[field] for order in orders)
+        for field in SUBTOTAL_FIELDS
+    }
+    subtotal['items'] = sum(
+        item['price'] * item['quantity']
+        for order in orders
+        for item in order['items']
+        if not item['is_deleted']
+    )
+    return {
+        'results': orders,
+        'subtotal': subtotal,
+        'next_cursor': encode_cursor(orders[-1]) if has_more else None,
+    }
@@ -0,0 +1,348 @@
+import math
+from collections import defaultdict
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils.dateparse import parse_date
+
+from core.models import (Address, City, Customer, District, Neighborhood,
+                         Order, OrderItem, Product)
+from core.nicks import reserve_customer_nicks, reserve_order_nicks
+from core.text import normalize_name
+from product.inventory import InsufficientStock, stock_ids, take_many
+from product.models import StockReservation
+
+from .picklist import invalidate_pick_list
+from .readmodel import refresh_entries
+
+IMPORT_COLUMNS = [
+    'delivery_date', 'phone', 'instagram_username', 'first_name',
+    'last_name', 'city', 'district', 'neighborhood', 'address', 'items',
+    'payment_method', 'service_fee', 'notes',
+]
+INSTAGRAM_EMAIL_DOMAIN = 'instagram.bogaziciciftlik'
+
+
+class ImportRowError(ValueError):
+    pass
+
+
+def _key(value):
+    return (value or '').strip().casefold()
+
+
+def _phone(value):
+    """Digits of a phone number without the 0 / +90 trunk prefix"""
+    digits = ''.join(
+        character for character in value or '' if character.isdigit()
+    )
+    return digits[-10:]
+
+
+class OrderImporter:
+    """
+    Import Instagram orders from CSV rows in batches.
+
+    Lookup maps for products, places and customers are loaded once, and
+    each batch of rows is written with bulk inserts inside a transaction,
+    so the per-row save signals of core.models never fire. Stock of
+    tracked products is taken for each row; rows that fail validation or
+    run out of stock are collected in `errors` instead of aborting the
+    import.
+    """
+
+    def __init__(self, batch_size=1000):
+        self.batch_size = batch_size
+        self.errors = []
+        self.order_count = 0
+        self.customer_count = 0
+        self.load_maps()
+
+    def load_maps(self):
+        self.products = {product.pk: product for product in Product.objects.all()}
+        self.products_by_name = {
+            product.search_name: product for product in self.products.values()
+        }
+        self.cities = {city.search_name: city for city in City.objects.all()}
+        self.districts = {
+            (district.city_id, district.search_name): district
+            for district in District.objects.all()
+        }
+        self.neighborhoods = {
+            (neighborhood.district_id, neighborhood.search_name): neighborhood
+            for neighborhood in Neighborhood.objects.all()
+        }
+        self.customers_by_phone = {}
+        for customer in Customer.objects.select_related('address__district'):
+            self.customers_by_phone[_phone(customer.phone1)] = customer
+            if customer.phone2:
+                self.customers_by_phone.setdefault(_phone(customer.phone2), customer)
+        customers = {
+            customer.pk: customer for customer in self.customers_by_phone.values()
+        }
+        self.customers_by_instagram = {
+            _key(username): customers[customer_id]
+            for username, customer_id in Order.objects.filter(
+                instagram_username__isnull=False
+            ).values_list('instagram_username', 'customer_id').distinct()
+            if customer_id in customers
+        }
+
+    def run(self, rows):
+        """Import an iterable of CSV dict rows, returning self"""
+        numbered = enumerate(rows, start=2)
+        while True:
+            batch = list(islice(numbered, self.batch_size))
+            if not batch:
+                return self
+            self.import_batch(batch)
+
+    def error(self, line, row, message):
+        self.errors.append({'line': line, 'error': message, 'row': row})
+
+    def parse_items(self, value):
+        items = []
+        for entry in (value or '').split(';'):
+            if not entry.strip():
+                continue
+            product_ref, _, quantity = entry.rpartition(':')
+            product_ref = product_ref.strip()
+            if product_ref.isdigit():
+                product = self.products.get(int(product_ref))
+            else:
+                product = self.products_by_name.get(normalize_name(product_ref))
+            if product is None:
+                raise ImportRowError(f'Ürün bulunamadı: {product_ref}')
+            try:
+                quantity = float(quantity)
+            except ValueError:
+                raise ImportRowError(f'Geçersiz miktar: {entry}')
+            if not math.isfinite(quantity) or quantity < 0:
+                raise ImportRowError(f'Geçersiz miktar: {entry}')
+            items.append((product, quantity))
+        if not items:
+            raise ImportRowError('Sipariş ürünü yok')
+        return items
+
+    def parse_payment_method(self, value):
+        value = _key(value)
+        if not value:
+            return None
+        for choice, label in Order.PaymentMethodEnum.choices:
+            if value in (str(choice), _key(label)):
+                return choice
+        raise ImportRowError(f'Geçersiz ödeme şekli: {value}')
+
+    def parse_row(self, row):
+        try:
+            delivery_date = parse_date((row.get('delivery_date') or '').strip())
+        except ValueError:
+            raise ImportRowError('Geçersiz teslimat tarihi')
+        if delivery_date is None:
+            raise ImportRowError('Teslimat tarihi YYYY-MM-DD formatında olmalı')
+        try:
+            service_fee = float(row.get('service_fee') or 0)
+        except ValueError:
+            raise ImportRowError('Geçersiz servis ücreti')
+        if not math.isfinite(service_fee):
+            raise ImportRowError('Geçersiz servis ücreti')
+        return {
+            'delivery_date': delivery_date,
+            'phone': _phone(row.get('phone')),
+            'instagram_username': (row.get('instagram_username') or '').strip(),
+            'items': self.parse_items(row.get('items')),
+            'payment_method': self.parse_payment_method(row.get('payment_method')),
+            'service_fee': service_fee,
+            'notes': (row.get('notes') or '').strip()[:50] or None,
+        }
+
+    def resolve_customer(self, parsed):
+        customer = None
+        if parsed['phone']:
+            customer = self.customers_by_phone.get(parsed['phone'])
+        if customer is None and parsed['instagram_username']:
+            customer = self.customers_by_instagram.get(
+                _key(parsed['instagram_username'])
+            )
+        return customer
+
+    def build_address(self, row):
+        city = self.cities.get(normalize_name(row.get('city')))
+        district = city and self.districts.get(
+            (city.pk, normalize_name(row.get('district')))
+        )
+        neighborhood = district and self.neighborhoods.get(
+            (district.pk, normalize_name(row.get('neighborhood')))
+        )
+        return Address(
+            city=city,
+            district=district,
+            neighborhood=neighborhood,
+            extra_info=(row.get('address') or '').strip()
+        )
+
+    def create_customers(self, new_customers, new_instagram):
+        """Bulk insert users, addresses and customers keyed by phone"""
+        User = get_user_model()
+        emails = {
+            phone: f'{phone}@{INSTAGRAM_EMAIL_DOMAIN}' for phone in new_customers
+        }
+        existing_users = User.objects.in_bulk(emails.values(), field_name='email')
+        unusable_password = make_password(None)
+        users = User.objects.bulk_create([
+            User(
+                email=emails[phone],
+                first_name=(row.get('first_name') or '').strip()[:30],
+                last_name=(row.get('last_name') or '').strip()[:30],
+                password=unusable_password,
+            )
+            for phone, row in new_customers.items()
+            if emails[phone] not in existing_users
+        ])
+        users_by_email = {**existing_users, **{user.email: user for user in users}}
+        addresses = Address.objects.bulk_create([
+            self.build_address(row) for row in new_customers.values()
+        ])
+
+        by_prefix = defaultdict(list)
+        for address in addresses:
+            by_prefix[address.district].append(address)
+        nicks = {}
+        for district, district_addresses in by_prefix.items():
+            reserved = reserve_customer_nicks(district, len(district_addresses))
+            nicks.update(zip(district_addresses, reserved))
+
+        customers = Customer.objects.bulk_create([
+            Customer(
+                user=users_by_email[emails[phone]],
+                phone1=phone,
+                address=address,
+                nick=nicks[address],
+            )
+            for phone, address in zip(new_customers, addresses)
+        ])
+        for customer in customers:
+            self.customers_by_phone[customer.phone1] = customer
+        for instagram_key, phone in new_instagram.items():
+            self.customers_by_instagram[instagram_key] = (
+                self.customers_by_phone[phone]
+            )
+        self.customer_count += len(customers)
+
+    def import_batch(self, batch):
+        parsed_rows = []
+        new_customers = {}
+        new_instagram = {}
+        for line, row in batch:
+            try:
+                parsed = self.parse_row(row)
+            except ImportRowError as error:
+                self.error(line, row, str(error))
+                continue
+            instagram_key = _key(parsed['instagram_username'])
+            if not parsed['phone'] and instagram_key in new_instagram:
+                parsed['phone'] = new_instagram[instagram_key]
+            customer = self.resolve_customer(parsed)
+            if customer is not None and instagram_key:
+                self.customers_by_instagram[instagram_key] = customer
+            elif customer is None:
+                if not parsed['phone']:
+                    self.error(line, row, 'Yeni müşteri için telefon gerekli')
+                    continue
+                new_customers.setdefault(parsed['phone'], row)
+                if instagram_key:
+                    new_instagram.setdefault(instagram_key, parsed['phone'])
+            parsed['line'], parsed['row'] = line, row
+            parsed_rows.append(parsed)
+
+        if not parsed_rows:
+            return
+        with transaction.atomic():
+            if new_customers:
+                self.create_customers(new_customers, new_instagram)
+            orders = self.create_orders(parsed_rows)
+        refresh_entries([order.pk for order in orders])
+        invalidate_pick_list(*[order.delivery_date for order in orders])
+
+    def take_stock(self, parsed_rows):
+        """
+        Take the stock of each row's items, reporting and dropping the rows
+        that run out. Returns the rows kept and the (item, stock) pairs.
+        """
+        tracked = {}
+        by_date = defaultdict(set)
+        for parsed in parsed_rows:
+            parsed['order_items'] = [
+                OrderItem(product=product, price=product.price, quantity=quantity)
+                for product, quantity in parsed['items']
+            ]
+            by_date[parsed['delivery_date']].update(
+                product.pk for product, _ in parsed['items']
+            )
+        for delivery_date, product_ids in by_date.items():
+            tracked[delivery_date] = stock_ids(product_ids, delivery_date)
+
+        kept = []
+        reserved = []
+        for parsed in parsed_rows:
+            try:
+                reserved += take_many(
+                    parsed['order_items'],
+                    tracked[parsed['delivery_date']],
+                    parsed['delivery_date']
+                )
+            except InsufficientStock as error:
+                self.error(parsed['line'], parsed['row'], str(error))
+                continue
+            kept.append(parsed)
+        return kept, reserved
+
+    def create_orders(self, parsed_rows):
+        parsed_rows, reserved = self.take_stock(parsed_rows)
+        if not parsed_rows:
+            return []
+        by_nick_scope = defaultdict(list)
+        for parsed in parsed_rows:
+            parsed['customer'] = self.resolve_customer(parsed)
+            district = parsed['customer'].address.district
+            by_nick_scope[(district, parsed['delivery_date'])].append(parsed)
+        for (district, delivery_date), scope_rows in by_nick_scope.items():
+            nicks = reserve_order_nicks(district, delivery_date, len(scope_rows))
+            for parsed, nick in zip(scope_rows, nicks):
+                parsed['nick'] = nick
+
+        orders = []
+        for parsed in parsed_rows:
+            total = sum(
+                product.price * quantity
+                for product, quantity in parsed['items']
+            )
+            orders.append(Order(
+                customer=parsed['customer'],
+                nick=parsed['nick'],
+                delivery_date=parsed['delivery_date'],
+                payment_method=parsed['payment_method'],
+                service_fee=parsed['service_fee'],
+                total_price=total,
+                remaining_debt=total + parsed['service_fee'],
+                is_instagram=True,
+                instagram_username=parsed['instagram_username'] or None,
+                notes=parsed['notes'],
+            ))
+        orders = Order.objects.bulk_create(orders)
+        OrderItem.objects.bulk_create([
+            item for parsed in parsed_rows for item in parsed['order_items']
+        ])
+        Order.items.through.objects.bulk_create([
+            Order.items.through(order_id=order.pk, orderitem_id=item.pk)
+            for order, parsed in zip(orders, parsed_rows)
+            for item in parsed['order_items']
+        ])
+        StockReservation.objects.bulk_create([
+            StockReservation(item=item, stock_id=stock_id, quantity=item.quantity)
+            for item, stock_id in reserved
+        ])
+        self.order_count += len(orders)
+        return orders
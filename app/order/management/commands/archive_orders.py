@@ -0,0 +1,73 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from order.archive import archivable_orders, archive_orders, purge_deleted_items
+
+
+class Command(BaseCommand):
+    help = (
+        'Move orders delivered and paid before a cutoff date to the archive '
+        'tables and purge soft-deleted order items. Work is committed batch '
+        'by batch, so an interrupted run can simply be started again.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--before',
+            required=True,
+            help='Archive orders delivered before this date (YYYY-MM-DD)'
+        )
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument(
+            '--skip-purge',
+            action='store_true',
+            help='Keep soft-deleted order items'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report how many orders would be archived'
+        )
+
+    def handle(self, *args, **options):
+        cutoff = parse_date(options['before'])
+        if cutoff is None:
+            raise CommandError('--before must be in YYYY-MM-DD format')
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive')
+
+        if options['dry_run']:
+            count = archivable_orders(cutoff).count()
+            self.stdout.write(f'{count} orders would be archived')
+            return
+
+        orders = items = 0
+        conflicts = []
+        for order_count, item_count, skipped in archive_orders(
+            cutoff,
+            options['batch_size']
+        ):
+            orders += order_count
+            items += item_count
+            conflicts.extend(skipped)
+            self.stdout.write(f'Archived {orders} orders, {items} items')
+            if skipped:
+                self.stderr.write(
+                    f'Skipped orders with a nick already archived: {skipped}'
+                )
+
+        purged = 0
+        if not options['skip_purge']:
+            for count in purge_deleted_items(options['batch_size']):
+                purged += count
+                self.stdout.write(f'Purged {purged} deleted items')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Done: {orders} orders and {items} items archived, '
+            f'{purged} deleted items purged'
+        ))
+        if conflicts:
+            raise CommandError(
+                'Orders left live because their nick is already archived: '
+                + ', '.join(str(pk) for pk in conflicts)
+            )
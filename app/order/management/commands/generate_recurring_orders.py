@@ -0,0 +1,50 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from order.recurring import generate_orders
+
+
+class Command(BaseCommand):
+    help = (
+        'Create the orders of all active recurring order templates due on a '
+        'delivery date (tomorrow by default). Templates that already have '
+        'an order for the date are skipped, so the command can be run again '
+        'safely, e.g. after restocking.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--date',
+            help='Delivery date (YYYY-MM-DD), defaults to tomorrow'
+        )
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        if options['date']:
+            delivery_date = parse_date(options['date'])
+            if delivery_date is None:
+                raise CommandError('--date must be in YYYY-MM-DD format')
+        else:
+            delivery_date = timezone.localdate() + datetime.timedelta(days=1)
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive')
+
+        created = 0
+        skipped = []
+        for batch_created, batch_skipped in generate_orders(
+            delivery_date,
+            options['batch_size']
+        ):
+            created += batch_created
+            skipped += batch_skipped
+            self.stdout.write(f'Created {created} orders')
+
+        for template, reason in skipped:
+            self.stderr.write(f'Skipped template {template.pk}: {reason}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Done: {created} orders created for {delivery_date}, '
+            f'{len(skipped)} templates skipped'
+        ))
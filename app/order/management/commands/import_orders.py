@@ -0,0 +1,55 @@
+import csv
+import time
+
+from django.core.management.base import BaseCommand
+
+from order.importer import IMPORT_COLUMNS, OrderImporter
+
+
+class Command(BaseCommand):
+    help = (
+        'Import Instagram orders from a CSV file with the columns: '
+        + ', '.join(IMPORT_COLUMNS)
+        + '. Items are written as "product:quantity;product:quantity", '
+        'where product is a product id or name.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV file to import')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--errors',
+            help='Write rows that could not be imported to this CSV file'
+        )
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        with open(options['path'], newline='', encoding='utf-8-sig') as stream:
+            importer = OrderImporter(options['batch_size']).run(
+                csv.DictReader(stream)
+            )
+
+        if importer.errors and options['errors']:
+            with open(options['errors'], 'w', newline='') as stream:
+                writer = csv.DictWriter(
+                    stream,
+                    fieldnames=['line', 'error', *IMPORT_COLUMNS],
+                    extrasaction='ignore'
+                )
+                writer.writeheader()
+                for error in importer.errors:
+                    writer.writerow({
+                        **error['row'],
+                        'line': error['line'],
+                        'error': error['error'],
+                    })
+        elif importer.errors:
+            for error in importer.errors:
+                self.stderr.write(f"Line {error['line']}: {error['error']}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {importer.order_count} orders and '
+            f'{importer.customer_count} new customers in '
+            f'{time.monotonic() - started:.1f}s, '
+            f'{len(importer.errors)} rows failed'
+        ))
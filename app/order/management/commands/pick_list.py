@@ -0,0 +1,47 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from order.picklist import get_pick_list, write_pick_list_csv
+
+
+class Command(BaseCommand):
+    help = 'Print the pick list of a delivery date, optionally as CSV'
+
+    def add_arguments(self, parser):
+        parser.add_argument('date', help='Delivery date as YYYY-MM-DD')
+        parser.add_argument(
+            '--csv',
+            dest='csv_path',
+            help='Write the pick list to this CSV file ("-" for stdout)'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            delivery_date = parse_date(options['date'])
+        except ValueError:
+            raise CommandError(f"Invalid date: {options['date']}")
+        if delivery_date is None:
+            raise CommandError('Date must be in YYYY-MM-DD format')
+        rows = get_pick_list(delivery_date)
+
+        if options['csv_path'] == '-':
+            write_pick_list_csv(rows, sys.stdout)
+        elif options['csv_path']:
+            with open(options['csv_path'], 'w', newline='') as stream:
+                write_pick_list_csv(rows, stream)
+            self.stdout.write(self.style.SUCCESS(
+                f"Wrote {len(rows)} rows to {options['csv_path']}"
+            ))
+        else:
+            district = None
+            for row in rows:
+                if row['district'] != district:
+                    district = row['district']
+                    self.stdout.write(self.style.MIGRATE_HEADING(
+                        district or '-'
+                    ))
+                self.stdout.write(
+                    f"  {row['product']}: {row['quantity']:g} {row['unit']}"
+                )
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import Order
+from order.models import OrderListEntry
+from order.readmodel import refresh_entries
+
+
+class Command(BaseCommand):
+    help = (
+        'Rebuild the flattened order list entries from the order tables, '
+        'e.g. after a bulk change that bypassed the model signals. Existing '
+        'entries are updated in place, so the order list stays available.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError('--batch-size must be positive')
+
+        last_id = 0
+        rebuilt = 0
+        while True:
+            order_ids = list(Order.objects.filter(
+                pk__gt=last_id
+            ).order_by('pk').values_list('pk', flat=True)[:batch_size])
+            if not order_ids:
+                break
+            refresh_entries(order_ids, batch_size)
+            rebuilt += len(order_ids)
+            last_id = order_ids[-1]
+            self.stdout.write(f'Rebuilt {rebuilt} entries')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Done: {rebuilt} entries rebuilt, '
+            f'{OrderListEntry.objects.count()} entries in total'
+        ))
@@ -0,0 +1,146 @@
+import json
+import multiprocessing
+import os
+import time
+from functools import partial
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from order.totals import chunk_bounds, recompute_chunk
+
+
+class Command(BaseCommand):
+    help = (
+        'Recompute total_price and remaining_debt (total_price + service_fee '
+        '- received_money) of orders from their items and repair the rows '
+        'that differ. The order id space is split into chunks processed by '
+        'a pool of worker processes; finished chunks are recorded in a '
+        'state file so an interrupted run can be resumed.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count())
+        parser.add_argument('--chunk-size', type=int, default=10000)
+        parser.add_argument(
+            '--include-delivered',
+            action='store_true',
+            help='Also repair delivered orders'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report the orders that would change'
+        )
+        parser.add_argument(
+            '--max-diffs',
+            type=int,
+            default=20,
+            help='Differences to print per chunk in a dry run'
+        )
+        parser.add_argument(
+            '--state-file',
+            default='recompute_order_totals.state.json',
+            help='File recording finished chunks'
+        )
+        parser.add_argument(
+            '--resume',
+            action='store_true',
+            help='Skip the chunks the state file marks as finished'
+        )
+
+    def load_state(self, options):
+        params = {
+            'chunk_size': options['chunk_size'],
+            'include_delivered': options['include_delivered'],
+        }
+        state = {**params, 'done': []}
+        if options['resume'] and os.path.exists(options['state_file']):
+            with open(options['state_file']) as state_file:
+                state = json.load(state_file)
+            if {key: state.get(key) for key in params} != params:
+                raise CommandError(
+                    'The state file was written with different '
+                    '--chunk-size/--include-delivered options'
+                )
+        return state
+
+    def save_state(self, path, state):
+        with open(f'{path}.tmp', 'w') as state_file:
+            json.dump(state, state_file)
+        os.replace(f'{path}.tmp', path)
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size must be positive')
+        if options['workers'] < 1:
+            raise CommandError('--workers must be positive')
+        dry_run = options['dry_run']
+        state = self.load_state(options)
+        done = set(state['done'])
+        chunks = [
+            bounds for bounds in chunk_bounds(
+                options['chunk_size'],
+                options['include_delivered']
+            )
+            if bounds[0] not in done
+        ]
+        self.stdout.write(
+            f'{len(chunks)} chunks to process'
+            + (f', {len(done)} already done' if done else '')
+        )
+
+        work = partial(
+            recompute_chunk,
+            include_delivered=options['include_delivered'],
+            dry_run=dry_run,
+            max_diffs=options['max_diffs'] if dry_run else 0
+        )
+        workers = min(options['workers'], len(chunks))
+        if workers > 1 and 'fork' in multiprocessing.get_all_start_methods():
+            # Children must open their own connections instead of sharing
+            # the parent's sockets.
+            connections.close_all()
+            pool = multiprocessing.get_context('fork').Pool(workers)
+            results = pool.imap_unordered(work, chunks)
+        else:
+            pool = None
+            results = map(work, chunks)
+
+        started = time.monotonic()
+        checked = changed = 0
+        try:
+            for index, result in enumerate(results, start=1):
+                checked += result['checked']
+                changed += result['changed']
+                for pk, old_total, new_total, old_debt, new_debt in (
+                    result['diffs']
+                ):
+                    self.stdout.write(
+                        f'  order {pk}: total {old_total:g} -> {new_total:g}, '
+                        f'debt {old_debt:g} -> {new_debt:g}'
+                    )
+                if not dry_run:
+                    state['done'].append(result['start'])
+                    self.save_state(options['state_file'], state)
+                elapsed = time.monotonic() - started
+                self.stdout.write(
+                    f'{index}/{len(chunks)} chunks, {checked} orders checked, '
+                    f'{changed} {"to repair" if dry_run else "repaired"} '
+                    f'({checked / elapsed if elapsed else 0:.0f} orders/s)'
+                )
+        except BaseException:
+            if pool is not None:
+                pool.terminate()
+            raise
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+
+        if not dry_run and os.path.exists(options['state_file']):
+            os.remove(options['state_file'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Done: {checked} orders checked, {changed} '
+            f'{"would be repaired" if dry_run else "repaired"}'
+        ))
@@ -1,3 +1,250 @@
+from django.core.validators import MinValueValidator
 from django.db import models
 
-# Create your models here.
+from core.models import Customer, Order, Product
+
+
+class ArchivedOrder(models.Model):
+    """A delivered and paid order moved out of the live order tables"""
+    id = models.IntegerField(primary_key=True)
+    customer = models.ForeignKey(
+        Customer,
+        on_delete=models.CASCADE,
+        verbose_name="Müşteri Adı"
+        )
+    nick = models.CharField(max_length=14, unique=True)
+    delivery_date = models.DateField(
+        db_index=True,
+        verbose_name="Teslimat Tarihi"
+        )
+    payment_method = models.PositiveSmallIntegerField(
+        choices=Order.PaymentMethodEnum.choices,
+        blank=True,
+        null=True,
+        verbose_name="Ödeme Şekli"
+    )
+    is_delivered = models.BooleanField(default=True)
+    is_paid = models.BooleanField(default=True)
+    total_price = models.FloatField(default=0.0, verbose_name="Toplam Tutar")
+    received_money = models.FloatField(default=0.0)
+    remaining_debt = models.FloatField(default=0.0)
+    service_fee = models.FloatField(default=0.0)
+    is_instagram = models.BooleanField(default=False)
+    instagram_username = models.CharField(
+        max_length=50,
+        null=True,
+        blank=True
+        )
+    notes = models.CharField(max_length=50, blank=True, null=True)
+
+    createt_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Archived: {self.nick} - Total: {self.total_price}"
+
+    class Meta:
+        ordering = ['-delivery_date']
+        indexes = [
+            models.Index(fields=['customer', 'delivery_date', 'id']),
+        ]
+
+
+class ArchivedOrderItem(models.Model):
+    """An item of an archived order with its product details frozen"""
+    order = models.ForeignKey(
+        ArchivedOrder,
+        on_delete=models.CASCADE,
+        related_name='items'
+        )
+    item_id = models.IntegerField()
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.SET_NULL,
+        null=True,
+        verbose_name="Ürün"
+        )
+    product_name = models.CharField(max_length=70, verbose_name="Ürün Adı")
+    distribution_unit = models.PositiveSmallIntegerField(
+        choices=Product.DistributionUnitEnum.choices,
+        verbose_name="Dağıtım Birimi"
+        )
+    price = models.FloatField(default=0)
+    quantity = models.FloatField(verbose_name="Miktar")
+
+    createt_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.product_name} quantity: {self.quantity} price: {self.price} TL"
+
+    class Meta:
+        ordering = ['id']
+        unique_together = ['order', 'item_id']
+
+
+class OrderListEntry(models.Model):
+    """
+    Flattened copy of an order for the order list, kept in sync by
+    order.readmodel so listing needs no joins.
+    """
+    order = models.OneToOneField(
+        Order,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='list_entry'
+        )
+    nick = models.CharField(max_length=14)
+    customer = models.ForeignKey(
+        Customer,
+        on_delete=models.CASCADE,
+        verbose_name="Müşteri Adı"
+        )
+    customer_name = models.CharField(max_length=255, verbose_name="Müşteri Adı")
+    phone1 = models.CharField(max_length=50, verbose_name="Telefon1")
+    phone2 = models.CharField(
+        max_length=50,
+        blank=True,
+        null=True,
+        verbose_name="Telefon2"
+        )
+    full_address = models.TextField(verbose_name="Adres")
+    item_summary = models.TextField(verbose_name="Sipariş Ürünleri")
+    item_count = models.PositiveSmallIntegerField(default=0)
+    delivery_date = models.DateField(verbose_name="Teslimat Tarihi")
+    payment_method = models.PositiveSmallIntegerField(
+        choices=Order.PaymentMethodEnum.choices,
+        blank=True,
+        null=True,
+        verbose_name="Ödeme Şekli"
+    )
+    is_delivered = models.BooleanField(default=False)
+    is_paid = models.BooleanField(default=False)
+    total_price = models.FloatField(default=0.0, verbose_name="Toplam Tutar")
+    received_money = models.FloatField(default=0.0)
+    remaining_debt = models.FloatField(default=0.0)
+    service_fee = models.FloatField(default=0.0)
+    is_instagram = models.BooleanField(default=False)
+    instagram_username = models.CharField(max_length=50, null=True, blank=True)
+    notes = models.CharField(max_length=50, blank=True, null=True)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.nick} - {self.customer_name} - {self.item_summary}"
+
+    class Meta:
+        ordering = ['-delivery_date', 'order']
+        indexes = [
+            models.Index(fields=['delivery_date', 'order']),
+            models.Index(fields=['updated_at']),
+        ]
+
+
+class RecurringOrderTemplate(models.Model):
+    """A basket a customer receives every `interval_weeks` on a weekday"""
+    class WeekdayEnum(models.IntegerChoices):
+        MONDAY = 0, 'Pazartesi'
+        TUESDAY = 1, 'Salı'
+        WEDNESDAY = 2, 'Çarşamba'
+        THURSDAY = 3, 'Perşembe'
+        FRIDAY = 4, 'Cuma'
+        SATURDAY = 5, 'Cumartesi'
+        SUNDAY = 6, 'Pazar'
+
+    customer = models.ForeignKey(
+        Customer,
+        on_delete=models.CASCADE,
+        related_name='recurring_orders',
+        verbose_name="Müşteri Adı"
+        )
+    weekday = models.PositiveSmallIntegerField(
+        choices=WeekdayEnum.choices,
+        verbose_name="Teslimat Günü"
+        )
+    interval_weeks = models.PositiveSmallIntegerField(
+        default=1,
+        validators=[MinValueValidator(1)],
+        verbose_name="Kaç Haftada Bir"
+        )
+    starts_on = models.DateField(verbose_name="Başlangıç Tarihi")
+    ends_on = models.DateField(
+        blank=True,
+        null=True,
+        verbose_name="Bitiş Tarihi"
+        )
+    is_active = models.BooleanField(default=True, db_index=True)
+    payment_method = models.PositiveSmallIntegerField(
+        choices=Order.PaymentMethodEnum.choices,
+        blank=True,
+        null=True,
+        verbose_name="Ödeme Şekli"
+    )
+    service_fee = models.FloatField(default=0.0)
+    notes = models.CharField(
+        max_length=50,
+        verbose_name="Notlar",
+        blank=True,
+        null=True
+        )
+
+    createt_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.customer} - {self.get_weekday_display()}"
+
+    def is_due(self, delivery_date):
+        """Whether an order should be delivered on the given date"""
+        weeks = (delivery_date - self.starts_on).days // 7
+        return (
+            self.is_active
+            and self.starts_on <= delivery_date
+            and (self.ends_on is None or delivery_date <= self.ends_on)
+            and delivery_date.weekday() == self.weekday
+            and weeks % max(self.interval_weeks, 1) == 0
+        )
+
+
+class RecurringOrderTemplateItem(models.Model):
+    template = models.ForeignKey(
+        RecurringOrderTemplate,
+        on_delete=models.CASCADE,
+        related_name='items'
+        )
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.CASCADE,
+        verbose_name="Ürün Adı"
+        )
+    quantity = models.FloatField(
+        validators=[MinValueValidator(0.0)],
+        verbose_name="Miktar"
+        )
+
+    def __str__(self):
+        return f"{self.product.name} quantity: {self.quantity}"
+
+
+class RecurringOrderRun(models.Model):
+    """The order generated from a template for a delivery date"""
+    template = models.ForeignKey(
+        RecurringOrderTemplate,
+        on_delete=models.CASCADE,
+        related_name='runs'
+        )
+    delivery_date = models.DateField(verbose_name="Teslimat Tarihi")
+    order = models.OneToOneField(
+        Order,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='recurring_run'
+        )
+    createt_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.template} - {self.delivery_date}"
+
+    class Meta:
+        unique_together = ['template', 'delivery_date']
@@ -0,0 +1,120 @@
+import csv
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F, Sum
+
+from core.models import OrderItem, Product
+
+from .models import ArchivedOrderItem
+
+PICK_LIST_COLUMNS = ['district', 'product_id', 'product', 'unit', 'quantity']
+PICK_LIST_VERSION_KEY = 'order:pick-list:version'
+
+
+def pick_list_cache_key(delivery_date):
+    return f'order:pick-list:{delivery_date.isoformat()}'
+
+
+def pick_list_version():
+    """Cache version of the pick lists, replaced to drop all of them"""
+    version = cache.get(PICK_LIST_VERSION_KEY)
+    if version is None:
+        cache.add(PICK_LIST_VERSION_KEY, time.time_ns(), timeout=None)
+        version = cache.get(PICK_LIST_VERSION_KEY)
+    return version
+
+
+def build_pick_list(delivery_date):
+    """
+    Aggregate the quantity of every product to deliver on a date, reading
+    live orders and, for past dates, the archive tables
+    """
+    live = (
+        OrderItem.objects
+        .filter(is_deleted=False, order_item__delivery_date=delivery_date)
+        .values(
+            'product_id',
+            district=F('order_item__customer__address__district__name'),
+            product_name=F('product__name'),
+            unit=F('product__distribution_unit'),
+        )
+        .annotate(quantity=Sum('quantity'))
+    )
+    archived = (
+        ArchivedOrderItem.objects
+        .filter(order__delivery_date=delivery_date)
+        .values(
+            'product_id',
+            'product_name',
+            district=F('order__customer__address__district__name'),
+            unit=F('distribution_unit'),
+        )
+        .annotate(quantity=Sum('quantity'))
+    )
+    totals = {}
+    for row in [*live, *archived]:
+        key = (row['district'] or '', row['product_id'])
+        if key in totals:
+            totals[key]['quantity'] += row['quantity']
+            continue
+        totals[key] = {
+            'district': row['district'] or '',
+            'product_id': row['product_id'],
+            'product': row['product_name'],
+            'unit': Product.DistributionUnitEnum(row['unit']).label,
+            'quantity': row['quantity'],
+        }
+    return sorted(
+        totals.values(),
+        key=lambda row: (row['district'], row['product'])
+    )
+
+
+def get_pick_list(delivery_date):
+    """Return the cached pick list for a date, building it on a miss"""
+    key = pick_list_cache_key(delivery_date)
+    version = pick_list_version()
+    rows = cache.get(key, version=version)
+    if rows is None:
+        rows = build_pick_list(delivery_date)
+        cache.set(
+            key,
+            rows,
+            timeout=settings.PICK_LIST_CACHE_TIMEOUT,
+            version=version
+        )
+    return rows
+
+
+def invalidate_pick_list(*delivery_dates):
+    cache.delete_many([
+        pick_list_cache_key(delivery_date)
+        for delivery_date in set(delivery_dates)
+        if delivery_date is not None
+    ], version=pick_list_version())
+
+
+def invalidate_all_pick_lists():
+    """Drop the pick lists of every date, e.g. after a product rename"""
+    cache.set(PICK_LIST_VERSION_KEY, time.time_ns(), timeout=None)
+
+
+def invalidate_pick_list_on_commit(*delivery_dates):
+    """
+    Invalidate once the surrounding transaction commits, so a read in
+    between cannot cache the old rows again
+    """
+    transaction.on_commit(lambda: invalidate_pick_list(*delivery_dates))
+
+
+def invalidate_all_pick_lists_on_commit():
+    transaction.on_commit(invalidate_all_pick_lists)
+
+
+def write_pick_list_csv(rows, stream):
+    writer = csv.DictWriter(stream, fieldnames=PICK_LIST_COLUMNS)
+    writer.writeheader()
+    writer.writerows(rows)
@@ -0,0 +1,119 @@
+import threading
+from collections import defaultdict
+
+from django.db import transaction
+
+from core.models import Order, Product
+
+from .models import OrderListEntry
+
+ENTRY_UPDATE_FIELDS = [
+    field.name for field in OrderListEntry._meta.concrete_fields
+    if not field.primary_key
+]
+
+_local = threading.local()
+
+
+def _pending():
+    if not hasattr(_local, 'pending'):
+        _local.pending = {'order': set(), 'item': set(), 'customer': set()}
+    return _local.pending
+
+
+def queue_refresh(kind, *pks):
+    """
+    Refresh the list entries of orders, items or customers on commit.
+
+    Like order.events, ids are collected per thread and the first
+    on_commit callback rebuilds every touched entry in one pass.
+    """
+    _pending()[kind].update(pk for pk in pks if pk is not None)
+    transaction.on_commit(flush_refresh)
+
+
+def flush_refresh():
+    pending = _pending()
+    if not any(pending.values()):
+        return
+    _local.pending = {'order': set(), 'item': set(), 'customer': set()}
+    order_ids = set(pending['order'])
+    if pending['item']:
+        order_ids.update(Order.items.through.objects.filter(
+            orderitem_id__in=pending['item']
+        ).values_list('order_id', flat=True))
+    if pending['customer']:
+        order_ids.update(Order.objects.filter(
+            customer__in=pending['customer']
+        ).values_list('pk', flat=True))
+    refresh_entries(order_ids)
+
+
+def item_summary(items):
+    units = dict(Product.DistributionUnitEnum.choices)
+    return ', '.join(
+        f'{name} {quantity:g} {units.get(unit, "")}'.strip()
+        for name, unit, quantity in items
+    )
+
+
+def build_entries(order_ids):
+    """Build unsaved list entries of the given orders with two queries"""
+    orders = Order.objects.filter(pk__in=order_ids).select_related(
+        'customer__user',
+        'customer__address__city',
+        'customer__address__district',
+        'customer__address__neighborhood'
+    )
+    items = defaultdict(list)
+    for order_id, name, unit, quantity in Order.items.through.objects.filter(
+        order_id__in=order_ids,
+        orderitem__is_deleted=False
+    ).order_by('orderitem_id').values_list(
+        'order_id',
+        'orderitem__product__name',
+        'orderitem__product__distribution_unit',
+        'orderitem__quantity'
+    ):
+        items[order_id].append((name, unit, quantity))
+
+    return [
+        OrderListEntry(
+            order=order,
+            nick=order.nick,
+            customer=order.customer,
+            customer_name=(
+                order.customer.user.get_full_name().strip()
+                or order.customer.user.email
+            ),
+            phone1=order.customer.phone1,
+            phone2=order.customer.phone2,
+            full_address=order.customer.address.get_full_address(),
+            item_summary=item_summary(items[order.pk]),
+            item_count=len(items[order.pk]),
+            delivery_date=order.delivery_date,
+            payment_method=order.payment_method,
+            is_delivered=order.is_delivered,
+            is_paid=order.is_paid,
+            total_price=order.total_price,
+            received_money=order.received_money,
+            remaining_debt=order.remaining_debt,
+            service_fee=order.service_fee,
+            is_instagram=order.is_instagram,
+            instagram_username=order.instagram_username,
+            notes=order.notes,
+        )
+        for order in orders
+    ]
+
+
+def refresh_entries(order_ids, batch_size=500):
+    """Insert or update the list entries of the given orders"""
+    order_ids = sorted(order_ids)
+    for start in range(0, len(order_ids), batch_size):
+        OrderListEntry.objects.bulk_create(
+            build_entries(order_ids[start:start + batch_size]),
+            update_conflicts=True,
+            unique_fields=['order'],
+            update_fields=ENTRY_UPDATE_FIELDS
+        )
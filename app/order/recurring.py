@@ -0,0 +1,164 @@
+from collections import defaultdict
+
+from django.db import transaction
+
+from core.models import Order, OrderItem
+from core.nicks import reserve_order_nicks
+from product.inventory import InsufficientStock, stock_ids, take_many
+from product.models import StockReservation
+
+from .events import queue_change
+from .models import RecurringOrderRun, RecurringOrderTemplate
+from .picklist import invalidate_pick_list
+from .readmodel import refresh_entries
+
+
+def due_templates(delivery_date):
+    """Active templates for the date's weekday without an order for it yet"""
+    return RecurringOrderTemplate.objects.filter(
+        is_active=True,
+        weekday=delivery_date.weekday(),
+        starts_on__lte=delivery_date
+    ).exclude(
+        ends_on__lt=delivery_date
+    ).exclude(
+        runs__delivery_date=delivery_date
+    )
+
+
+def generate_orders(delivery_date, batch_size=500):
+    """
+    Create the orders of every template due on the delivery date.
+
+    Templates are processed in keyset batches, each in one transaction. A
+    batch writes its orders, items, M2M links, stock reservations and run
+    records with bulk inserts. Each order gets its total when it is
+    inserted, so none of the per-item save signals fire. The run records
+    are unique per template and date, so running again for the same date
+    only picks up templates that were skipped. A template whose items are
+    out of stock, or whose reserved nick is already used by an order, is
+    skipped and reported. Yields (created, skipped) per batch.
+    """
+    last_id = 0
+    while True:
+        batch = list(due_templates(delivery_date).filter(
+            pk__gt=last_id
+        ).select_related(
+            'customer__address__district'
+        ).prefetch_related('items__product').order_by('pk')[:batch_size])
+        if not batch:
+            return
+        last_id = batch[-1].pk
+        templates = [
+            template for template in batch if template.is_due(delivery_date)
+        ]
+        if templates:
+            yield generate_batch(templates, delivery_date)
+
+
+def generate_batch(templates, delivery_date):
+    skipped = []
+    with transaction.atomic():
+        by_district = defaultdict(list)
+        for template in templates:
+            by_district[template.customer.address.district].append(template)
+        nicks = {}
+        for district, district_templates in by_district.items():
+            nicks.update(zip(
+                district_templates,
+                reserve_order_nicks(
+                    district, delivery_date, len(district_templates)
+                )
+            ))
+        taken = set(Order.objects.filter(
+            nick__in=nicks.values()
+        ).values_list('nick', flat=True))
+
+        tracked = stock_ids(
+            {
+                item.product_id
+                for template in templates
+                for item in template.items.all()
+            },
+            delivery_date
+        )
+        reserved = {}
+        for template in templates:
+            if nicks[template] in taken:
+                skipped.append((
+                    template,
+                    f'Sipariş kodu {nicks[template]} zaten kullanılıyor'
+                ))
+                continue
+            try:
+                reserved.update(take_many(
+                    template.items.all(), tracked, delivery_date
+                ))
+            except InsufficientStock as error:
+                skipped.append((template, str(error)))
+        skipped_templates = {template for template, _ in skipped}
+        templates = [
+            template for template in templates
+            if template not in skipped_templates
+        ]
+        if not templates:
+            return 0, skipped
+
+        orders = []
+        for template in templates:
+            total = sum(
+                item.product.price * item.quantity
+                for item in template.items.all()
+            )
+            orders.append(Order(
+                customer=template.customer,
+                nick=nicks[template],
+                delivery_date=delivery_date,
+                payment_method=template.payment_method,
+                service_fee=template.service_fee,
+                total_price=total,
+                remaining_debt=total + template.service_fee,
+                notes=template.notes,
+            ))
+        orders = Order.objects.bulk_create(orders)
+
+        template_items = [
+            (order, template_item)
+            for order, template in zip(orders, templates)
+            for template_item in template.items.all()
+        ]
+        items = OrderItem.objects.bulk_create([
+            OrderItem(
+                product=template_item.product,
+                price=template_item.product.price,
+                quantity=template_item.quantity
+            )
+            for _, template_item in template_items
+        ])
+        Order.items.through.objects.bulk_create([
+            Order.items.through(order_id=order.pk, orderitem_id=item.pk)
+            for (order, _), item in zip(template_items, items)
+        ])
+        StockReservation.objects.bulk_create([
+            StockReservation(
+                item=item,
+                stock_id=reserved[template_item],
+                quantity=template_item.quantity
+            )
+            for (_, template_item), item in zip(template_items, items)
+            if template_item in reserved
+        ])
+        RecurringOrderRun.objects.bulk_create([
+            RecurringOrderRun(
+                template=template,
+                delivery_date=delivery_date,
+                order=order
+            )
+            for template, order in zip(templates, orders)
+        ])
+        for order in orders:
+            queue_change('order', order.pk)
+
+    refresh_entries([order.pk for order in orders])
+    invalidate_pick_list(delivery_date)
+    return len(orders), skipped
@@ -0,0 +1,19 @@
+import io
+
+from rest_framework.renderers import BaseRenderer
+
+from .picklist import write_pick_list_csv
+
+
+class PickListCSVRenderer(BaseRenderer):
+    """Render pick list rows as a CSV download"""
+    media_type = 'text/csv'
+    format = 'csv'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if not isinstance(data, list):
+            return b''
+        stream = io.StringIO()
+        write_pick_list_csv(data, stream)
+        return stream.getvalue().encode(self.charset)
@@ -0,0 +1,32 @@
+from rest_framework import serializers
+
+from core.models import Order, OrderItem
+
+from .models import OrderListEntry
+
+
+class OrderItemSerializer(serializers.ModelSerializer):
+    """Serialize an order item"""
+
+    class Meta:
+        model = OrderItem
+        fields = '__all__'
+        read_only_fields = ('price',)
+
+
+class OrderSerializer(serializers.ModelSerializer):
+    """Serialize an order"""
+
+    class Meta:
+        model = Order
+        fields = '__all__'
+        extra_kwargs = {'nick': {'required': False}}
+
+
+class OrderListEntrySerializer(serializers.ModelSerializer):
+    """Serialize the flattened order list entry of an order"""
+    id = serializers.IntegerField(source='order_id', read_only=True)
+
+    class Meta:
+        model = OrderListEntry
+        fields = '__all__'
@@ -0,0 +1,191 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import (m2m_changed, post_delete, post_init,
+                                      post_save, pre_delete)
+from django.dispatch import receiver
+
+from core.models import (Address, City, Customer, District, Neighborhood,
+                         Order, OrderItem, Product)
+
+from .events import publish_on_commit, queue_change
+from .picklist import (invalidate_all_pick_lists_on_commit,
+                       invalidate_pick_list_on_commit)
+from .readmodel import queue_refresh
+
+
+@receiver(post_init, sender=Order)
+def remember_delivery_date(sender, instance, *args, **kwargs):
+    instance._initial_delivery_date = instance.__dict__.get('delivery_date')
+
+
+@receiver(post_save, sender=Order)
+@receiver(post_delete, sender=Order)
+def invalidate_order_pick_list(sender, instance, *args, **kwargs):
+    invalidate_pick_list_on_commit(
+        instance.delivery_date,
+        getattr(instance, '_initial_delivery_date', None)
+    )
+    instance._initial_delivery_date = instance.delivery_date
+
+
+@receiver(m2m_changed, sender=Order.items.through)
+def invalidate_order_items_pick_list(sender, instance, action, reverse,
+                                     pk_set, *args, **kwargs):
+    if not reverse:
+        if action.startswith('post_'):
+            invalidate_pick_list_on_commit(instance.delivery_date)
+    elif action == 'pre_clear':
+        invalidate_order_item_pick_list(sender, instance)
+    elif action in ('post_add', 'post_remove'):
+        invalidate_pick_list_on_commit(*Order.objects.filter(
+            pk__in=pk_set
+        ).values_list('delivery_date', flat=True))
+
+
+@receiver(post_save, sender=OrderItem)
+@receiver(pre_delete, sender=OrderItem)
+def invalidate_order_item_pick_list(sender, instance, *args, **kwargs):
+    invalidate_pick_list_on_commit(*Order.objects.filter(
+        items=instance.pk
+    ).values_list('delivery_date', flat=True))
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+@receiver(post_save, sender=District)
+@receiver(post_delete, sender=District)
+def invalidate_renamed_pick_lists(sender, instance, created=False,
+                                  *args, **kwargs):
+    if not created:
+        invalidate_all_pick_lists_on_commit()
+
+
+@receiver(post_save, sender=Address)
+def invalidate_address_pick_list(sender, instance, created, *args, **kwargs):
+    if not created:
+        invalidate_pick_list_on_commit(*Order.objects.filter(
+            customer__address=instance.pk
+        ).values_list('delivery_date', flat=True).distinct())
+
+
+@receiver(post_save, sender=Customer)
+def invalidate_customer_pick_list(sender, instance, created, *args, **kwargs):
+    if not created:
+        invalidate_pick_list_on_commit(*Order.objects.filter(
+            customer=instance.pk
+        ).values_list('delivery_date', flat=True).distinct())
+
+
+@receiver(post_save, sender=Order)
+def publish_order(sender, instance, *args, **kwargs):
+    queue_change('order', instance.pk)
+
+
+@receiver(post_delete, sender=Order)
+def publish_order_deleted(sender, instance, *args, **kwargs):
+    publish_on_commit('order_deleted', {
+        'id': instance.pk,
+        'delivery_date': instance.delivery_date.isoformat(),
+    })
+
+
+@receiver(m2m_changed, sender=Order.items.through)
+def publish_order_items(sender, instance, action, reverse, pk_set,
+                        *args, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        queue_change('order', instance.pk)
+    else:
+        for pk in pk_set or ():
+            queue_change('order', pk)
+
+
+@receiver(post_save, sender=OrderItem)
+def publish_order_item(sender, instance, *args, **kwargs):
+    queue_change('item', instance.pk)
+
+
+@receiver(pre_delete, sender=OrderItem)
+def publish_order_item_deleted(sender, instance, *args, **kwargs):
+    publish_on_commit('item_deleted', {
+        'id': instance.pk,
+        'orders': [
+            {'id': order_id, 'delivery_date': delivery_date.isoformat()}
+            for order_id, delivery_date in Order.objects.filter(
+                items=instance.pk
+            ).values_list('id', 'delivery_date')
+        ],
+    })
+
+
+@receiver(post_save, sender=Order)
+def refresh_order_entry(sender, instance, *args, **kwargs):
+    queue_refresh('order', instance.pk)
+
+
+@receiver(m2m_changed, sender=Order.items.through)
+def refresh_order_items_entry(sender, instance, action, reverse, pk_set,
+                              *args, **kwargs):
+    if not reverse:
+        if action.startswith('post_'):
+            queue_refresh('order', instance.pk)
+    elif action == 'pre_clear':
+        queue_refresh('order', *Order.objects.filter(
+            items=instance.pk
+        ).values_list('pk', flat=True))
+    elif action in ('post_add', 'post_remove'):
+        queue_refresh('order', *pk_set)
+
+
+@receiver(post_save, sender=OrderItem)
+def refresh_order_item_entry(sender, instance, *args, **kwargs):
+    queue_refresh('item', instance.pk)
+
+
+@receiver(pre_delete, sender=OrderItem)
+def refresh_deleted_order_item_entry(sender, instance, *args, **kwargs):
+    queue_refresh('order', *Order.objects.filter(
+        items=instance.pk
+    ).values_list('pk', flat=True))
+
+
+@receiver(post_save, sender=Customer)
+def refresh_customer_entries(sender, instance, *args, **kwargs):
+    queue_refresh('customer', instance.pk)
+
+
+@receiver(post_save, sender=Address)
+def refresh_address_entries(sender, instance, created, *args, **kwargs):
+    if not created:
+        queue_refresh('customer', *Customer.objects.filter(
+            address=instance.pk
+        ).values_list('pk', flat=True))
+
+
+@receiver(post_save, sender=City)
+@receiver(pre_delete, sender=City)
+@receiver(post_save, sender=District)
+@receiver(pre_delete, sender=District)
+@receiver(post_save, sender=Neighborhood)
+@receiver(pre_delete, sender=Neighborhood)
+def refresh_place_entries(sender, instance, created=False, *args, **kwargs):
+    if created:
+        return
+    field = sender._meta.model_name
+    queue_refresh('customer', *Customer.objects.filter(
+        **{f'address__{field}': instance.pk}
+    ).values_list('pk', flat=True))
+
+
+@receiver(post_save, sender=get_user_model())
+def refresh_user_entries(sender, instance, created, update_fields,
+                         *args, **kwargs):
+    if created:
+        return
+    if update_fields and not (
+        {'first_name', 'last_name', 'email'} & set(update_fields)
+    ):
+        return
+    queue_refresh('customer', *Customer.objects.filter(
+        user=instance.pk
+    ).values_list('pk', flat=True))
@@ -1,3 +1,962 @@
-from django.test import TestCase
+import asyncio
+import datetime
+import io
+import json
+import os
+import tempfile
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import connection, transaction
+from django.test import AsyncClient, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from core.models import (Address, City, Customer, District, Neighborhood,
+                         Order, OrderItem)
+from core.events import Broadcaster
+from core.tests.test_models import sample_product
+from order.events import board
+from order.models import (ArchivedOrder, ArchivedOrderItem, OrderListEntry,
+                          RecurringOrderTemplate)
+from order.importer import IMPORT_COLUMNS
+from order.picklist import get_pick_list
+from product.models import Stock, StockReservation
+
+PICK_LIST_URL = reverse('order:pick-list')
+IMPORT_URL = reverse('order:import')
+EVENTS_URL = reverse('order:events')
+ORDERS_URL = reverse('order:order-list')
+DELIVERY_DATE = datetime.date(2021, 5, 3)
+
+
+def sample_customer(phone1, district='Maltepe'):
+    """Create a sample customer living in the given district"""
+    city, _ = City.objects.get_or_create(name='İstanbul')
+    district, _ = District.objects.get_or_create(city=city, name=district)
+    neighborhood, _ = Neighborhood.objects.get_or_create(
+        district=district,
+        name='Aydınevler'
+    )
+    address = Address.objects.create(
+        city=city,
+        district=district,
+        neighborhood=neighborhood,
+        extra_info='Poyraz sokak No 10-12'
+    )
+    return Customer.objects.create(
+        user=get_user_model().objects.create_user(f'{phone1}@emre.com'),
+        nick=phone1[-9:],
+        phone1=phone1,
+        address=address
+    )
+
+
+def sample_order(customer, items, delivery_date=DELIVERY_DATE, nick=None):
+    """Create an order holding (product, quantity) items"""
+    order = Order.objects.create(
+        customer=customer,
+        nick=nick or f'{customer.nick}-{Order.objects.count()}',
+        delivery_date=delivery_date
+    )
+    order.items.add(*[
+        OrderItem.objects.create(product=product, quantity=quantity)
+        for product, quantity in items
+    ])
+    return order
+
+
+class PickListApiTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_user('staff@emre.com', '123456')
+        )
+        self.chicken = sample_product()
+        self.milk = sample_product(name='Süt', distribution_unit=2, price=20)
+
+    def test_pick_list_groups_by_district_and_product(self):
+        """Test quantities are summed per district and product"""
+        maltepe = sample_customer('5330000001')
+        kadikoy = sample_customer('5330000002', district='Kadıköy')
+        sample_order(maltepe, [(self.chicken, 2), (self.milk, 1.5)])
+        sample_order(maltepe, [(self.chicken, 1)])
+        sample_order(kadikoy, [(self.milk, 3)])
+        deleted = sample_order(kadikoy, [(self.chicken, 5)])
+        item = deleted.items.get()
+        item.is_deleted = True
+        item.save()
+
+        res = self.client.get(PICK_LIST_URL, {'date': DELIVERY_DATE})
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(
+            [(row['district'], row['product'], row['unit'], row['quantity'])
+             for row in res.data],
+            [
+                ('Kadıköy', 'Süt', 'Litre', 3),
+                ('Maltepe', 'Bütün Tavuk', 'Adet', 3),
+                ('Maltepe', 'Süt', 'Litre', 1.5),
+            ]
+        )
+
+    def test_pick_list_cache_invalidated_on_order_change(self):
+        """Test that adding an item refreshes the pick list on commit"""
+        order = sample_order(sample_customer('5330000001'), [(self.chicken, 2)])
+        self.client.get(PICK_LIST_URL, {'date': DELIVERY_DATE})
+
+        with self.assertNumQueries(0):
+            self.client.get(PICK_LIST_URL, {'date': DELIVERY_DATE})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            order.items.add(
+                OrderItem.objects.create(product=self.milk, quantity=4)
+            )
+            res = self.client.get(PICK_LIST_URL, {'date': DELIVERY_DATE})
+
+            self.assertEqual(len(res.data), 1)
+
+        res = self.client.get(PICK_LIST_URL, {'date': DELIVERY_DATE})
+
+        self.assertEqual(len(res.data), 2)
+
+    def test_pick_list_cache_invalidated_on_rename(self):
+        """Test that renaming a product or district refreshes pick lists"""
+        customer = sample_customer('5330000001')
+        sample_order(customer, [(self.chicken, 2)])
+        get_pick_list(DELIVERY_DATE)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.chicken.name = 'Köy Tavuğu'
+            self.chicken.save()
+            district = customer.address.district
+            district.name = 'Kartal'
+            district.save()
+
+        self.assertEqual(
+            [(row['district'], row['product'])
+             for row in get_pick_list(DELIVERY_DATE)],
+            [('Kartal', 'Köy Tavuğu')]
+        )
+
+    def test_pick_list_cache_invalidated_on_address_change(self):
+        """Test that moving a customer's address refreshes the pick list"""
+        customer = sample_customer('5330000001')
+        sample_order(customer, [(self.chicken, 2)])
+        get_pick_list(DELIVERY_DATE)
+
+        address = customer.address
+        with self.captureOnCommitCallbacks(execute=True):
+            address.district = District.objects.create(
+                city=address.city,
+                name='Kadıköy'
+            )
+            address.save()
+
+        self.assertEqual(
+            [row['district'] for row in get_pick_list(DELIVERY_DATE)],
+            ['Kadıköy']
+        )
+
+    def test_pick_list_csv_export(self):
+        """Test exporting the pick list as CSV"""
+        sample_order(sample_customer('5330000001'), [(self.chicken, 2)])
+
+        res = self.client.get(
+            PICK_LIST_URL,
+            {'date': DELIVERY_DATE, 'format': 'csv'}
+        )
+
+        self.assertEqual(res['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertEqual(
+            res.content.decode().splitlines(),
+            [
+                'district,product_id,product,unit,quantity',
+                f'Maltepe,{self.chicken.id},Bütün Tavuk,Adet,2.0',
+            ]
+        )
+
+    def test_pick_list_requires_valid_date(self):
+        """Test that a missing date is rejected"""
+        res = self.client.get(PICK_LIST_URL)
+
+        self.assertEqual(res.status_code, 400)
+
+    def test_pick_list_rejects_impossible_date(self):
+        """Test that a well formed but impossible date is rejected"""
+        res = self.client.get(PICK_LIST_URL, {'date': '2021-02-30'})
+
+        self.assertEqual(res.status_code, 400)
+        with self.assertRaises(CommandError):
+            call_command('pick_list', '2021-02-30', stdout=io.StringIO())
+
+
+class ArchiveOrdersTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.customer = sample_customer('5330000001')
+        self.chicken = sample_product()
+
+    def archive(self, cutoff='2021-06-01', batch_size=1):
+        call_command(
+            'archive_orders',
+            before=cutoff,
+            batch_size=batch_size,
+            stdout=io.StringIO(),
+            stderr=io.StringIO()
+        )
+
+    def test_archive_moves_delivered_and_paid_orders(self):
+        """Test old delivered and paid orders leave the live tables"""
+        old = sample_order(self.customer, [(self.chicken, 2)])
+        Order.objects.filter(pk=old.pk).update(is_delivered=True, is_paid=True)
+        unpaid = sample_order(self.customer, [(self.chicken, 1)])
+        Order.objects.filter(pk=unpaid.pk).update(is_delivered=True)
+        recent = sample_order(
+            self.customer,
+            [(self.chicken, 1)],
+            delivery_date=datetime.date(2021, 7, 1)
+        )
+        Order.objects.filter(pk=recent.pk).update(
+            is_delivered=True,
+            is_paid=True
+        )
+
+        self.archive()
+
+        self.assertEqual(
+            set(Order.objects.values_list('pk', flat=True)),
+            {unpaid.pk, recent.pk}
+        )
+        archived = ArchivedOrder.objects.get()
+        self.assertEqual(archived.pk, old.pk)
+        self.assertEqual(archived.total_price, 200)
+        self.assertEqual(archived.items.get().quantity, 2)
+        self.assertEqual(OrderItem.objects.count(), 2)
+
+    def test_archive_conflict_keeps_live_order(self):
+        """Test that a nick already in the archive skips only that order"""
+        order = sample_order(self.customer, [(self.chicken, 2)])
+        other = sample_order(self.customer, [(self.chicken, 1)])
+        Order.objects.update(is_delivered=True, is_paid=True)
+        ArchivedOrder.objects.create(
+            id=order.pk + 1000,
+            customer=self.customer,
+            nick=order.nick,
+            delivery_date=DELIVERY_DATE,
+            createt_at=order.createt_at,
+            updated_at=order.updated_at
+        )
+
+        with self.assertRaisesMessage(CommandError, str(order.pk)):
+            self.archive(batch_size=2)
+
+        self.assertTrue(Order.objects.filter(pk=order.pk).exists())
+        self.assertEqual(order.items.count(), 1)
+        self.assertFalse(Order.objects.filter(pk=other.pk).exists())
+        self.assertTrue(ArchivedOrder.objects.filter(pk=other.pk).exists())
+
+    def test_pick_list_reads_archived_orders(self):
+        """Test that archived orders still show up in the pick list"""
+        order = sample_order(self.customer, [(self.chicken, 2)])
+        Order.objects.filter(pk=order.pk).update(
+            is_delivered=True,
+            is_paid=True
+        )
+        self.archive()
+
+        self.assertEqual(
+            [row['quantity'] for row in get_pick_list(DELIVERY_DATE)],
+            [2]
+        )
+
+    def test_archive_purges_soft_deleted_items(self):
+        """Test soft-deleted items are removed from the live tables"""
+        order = sample_order(
+            self.customer,
+            [(self.chicken, 2), (self.chicken, 3)]
+        )
+        item = order.items.first()
+        item.is_deleted = True
+        item.save()
+
+        self.archive()
+
+        self.assertFalse(OrderItem.objects.filter(pk=item.pk).exists())
+        self.assertEqual(order.items.count(), 1)
+        self.assertFalse(ArchivedOrderItem.objects.exists())
+
+
+class ImportOrdersApiTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_superuser('admin@emre.com', '123456')
+        )
+        self.chicken = sample_product()
+        self.milk = sample_product(name='Süt', distribution_unit=2, price=20)
+        self.customer = sample_customer('5330000001')
+
+    def upload(self, lines):
+        content = '\n'.join([','.join(IMPORT_COLUMNS), *lines]).encode()
+        upload = SimpleUploadedFile('orders.csv', content, 'text/csv')
+        return self.client.post(
+            IMPORT_URL,
+            {'file': upload},
+            format='multipart'
+        )
+
+    def test_import_orders_from_csv(self):
+        """Test importing orders for new and existing customers"""
+        res = self.upload([
+            f'2021-05-03,0533 000 0001,ayse,,,,,,,{self.chicken.id}:2,Nakit,,',
+            f'2021-05-03,5330000009,mehmet,Mehmet,Yılmaz,İstanbul,Maltepe,'
+            f'Aydınevler,Poyraz sokak,Süt:1.5;{self.chicken.id}:1,EFT,10,',
+            '2021-05-03,,ayse,,,,,,,Süt:1,,,',
+        ])
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.data['orders'], 3)
+        self.assertEqual(res.data['customers'], 1)
+        self.assertEqual(res.data['errors'], [])
+        new_customer = Customer.objects.get(phone1='5330000009')
+        self.assertEqual(new_customer.user.first_name, 'Mehmet')
+        self.assertEqual(new_customer.address.district.name, 'Maltepe')
+        self.assertEqual(
+            sorted(Order.objects.values_list(
+                'customer_id',
+                'total_price',
+                'remaining_debt'
+            )),
+            sorted([
+                (self.customer.id, 200, 200),
+                (new_customer.id, 130, 140),
+                (self.customer.id, 20, 20),
+            ])
+        )
+        order = Order.objects.get(customer=new_customer)
+        self.assertTrue(order.is_instagram)
+        self.assertEqual(order.items.count(), 2)
+
+    def test_invalid_rows_reported(self):
+        """Test that invalid rows are skipped and reported"""
+        res = self.upload([
+            f'2021-05-03,5330000001,,,,,,,,{self.chicken.id}:2,,,',
+            f'03.05.2021,5330000001,,,,,,,,{self.chicken.id}:2,,,',
+            '2021-05-03,5330000001,,,,,,,,Kuzu:1,,,',
+            f'2021-05-03,,unknown,,,,,,,{self.chicken.id}:1,,,',
+            f'2021-02-30,5330000001,,,,,,,,{self.chicken.id}:2,,,',
+            f'2021-05-03,5330000001,,,,,,,,{self.chicken.id}:nan,,,',
+            f'2021-05-03,5330000001,,,,,,,,{self.chicken.id}:inf,,,',
+        ])
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.data['orders'], 1)
+        self.assertEqual(
+            [error['line'] for error in res.data['errors']],
+            [3, 4, 5, 6, 7, 8]
+        )
+
+    def test_import_reserves_stock(self):
+        """Test that imported orders take stock and never oversell"""
+        stock = Stock.objects.create(
+            product=self.chicken,
+            delivery_date=DELIVERY_DATE,
+            available=3
+        )
+
+        res = self.upload([
+            f'2021-05-03,5330000001,,,,,,,,{self.chicken.id}:2;Süt:1,,,',
+            f'2021-05-03,5330000001,,,,,,,,{self.chicken.id}:2,,,',
+        ])
+
+        self.assertEqual(res.data['orders'], 1)
+        self.assertEqual([error['line'] for error in res.data['errors']], [3])
+        self.assertIn('Yetersiz stok', res.data['errors'][0]['error'])
+        stock.refresh_from_db()
+        self.assertEqual(stock.available, 1)
+        reservation = StockReservation.objects.get()
+        self.assertEqual(reservation.quantity, 2)
+        self.assertEqual(reservation.item.order_item.get().customer, self.customer)
+
+    def test_import_requires_admin(self):
+        """Test that only staff can import orders"""
+        self.client.force_authenticate(
+            get_user_model().objects.create_user('user@emre.com', '123456')
+        )
+
+        res = self.upload([])
+
+        self.assertEqual(res.status_code, 403)
+
+
+class CustomerOrderHistoryApiTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_superuser('admin@emre.com', '123456')
+        )
+        self.customer = sample_customer('5330000001')
+        self.chicken = sample_product()
+        self.url = reverse('order:customer-history', args=[self.customer.id])
+
+    def test_history_pages_through_live_and_archived_orders(self):
+        """Test keyset pages run from live orders into the archive"""
+        for day in range(1, 6):
+            order = sample_order(
+                self.customer,
+                [(self.chicken, day)],
+                delivery_date=datetime.date(2021, 5, day)
+            )
+            if day <= 2:
+                Order.objects.filter(pk=order.pk).update(
+                    is_delivered=True,
+                    is_paid=True
+                )
+        call_command(
+            'archive_orders',
+            before='2021-05-03',
+            stdout=io.StringIO()
+        )
+
+        with self.assertNumQueries(4):
+            first = self.client.get(self.url, {'limit': 3})
+        second = self.client.get(
+            self.url,
+            {'limit': 3, 'cursor': first.data['next_cursor']}
+        )
+
+        self.assertEqual(
+            [order['delivery_date'] for order in first.data['results']],
+            [datetime.date(2021, 5, day) for day in (5, 4, 3)]
+        )
+        self.assertEqual(first.data['subtotal']['items'], 1200)
+        self.assertEqual(
+            [order['archived'] for order in second.data['results']],
+            [True, True]
+        )
+        self.assertEqual(
+            second.data['results'][0]['items'][0]['quantity'],
+            2
+        )
+        self.assertIsNone(second.data['next_cursor'])
+
+    def test_history_rejects_bad_cursor(self):
+        """Test that a malformed cursor returns 400"""
+        res = self.client.get(self.url, {'cursor': 'yesterday'})
+
+        self.assertEqual(res.status_code, 400)
+
+
+class BroadcasterTests(TestCase):
+
+    def collect(self, broadcaster, last_event_id=None, predicate=None):
+        """Subscribe and return the events already queued"""
+        async def run():
+            subscription = broadcaster.subscribe(last_event_id, predicate)
+            events = []
+            while not subscription.queue.empty():
+                events.append(await subscription.get(1))
+            return events
+        return asyncio.run(run())
+
+    def test_resume_from_last_event_id(self):
+        """Test that a reconnecting subscriber gets the events it missed"""
+        broadcaster = Broadcaster()
+        first = broadcaster.publish('order', {'id': 1})
+        broadcaster.publish('order', {'id': 2})
+        broadcaster.publish('order', {'id': 3})
+
+        events = self.collect(broadcaster, first.id)
+
+        self.assertEqual([event.data['id'] for event in events], [2, 3])
+
+    def test_unknown_last_event_id_gets_reset(self):
+        """Test that an id from an old process or trimmed history resets"""
+        broadcaster = Broadcaster(history_size=2)
+        first = broadcaster.publish('order', {'id': 1})
+        broadcaster.publish('order', {'id': 2})
+        broadcaster.publish('order', {'id': 3})
+        broadcaster.publish('order', {'id': 4})
+
+        trimmed = self.collect(broadcaster, first.id)
+        restarted = self.collect(broadcaster, '1-1')
+
+        self.assertEqual([event.type for event in trimmed], ['reset'])
+        self.assertEqual([event.type for event in restarted], ['reset'])
+
+    def test_slow_subscriber_is_closed(self):
+        """Test that a full buffer ends the subscription"""
+        broadcaster = Broadcaster(buffer_size=2)
+
+        async def run():
+            subscription = broadcaster.subscribe()
+            for index in range(3):
+                broadcaster.publish('order', {'id': index})
+            await asyncio.sleep(0)
+            return [await subscription.get(1) for _ in range(3)]
+
+        events = asyncio.run(run())
+
+        self.assertEqual(
+            [event and event.data for event in events],
+            [{'id': 0}, {'id': 1}, None]
+        )
+        self.assertFalse(broadcaster.subscribers)
+
+
+class OrderEventsTests(TestCase):
+
+    def setUp(self):
+        self.chicken = sample_product()
+        self.customer = sample_customer('5330000001')
+        self.token = Token.objects.create(user=self.customer.user)
+
+    def published(self, since, type):
+        return [
+            event.data for event in board.history
+            if int(event.id.partition('-')[2]) > since and event.type == type
+        ]
+
+    def test_order_change_published_once_on_commit(self):
+        """Test that one write publishes one event per object after commit"""
+        since = board.sequence
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                order = sample_order(self.customer, [(self.chicken, 2)])
+
+        orders = [
+            data for data in self.published(since, 'order')
+            if data['id'] == order.pk
+        ]
+        items = self.published(since, 'item')
+        self.assertEqual(len(orders), 1)
+        self.assertEqual(orders[0]['total_price'], 200)
+        self.assertEqual(orders[0]['delivery_date'], DELIVERY_DATE.isoformat())
+        self.assertEqual(
+            items[-1]['orders'],
+            [{'id': order.pk, 'delivery_date': DELIVERY_DATE.isoformat()}]
+        )
+
+    def test_rolled_back_change_not_published(self):
+        """Test that nothing is published for a rolled back transaction"""
+        since = board.sequence
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    sample_order(self.customer, [(self.chicken, 2)])
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+
+        self.assertEqual(board.sequence, since)
+
+    async def test_stream_requires_token(self):
+        """Test that the stream rejects requests without a valid token"""
+        res = await AsyncClient().get(EVENTS_URL, {'token': 'wrong'})
+
+        self.assertEqual(res.status_code, 401)
+
+    async def test_stream_rejects_impossible_date(self):
+        """Test that a well formed but impossible date returns 400"""
+        res = await AsyncClient().get(
+            EVENTS_URL,
+            {'delivery_date': '2021-02-30'},
+            headers={'Authorization': f'Token {self.token.key}'}
+        )
+
+        self.assertEqual(res.status_code, 400)
+
+    @override_settings(ORDER_EVENTS_HEARTBEAT=0.01)
+    async def test_stream_filters_by_delivery_date(self):
+        """Test that the stream sends matching events and heartbeats"""
+        board.publish('order', {'id': 1, 'delivery_date': '2021-05-04'})
+        matching = board.publish(
+            'order',
+            {'id': 2, 'delivery_date': DELIVERY_DATE.isoformat()}
+        )
+
+        res = await AsyncClient().get(
+            EVENTS_URL,
+            {'delivery_date': DELIVERY_DATE.isoformat()},
+            headers={
+                'Authorization': f'Token {self.token.key}',
+                'Last-Event-ID': f'{board.epoch}-{board.sequence - 2}',
+            }
+        )
+        chunks = []
+        async for chunk in res.streaming_content:
+            chunks.append(chunk.decode())
+            if len(chunks) == 3:
+                break
+
+        self.assertEqual(res['Content-Type'], 'text/event-stream')
+        self.assertEqual(chunks[0], 'retry: 3000\n\n')
+        self.assertIn(f'id: {matching.id}\nevent: order\n', chunks[1])
+        self.assertEqual(chunks[2], ': heartbeat\n\n')
+
+
+class OrderListEntryTests(TestCase):
+
+    def setUp(self):
+        self.chicken = sample_product()
+        self.milk = sample_product(name='Süt', distribution_unit=2, price=20)
+        self.customer = sample_customer('5330000001')
+        self.customer.user.first_name = 'Emre'
+        self.customer.user.last_name = 'Arısoy'
+        self.customer.user.save()
+
+    def create_order(self, items):
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                return sample_order(self.customer, items)
+
+    def test_entry_created_with_order(self):
+        """Test that an order gets a flattened list entry on commit"""
+        order = self.create_order([(self.chicken, 2), (self.milk, 1.5)])
+
+        entry = OrderListEntry.objects.get(order=order)
+        self.assertEqual(entry.customer_name, 'Emre Arısoy')
+        self.assertEqual(entry.phone1, '5330000001')
+        self.assertEqual(
+            entry.full_address,
+            'Aydınevler Mahallesi Poyraz sokak No 10-12 Maltepe/İstanbul'
+        )
+        self.assertEqual(entry.item_summary, 'Bütün Tavuk 2 Adet, Süt 1.5 Litre')
+        self.assertEqual(entry.item_count, 2)
+        self.assertEqual(entry.total_price, 230)
+
+    def test_entry_falls_back_to_long_email(self):
+        """Test that a nameless customer is listed by the full email"""
+        email = f'{"a" * 240}@emre.com'
+        get_user_model().objects.filter(pk=self.customer.user.pk).update(
+            first_name='',
+            last_name='',
+            email=email
+        )
+        order = self.create_order([(self.chicken, 1)])
+
+        entry = OrderListEntry.objects.get(order=order)
+        entry.full_clean()
+        self.assertEqual(entry.customer_name, email)
+
+    def test_entry_follows_item_and_customer_changes(self):
+        """Test that item and customer writes refresh the entry"""
+        order = self.create_order([(self.chicken, 2), (self.milk, 1)])
+        item = order.items.get(product=self.milk)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            item.is_deleted = True
+            item.save()
+            self.customer.phone2 = '5330000009'
+            self.customer.save()
+
+        entry = OrderListEntry.objects.get(order=order)
+        self.assertEqual(entry.item_summary, 'Bütün Tavuk 2 Adet')
+        self.assertEqual(entry.total_price, 200)
+        self.assertEqual(entry.phone2, '5330000009')
+
+    def test_entry_follows_place_renames(self):
+        """Test that city, district and neighborhood renames refresh it"""
+        order = self.create_order([(self.chicken, 1)])
+        address = self.customer.address
+
+        with self.captureOnCommitCallbacks(execute=True):
+            address.city.name = 'Ankara'
+            address.city.save()
+            address.district.name = 'Çankaya'
+            address.district.save()
+            address.neighborhood.name = 'Kızılay'
+            address.neighborhood.save()
+
+        self.assertEqual(
+            OrderListEntry.objects.get(order=order).full_address,
+            'Kızılay Mahallesi Poyraz sokak No 10-12 Çankaya/Ankara'
+        )
+
+    def test_entry_follows_deleted_neighborhood(self):
+        """Test that deleting a neighborhood drops it from the address"""
+        order = self.create_order([(self.chicken, 1)])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.customer.address.neighborhood.delete()
+
+        self.assertEqual(
+            OrderListEntry.objects.get(order=order).full_address,
+            'Poyraz sokak No 10-12 Maltepe/İstanbul'
+        )
+
+    def test_entry_deleted_with_order(self):
+        """Test that deleting an order removes its entry"""
+        order = self.create_order([(self.chicken, 1)])
+
+        order.delete()
+
+        self.assertFalse(OrderListEntry.objects.exists())
+
+    def test_rebuild_order_list(self):
+        """Test that the rebuild command restores missing entries"""
+        orders = [self.create_order([(self.chicken, 1)]) for _ in range(3)]
+        OrderListEntry.objects.all().delete()
+
+        call_command('rebuild_order_list', batch_size=2, stdout=io.StringIO())
+
+        self.assertEqual(
+            sorted(OrderListEntry.objects.values_list('order', flat=True)),
+            sorted(order.pk for order in orders)
+        )
+
+    def test_order_list_reads_entries(self):
+        """Test that listing orders is one query on the entries table"""
+        for _ in range(3):
+            self.create_order([(self.chicken, 1), (self.milk, 2)])
+        client = APIClient()
+        client.force_authenticate(self.customer.user)
+
+        with self.assertNumQueries(2):
+            res = client.get(ORDERS_URL, {'delivery_date': DELIVERY_DATE})
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(len(res.data), 3)
+        self.assertEqual(res.data[0]['customer_name'], 'Emre Arısoy')
+        self.assertEqual(res.data[0]['item_summary'], 'Bütün Tavuk 1 Adet, Süt 2 Litre')
+
+    def test_order_list_rejects_invalid_date(self):
+        """Test that a malformed or impossible date filter returns 400"""
+        client = APIClient()
+        client.force_authenticate(self.customer.user)
+
+        for delivery_date in ('abc', '2021-02-30'):
+            res = client.get(ORDERS_URL, {'delivery_date': delivery_date})
+
+            self.assertEqual(res.status_code, 400)
+
+
+class RecomputeOrderTotalsTests(TestCase):
+
+    def setUp(self):
+        self.chicken = sample_product()
+        self.customer = sample_customer('5330000001')
+        self.orders = [
+            sample_order(self.customer, [(self.chicken, quantity)])
+            for quantity in (1, 2, 3)
+        ]
+        Order.objects.filter(pk=self.orders[0].pk).update(
+            total_price=0,
+            service_fee=15,
+            received_money=50
+        )
+        Order.objects.filter(pk=self.orders[2].pk).update(
+            total_price=1,
+            is_delivered=True
+        )
+        self.state_file = os.path.join(tempfile.mkdtemp(), 'state.json')
+
+    def recompute(self, **options):
+        out = io.StringIO()
+        call_command(
+            'recompute_order_totals',
+            workers=1,
+            chunk_size=1,
+            state_file=self.state_file,
+            stdout=out,
+            **options
+        )
+        return out.getvalue()
+
+    def test_recompute_repairs_totals(self):
+        """Test that stale totals and debts are recomputed from items"""
+        self.recompute()
+
+        first, second, delivered = [
+            Order.objects.get(pk=order.pk) for order in self.orders
+        ]
+        self.assertEqual(first.total_price, 100)
+        self.assertEqual(first.remaining_debt, 65)
+        self.assertEqual(second.remaining_debt, 200)
+        self.assertEqual(delivered.total_price, 1)
+        self.assertGreater(first.updated_at, self.orders[0].updated_at)
+        self.assertFalse(os.path.exists(self.state_file))
+
+    def test_dry_run_reports_diffs(self):
+        """Test that a dry run prints differences without writing"""
+        out = self.recompute(dry_run=True, include_delivered=True)
+
+        self.assertIn(f'order {self.orders[0].pk}: total 0 -> 100', out)
+        self.assertIn(f'order {self.orders[2].pk}: total 1 -> 300', out)
+        self.assertEqual(Order.objects.get(pk=self.orders[0].pk).total_price, 0)
+
+    def test_resume_skips_finished_chunks(self):
+        """Test that chunks recorded in the state file are not redone"""
+        with open(self.state_file, 'w') as state_file:
+            json.dump({
+                'chunk_size': 1,
+                'include_delivered': False,
+                'done': [self.orders[0].pk],
+            }, state_file)
+
+        self.recompute(resume=True)
+
+        self.assertEqual(Order.objects.get(pk=self.orders[0].pk).total_price, 0)
+        self.assertEqual(
+            Order.objects.get(pk=self.orders[1].pk).remaining_debt,
+            200
+        )
+
+
+class RecurringOrderTests(TestCase):
+
+    def setUp(self):
+        self.chicken = sample_product()
+        self.milk = sample_product(name='Süt', distribution_unit=2, price=20)
+        self.monday = datetime.date(2021, 5, 3)
+
+    def sample_template(self, phone1, starts_on=None, **kwargs):
+        template = RecurringOrderTemplate.objects.create(
+            customer=sample_customer(phone1),
+            weekday=0,
+            starts_on=starts_on or self.monday,
+            **kwargs
+        )
+        template.items.create(product=self.chicken, quantity=2)
+        template.items.create(product=self.milk, quantity=1)
+        return template
+
+    def generate(self, delivery_date):
+        out = io.StringIO()
+        call_command(
+            'generate_recurring_orders',
+            date=delivery_date.isoformat(),
+            stdout=out,
+            stderr=out
+        )
+        return out.getvalue()
+
+    def test_orders_created_with_items_and_total(self):
+        """Test that due templates become orders with their items"""
+        template = self.sample_template('5330000001', service_fee=10)
+
+        self.generate(self.monday)
+
+        order = Order.objects.get(customer=template.customer)
+        self.assertEqual(order.delivery_date, self.monday)
+        self.assertEqual(order.total_price, 220)
+        self.assertEqual(order.remaining_debt, 230)
+        self.assertEqual(order.nick, '210503MALT0001')
+        self.assertEqual(
+            sorted(order.items.values_list('product__name', 'quantity')),
+            [('Bütün Tavuk', 2), ('Süt', 1)]
+        )
+        self.assertEqual(
+            OrderListEntry.objects.get(order=order).item_summary,
+            'Bütün Tavuk 2 Adet, Süt 1 Litre'
+        )
+
+    def test_generation_is_idempotent(self):
+        """Test that running again for a date creates no duplicates"""
+        self.sample_template('5330000001')
+
+        self.generate(self.monday)
+        self.generate(self.monday)
+
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_only_due_templates_generated(self):
+        """Test that interval, end date and inactive templates are honoured"""
+        weekly = self.sample_template('5330000001')
+        fortnightly = self.sample_template('5330000002', interval_weeks=2)
+        self.sample_template(
+            '5330000003', ends_on=self.monday - datetime.timedelta(days=1)
+        )
+        self.sample_template('5330000004', is_active=False)
+        next_monday = self.monday + datetime.timedelta(days=7)
+
+        self.generate(self.monday + datetime.timedelta(days=1))
+        self.generate(next_monday)
+
+        self.assertEqual(
+            list(Order.objects.values_list('customer', 'delivery_date')),
+            [(weekly.customer.pk, next_monday)]
+        )
+        self.generate(next_monday + datetime.timedelta(days=7))
+        self.assertTrue(
+            Order.objects.filter(customer=fortnightly.customer).exists()
+        )
+
+    def test_out_of_stock_template_skipped(self):
+        """Test that a template is skipped when its stock runs out"""
+        stock = Stock.objects.create(
+            product=self.chicken,
+            delivery_date=self.monday,
+            available=3
+        )
+        first = self.sample_template('5330000001')
+        second = self.sample_template('5330000002')
+
+        out = self.generate(self.monday)
+
+        self.assertIn(f'Skipped template {second.pk}', out)
+        self.assertTrue(Order.objects.filter(customer=first.customer).exists())
+        self.assertFalse(
+            Order.objects.filter(customer=second.customer).exists()
+        )
+        stock.refresh_from_db()
+        self.assertEqual(stock.available, 1)
+        self.assertEqual(StockReservation.objects.get().quantity, 2)
+
+    def test_template_with_taken_nick_skipped(self):
+        """Test that a nick collision only skips the template hitting it"""
+        first = self.sample_template('5330000001')
+        second = self.sample_template('5330000002')
+        Order.objects.create(
+            customer=first.customer,
+            nick='210503MALT0002',
+            delivery_date=self.monday - datetime.timedelta(days=7)
+        )
+
+        with mock.patch(
+            'order.recurring.reserve_order_nicks',
+            return_value=['210503MALT0001', '210503MALT0002']
+        ):
+            out = self.generate(self.monday)
+
+        self.assertIn(f'Skipped template {second.pk}', out)
+        self.assertEqual(
+            Order.objects.get(delivery_date=self.monday).nick,
+            '210503MALT0001'
+        )
+
+    def test_interval_weeks_must_be_positive(self):
+        """Test that a zero week interval is rejected"""
+        template = self.sample_template('5330000001', interval_weeks=0)
+
+        with self.assertRaises(ValidationError):
+            template.full_clean()
+
+    def test_queries_do_not_grow_with_templates(self):
+        """Test that a batch costs the same queries for 1 or 5 templates"""
+        self.sample_template('5330000001')
+        with CaptureQueriesContext(connection) as one:
+            self.generate(self.monday)
+        for index in range(5):
+            self.sample_template(f'533000001{index}')
+        next_monday = self.monday + datetime.timedelta(days=7)
+
+        with CaptureQueriesContext(connection) as many:
+            self.generate(next_monday)
+
+        self.assertEqual(Order.objects.filter(delivery_date=next_monday).count(), 6)
+        self.assertEqual(len(many), len(one))
@@ -0,0 +1,128 @@
+from django.db import transaction
+from django.db.models import F, FloatField, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from core.models import Order
+
+from .models import OrderListEntry
+
+TOLERANCE = 1e-6
+UPDATE_BATCH_SIZE = 1000
+
+
+def chunk_bounds(chunk_size, include_delivered=False):
+    """Split the id space of the orders to repair into [start, end) ranges"""
+    queryset = Order.objects.all()
+    if not include_delivered:
+        queryset = queryset.filter(is_delivered=False)
+    ids = queryset.order_by('pk').values_list('pk', flat=True)
+    first, last = ids.first(), ids.last()
+    if first is None:
+        return []
+    return [
+        (start, start + chunk_size)
+        for start in range(first, last + 1, chunk_size)
+    ]
+
+
+def expected_totals(start, end):
+    """Sum of price * quantity of the live items of each order in range"""
+    return dict(Order.items.through.objects.filter(
+        order_id__gte=start,
+        order_id__lt=end,
+        orderitem__is_deleted=False
+    ).values('order_id').annotate(
+        total=Sum(
+            F('orderitem__price') * F('orderitem__quantity'),
+            output_field=FloatField()
+        )
+    ).order_by().values_list('order_id', 'total'))
+
+
+def item_total():
+    """Subquery of the live item total of the outer order"""
+    return Coalesce(
+        Subquery(Order.items.through.objects.filter(
+            order_id=OuterRef('pk'),
+            orderitem__is_deleted=False
+        ).values('order_id').annotate(
+            total=Sum(
+                F('orderitem__price') * F('orderitem__quantity'),
+                output_field=FloatField()
+            )
+        ).values('total')),
+        0.0,
+        output_field=FloatField()
+    )
+
+
+def repair_orders(order_ids):
+    """Rewrite the totals of orders and their list entries in the database"""
+    now = timezone.now()
+    with transaction.atomic():
+        for start in range(0, len(order_ids), UPDATE_BATCH_SIZE):
+            batch = order_ids[start:start + UPDATE_BATCH_SIZE]
+            Order.objects.filter(pk__in=batch).update(
+                total_price=item_total(),
+                remaining_debt=(
+                    item_total() + F('service_fee') - F('received_money')
+                ),
+                updated_at=now
+            )
+            orders = Order.objects.filter(pk=OuterRef('order'))
+            OrderListEntry.objects.filter(order__in=batch).update(
+                total_price=Subquery(orders.values('total_price')),
+                remaining_debt=Subquery(orders.values('remaining_debt')),
+                updated_at=now
+            )
+
+
+def recompute_chunk(bounds, include_delivered=False, dry_run=False,
+                    max_diffs=0):
+    """
+    Recompute total_price and remaining_debt of the orders in one id range.
+
+    The expected totals come from one aggregate query over the items, and
+    only the orders that differ are rewritten, by set-based UPDATEs that
+    also bump updated_at and patch the order list entries. Like
+    Order.total_price_update, delivered orders are skipped unless
+    `include_delivered` is set. Returns the counts and the first
+    `max_diffs` differences as (id, old total, new total, old debt,
+    new debt).
+    """
+    start, end = bounds
+    totals = expected_totals(start, end)
+    orders = Order.objects.filter(pk__gte=start, pk__lt=end)
+    if not include_delivered:
+        orders = orders.filter(is_delivered=False)
+
+    checked = 0
+    changed = []
+    diffs = []
+    for pk, total_price, remaining_debt, service_fee, received_money in (
+        orders.order_by('pk').values_list(
+            'pk', 'total_price', 'remaining_debt', 'service_fee',
+            'received_money'
+        )
+    ):
+        checked += 1
+        total = totals.get(pk) or 0.0
+        debt = total + service_fee - received_money
+        if (
+            abs(total - total_price) <= TOLERANCE
+            and abs(debt - remaining_debt) <= TOLERANCE
+        ):
+            continue
+        changed.append(pk)
+        if len(diffs) < max_diffs:
+            diffs.append((pk, total_price, total, remaining_debt, debt))
+
+    if changed and not dry_run:
+        repair_orders(changed)
+    return {
+        'start': start,
+        'checked': checked,
+        'changed': len(changed),
+        'diffs': diffs,
+    }
@@ -4,6 +4,8 @@ from rest_framework.routers import DefaultRouter
 from order import views
 
 router = DefaultRouter()
+router.register('orders', views.OrderViewSet)
+router.register('order-items', views.OrderItemViewSet)
 
 
 
@@ -11,6 +13,14 @@ app_name = 'order'
 
 
 urlpatterns = [
+    path(
+        'customers/<int:customer_id>/history/',
+        views.CustomerOrderHistoryView.as_view(),
+        name='customer-history'
+    ),
+    path('events/', views.OrderEventsView.as_view(), name='events'),
+    path('import/', views.ImportOrdersView.as_view(), name='import'),
+    path('pick-list/', views.PickListView.as_view(), name='pick-list'),
     path('', include(router.urls)),
 
     ]
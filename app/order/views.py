@@ -1,5 +1,257 @@
-from django.shortcuts import render
+import asyncio
+import csv
+import io
+from contextlib import contextmanager
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.http import JsonResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils.dateparse import parse_date
+from django.views import View
 from rest_framework import viewsets
 from rest_framework.authentication import TokenAuthentication
-from rest_framework.permissions import IsAdminUser, IsAuthenticated, IsAuthenticatedOrReadOnly
+from rest_framework.exceptions import AuthenticationFailed, ValidationError
+from rest_framework.parsers import MultiPartParser
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.views import APIView
+
+from core.mixins import BatchRetrieveMixin, ConditionalGetMixin
+from core.models import Customer, Order, OrderItem
+from product.inventory import InsufficientStock
+
+from .events import board, delivery_dates
+from .history import customer_order_history, decode_cursor
+from .importer import OrderImporter
+from .models import OrderListEntry
+from .picklist import get_pick_list
+from .renderers import PickListCSVRenderer
+from .serializers import (OrderItemSerializer, OrderListEntrySerializer,
+                          OrderSerializer)
+
+
+class StockReservationMixin:
+    """Save atomically, rejecting writes that run out of stock"""
+
+    def perform_create(self, serializer):
+        with self.reserving_stock():
+            super().perform_create(serializer)
+
+    def perform_update(self, serializer):
+        with self.reserving_stock():
+            super().perform_update(serializer)
+
+    @contextmanager
+    def reserving_stock(self):
+        try:
+            with transaction.atomic():
+                yield
+        except InsufficientStock as error:
+            raise ValidationError({'items': [str(error)]})
+
+
+class OrderItemViewSet(StockReservationMixin, ConditionalGetMixin,
+                       BatchRetrieveMixin, viewsets.ModelViewSet):
+    """Manage order items in the database"""
+    queryset = OrderItem.objects.all()
+    serializer_class = OrderItemSerializer
+    authentication_classes = (TokenAuthentication,)
+    permission_classes = (IsAuthenticated,)
+    query_budget = {'list': 3, 'retrieve': 3}
+
+
+class OrderViewSet(StockReservationMixin, ConditionalGetMixin,
+                   BatchRetrieveMixin, viewsets.ModelViewSet):
+    """Manage orders in the database"""
+    queryset = Order.objects.prefetch_related('items')
+    serializer_class = OrderSerializer
+    authentication_classes = (TokenAuthentication,)
+    permission_classes = (IsAuthenticated,)
+    conditional_fields = ('updated_at', 'items__updated_at')
+    query_budget = {'list': 4, 'retrieve': 4}
+
+    def reads_list_entries(self):
+        """Plain list requests are answered from the flattened read model"""
+        return (
+            self.action == 'list'
+            and 'ids' not in self.request.query_params
+        )
+
+    def get_conditional_fields(self):
+        if self.reads_list_entries():
+            return ('updated_at',)
+        return super().get_conditional_fields()
+
+    def get_serializer_class(self):
+        if self.reads_list_entries():
+            return OrderListEntrySerializer
+        return super().get_serializer_class()
+
+    def get_queryset(self):
+        if self.reads_list_entries():
+            queryset = OrderListEntry.objects.all()
+        else:
+            queryset = self.queryset
+        delivery_date = self.request.query_params.get('delivery_date', None)
+        if delivery_date is not None:
+            try:
+                delivery_date = parse_date(delivery_date)
+            except ValueError:
+                raise ValidationError({'delivery_date': 'Geçersiz tarih'})
+            if delivery_date is None:
+                raise ValidationError({
+                    'delivery_date': 'Tarih YYYY-MM-DD formatında olmalı'
+                })
+            queryset = queryset.filter(delivery_date=delivery_date)
+        return queryset
+
+
+class PickListView(APIView):
+    """Total quantity of each product to prepare for a delivery date"""
+    authentication_classes = (TokenAuthentication,)
+    permission_classes = (IsAuthenticated,)
+    renderer_classes = (
+        *api_settings.DEFAULT_RENDERER_CLASSES,
+        PickListCSVRenderer
+    )
+    query_budget = 3
+
+    def get(self, request, *args, **kwargs):
+        try:
+            delivery_date = parse_date(request.query_params.get('date', ''))
+        except ValueError:
+            raise ValidationError({'date': 'Geçersiz tarih'})
+        if delivery_date is None:
+            raise ValidationError({'date': 'Tarih YYYY-MM-DD formatında olmalı'})
+        response = Response(get_pick_list(delivery_date))
+        if request.accepted_renderer.format == 'csv':
+            response['Content-Disposition'] = (
+                f'attachment; filename="pick-list-{delivery_date}.csv"'
+            )
+        return response
+
+
+class ImportOrdersView(APIView):
+    """Import Instagram orders from an uploaded CSV file"""
+    authentication_classes = (TokenAuthentication,)
+    permission_classes = (IsAdminUser,)
+    parser_classes = (MultiPartParser,)
+
+    def post(self, request, *args, **kwargs):
+        upload = request.FILES.get('file')
+        if upload is None:
+            raise ValidationError({'file': 'CSV dosyası gerekli'})
+        stream = io.TextIOWrapper(upload.file, encoding='utf-8-sig')
+        importer = OrderImporter().run(csv.DictReader(stream))
+        return Response({
+            'orders': importer.order_count,
+            'customers': importer.customer_count,
+            'errors': [
+                {'line': error['line'], 'error': error['error']}
+                for error in importer.errors
+            ],
+        })
+
+
+class CustomerOrderHistoryView(APIView):
+    """Keyset paginated order history of a customer, archive included"""
+    authentication_classes = (TokenAuthentication,)
+    permission_classes = (IsAdminUser,)
+    max_limit = 100
+    query_budget = 6
+
+    def get(self, request, customer_id, *args, **kwargs):
+        get_object_or_404(Customer, pk=customer_id)
+        cursor = request.query_params.get('cursor', None)
+        if cursor is not None:
+            try:
+                cursor = decode_cursor(cursor)
+            except ValueError:
+                raise ValidationError({'cursor': 'Geçersiz cursor'})
+        try:
+            limit = int(request.query_params.get('limit', 20))
+        except ValueError:
+            raise ValidationError({'limit': 'Geçersiz limit'})
+        limit = min(max(limit, 1), self.max_limit)
+        return Response(customer_order_history(customer_id, cursor, limit))
+
+
+class OrderEventsView(View):
+    """
+    Server-Sent Events stream of order and item changes.
+
+    Served by the ASGI application only. EventSource cannot send headers,
+    so the token may also be given as `?token=`; `?delivery_date=` limits
+    the stream to one day. Reconnecting clients resume from Last-Event-ID.
+    """
+
+    async def get(self, request, *args, **kwargs):
+        if not hasattr(request, 'scope'):
+            return JsonResponse(
+                {'detail': 'Bu adres ASGI sunucusu gerektirir'},
+                status=501
+            )
+        key = request.GET.get('token', '')
+        keyword, _, header_key = request.headers.get(
+            'Authorization', ''
+        ).partition(' ')
+        if keyword == 'Token':
+            key = header_key.strip()
+        if not key:
+            return JsonResponse(
+                {'detail': 'Kimlik bilgileri verilmedi'},
+                status=401
+            )
+        try:
+            await sync_to_async(
+                TokenAuthentication().authenticate_credentials
+            )(key)
+        except AuthenticationFailed as error:
+            return JsonResponse({'detail': str(error.detail)}, status=401)
+
+        predicate = None
+        delivery_date = request.GET.get('delivery_date', None)
+        if delivery_date is not None:
+            try:
+                parsed = parse_date(delivery_date)
+            except ValueError:
+                return JsonResponse(
+                    {'delivery_date': 'Geçersiz tarih'},
+                    status=400
+                )
+            if parsed is None:
+                return JsonResponse(
+                    {'delivery_date': 'Tarih YYYY-MM-DD formatında olmalı'},
+                    status=400
+                )
+            delivery_date = parsed.isoformat()
+            predicate = lambda event: delivery_date in delivery_dates(event)
+
+        response = StreamingHttpResponse(
+            self.stream(request.headers.get('Last-Event-ID'), predicate),
+            content_type='text/event-stream'
+        )
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'
+        return response
 
+    async def stream(self, last_event_id, predicate):
+        subscription = board.subscribe(last_event_id, predicate)
+        try:
+            yield 'retry: 3000\n\n'
+            while True:
+                try:
+                    event = await subscription.get(
+                        settings.ORDER_EVENTS_HEARTBEAT
+                    )
+                except asyncio.TimeoutError:
+                    yield ': heartbeat\n\n'
+                    continue
+                if event is None:
+                    return
+                yield event.encode()
+        finally:
+            board.unsubscribe(subscription)
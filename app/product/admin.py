@@ -1,3 +1,13 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import Stock
+
+
+class StockAdmin(admin.ModelAdmin):
+    list_display = ['product', 'delivery_date', 'available']
+    list_select_related = ['product']
+    list_filter = ['delivery_date']
+    autocomplete_fields = ['product']
+
+
+admin.site.register(Stock, StockAdmin)
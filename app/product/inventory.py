@@ -0,0 +1,151 @@
+from django.db import transaction
+from django.db.models import F
+
+from .models import Stock, StockReservation
+
+
+class InsufficientStock(Exception):
+
+    def __init__(self, item, delivery_date):
+        self.item = item
+        self.delivery_date = delivery_date
+        super().__init__(
+            f'Yetersiz stok: {item.product} {delivery_date} '
+            f'için {item.quantity} istendi'
+        )
+
+
+def _take(stock_id, quantity):
+    """Decrement stock only if enough is available, in one UPDATE"""
+    return Stock.objects.filter(
+        pk=stock_id,
+        available__gte=quantity
+    ).update(available=F('available') - quantity) == 1
+
+
+def _give(stock_id, quantity):
+    Stock.objects.filter(pk=stock_id).update(
+        available=F('available') + quantity
+    )
+
+
+def reserve(item, delivery_date):
+    """
+    Hold stock for an order item on a delivery date, adjusting an existing
+    reservation by the difference. Products without a Stock row for the
+    date are not tracked. The reservation is read locked inside the
+    transaction, so concurrent saves of the item adjust it one at a time.
+    Raises InsufficientStock when the conditional decrement finds too
+    little stock.
+    """
+    if item.is_deleted:
+        release(item)
+        return
+    stock_id = Stock.objects.filter(
+        product_id=item.product_id,
+        delivery_date=delivery_date
+    ).values_list('pk', flat=True).first()
+
+    with transaction.atomic():
+        reservation = StockReservation.objects.select_for_update().filter(
+            item=item
+        ).first()
+        if reservation is not None and reservation.stock_id != stock_id:
+            _drop(reservation)
+            reservation = None
+        if stock_id is None:
+            return
+
+        held = reservation.quantity if reservation is not None else 0
+        delta = item.quantity - held
+        if delta > 0 and not _take(stock_id, delta):
+            raise InsufficientStock(item, delivery_date)
+        if delta < 0:
+            _give(stock_id, -delta)
+        if reservation is None:
+            StockReservation.objects.create(
+                item=item,
+                stock_id=stock_id,
+                quantity=item.quantity
+            )
+        elif delta:
+            StockReservation.objects.filter(pk=reservation.pk).update(
+                quantity=item.quantity
+            )
+
+
+def _drop(reservation):
+    if StockReservation.objects.filter(pk=reservation.pk).delete()[0]:
+        _give(reservation.stock_id, reservation.quantity)
+
+
+def release(item):
+    """Return the stock held by an order item"""
+    with transaction.atomic():
+        reservation = StockReservation.objects.select_for_update().filter(
+            item=item
+        ).first()
+        if reservation is not None:
+            _drop(reservation)
+
+
+def stock_ids(product_ids, delivery_date):
+    """Map the tracked products among product_ids to their stock rows"""
+    return dict(Stock.objects.filter(
+        product__in=product_ids,
+        delivery_date=delivery_date
+    ).values_list('product_id', 'pk'))
+
+
+def take_many(items, stock_ids, delivery_date):
+    """
+    Take stock for several not yet reserved items, all or nothing, and
+    return (item, stock row) pairs. Used by bulk writers that create the
+    StockReservation rows themselves; the items may be unsaved.
+    """
+    taken = []
+    for item in items:
+        stock_id = stock_ids.get(item.product_id)
+        if stock_id is None or not item.quantity:
+            continue
+        if not _take(stock_id, item.quantity):
+            for taken_item, taken_stock_id in taken:
+                _give(taken_stock_id, taken_item.quantity)
+            raise InsufficientStock(item, delivery_date)
+        taken.append((item, stock_id))
+    return taken
+
+
+def consume(order):
+    """Drop the reservations of a delivered order, keeping the stock used"""
+    StockReservation.objects.filter(item__order_item=order).delete()
+
+
+def unconsume(order):
+    """
+    Hold the stock of an order marked undelivered again. Delivery kept the
+    stock used, so the reservations are recreated without taking more.
+    """
+    items = order.items.filter(
+        is_deleted=False,
+        stock_reservation__isnull=True
+    )
+    tracked = stock_ids(
+        {item.product_id for item in items},
+        order.delivery_date
+    )
+    StockReservation.objects.bulk_create([
+        StockReservation(
+            item=item,
+            stock_id=tracked[item.product_id],
+            quantity=item.quantity
+        )
+        for item in items
+        if item.product_id in tracked and item.quantity
+    ])
+
+
+def restock(stock, quantity):
+    """Add quantity to a stock row without overwriting reservations"""
+    _give(stock.pk, quantity)
+    stock.refresh_from_db(fields=['available'])
@@ -0,0 +1,48 @@
+from django.db import models
+
+from core.models import OrderItem, Product
+
+
+class Stock(models.Model):
+    """Quantity of a product still available for a delivery date"""
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.CASCADE,
+        related_name='stocks',
+        verbose_name="Ürün"
+        )
+    delivery_date = models.DateField(verbose_name="Teslimat Tarihi")
+    available = models.FloatField(verbose_name="Kalan Miktar")
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.product.name} {self.delivery_date}: {self.available}"
+
+    class Meta:
+        ordering = ['delivery_date', 'product']
+        unique_together = ['product', 'delivery_date']
+        constraints = [
+            models.CheckConstraint(
+                check=models.Q(available__gte=0),
+                name='stock_available_not_negative'
+            ),
+        ]
+
+
+class StockReservation(models.Model):
+    """Stock held by an order item"""
+    item = models.OneToOneField(
+        OrderItem,
+        on_delete=models.CASCADE,
+        related_name='stock_reservation'
+        )
+    stock = models.ForeignKey(
+        Stock,
+        on_delete=models.CASCADE,
+        related_name='reservations'
+        )
+    quantity = models.FloatField()
+
+    def __str__(self):
+        return f"{self.item_id} -> {self.stock_id}: {self.quantity}"
@@ -3,6 +3,8 @@ from rest_framework import serializers
 
 from core.models import Category, Product
 
+from .models import Stock
+
 
 class CategorySerializer(serializers.ModelSerializer):
     """Serialize a category"""
@@ -19,7 +21,7 @@ class ProductSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Product
-        fields = '__all__'
+        exclude = ['search_name']
 
     def get_distribution_unit(self, obj):
         return obj.get_distribution_unit_display()
@@ -29,4 +31,24 @@ class ProductCreateSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Product
-        fields = '__all__'
+        exclude = ['search_name']
+
+
+class StockSerializer(serializers.ModelSerializer):
+    """Serialize the available stock of a product for a delivery date"""
+
+    class Meta:
+        model = Stock
+        fields = ['id', 'product', 'delivery_date', 'available', 'updated_at']
+        read_only_fields = ['updated_at']
+
+
+class StockUpdateSerializer(StockSerializer):
+    """Serialize a stock row whose available quantity only restock changes"""
+
+    class Meta(StockSerializer.Meta):
+        read_only_fields = ['available', 'updated_at']
+
+
+class RestockSerializer(serializers.Serializer):
+    quantity = serializers.FloatField(min_value=0)
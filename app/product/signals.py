@@ -0,0 +1,78 @@
+from django.db.models.signals import (m2m_changed, post_init, post_save,
+                                      pre_delete)
+from django.dispatch import receiver
+
+from core.models import Order, OrderItem
+
+from . import inventory
+
+
+@receiver(post_init, sender=Order)
+def remember_stock_date(sender, instance, *args, **kwargs):
+    instance._stock_delivery_date = instance.__dict__.get('delivery_date')
+    instance._stock_delivered = instance.__dict__.get('is_delivered')
+
+
+@receiver(post_save, sender=Order)
+def move_reservations(sender, instance, created, *args, **kwargs):
+    previous = getattr(instance, '_stock_delivery_date', None)
+    was_delivered = getattr(instance, '_stock_delivered', None)
+    instance._stock_delivery_date = instance.delivery_date
+    instance._stock_delivered = instance.is_delivered
+    if instance.is_delivered:
+        inventory.consume(instance)
+        return
+    if was_delivered:
+        inventory.unconsume(instance)
+        return
+    if created or previous is None or previous == instance.delivery_date:
+        return
+    for item in instance.items.all():
+        inventory.reserve(item, instance.delivery_date)
+
+
+@receiver(pre_delete, sender=Order)
+def release_order_reservations(sender, instance, *args, **kwargs):
+    if instance.is_delivered:
+        return
+    for item in instance.items.all():
+        inventory.release(item)
+
+
+@receiver(m2m_changed, sender=Order.items.through)
+def reserve_order_items(sender, instance, action, reverse, pk_set,
+                        *args, **kwargs):
+    if not reverse:
+        if action == 'post_add':
+            for item in OrderItem.objects.filter(pk__in=pk_set):
+                inventory.reserve(item, instance.delivery_date)
+        elif action == 'pre_remove':
+            for item in OrderItem.objects.filter(pk__in=pk_set):
+                inventory.release(item)
+        elif action == 'pre_clear':
+            for item in instance.items.all():
+                inventory.release(item)
+    elif action == 'post_add':
+        for order in Order.objects.filter(pk__in=pk_set):
+            inventory.reserve(instance, order.delivery_date)
+    elif action in ('pre_remove', 'pre_clear'):
+        inventory.release(instance)
+
+
+@receiver(post_save, sender=OrderItem)
+def reserve_order_item(sender, instance, created, *args, **kwargs):
+    if created:
+        return
+    if instance.is_deleted:
+        inventory.release(instance)
+        return
+    delivery_date = Order.objects.filter(items=instance).values_list(
+        'delivery_date', flat=True
+    ).first()
+    if delivery_date is not None:
+        inventory.reserve(instance, delivery_date)
+
+
+@receiver(pre_delete, sender=OrderItem)
+def release_order_item(sender, instance, *args, **kwargs):
+    inventory.release(instance)
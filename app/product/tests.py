@@ -1,3 +1,276 @@
-from django.test import TestCase
+import datetime
+import threading
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core.models import Customer, Order, OrderItem
+from core.tests.test_models import sample_address, sample_product, sample_user
+from product.inventory import InsufficientStock, reserve
+from product.models import Stock, StockReservation
+
+PRODUCTS_URL = reverse('product:product-list')
+ORDERS_URL = reverse('order:order-list')
+DELIVERY_DATE = datetime.date(2021, 5, 3)
+
+
+class ConditionalProductApiTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email='test@emre.com',
+            password='123456'
+        )
+        self.client.force_authenticate(self.user)
+
+    def test_unchanged_list_returns_not_modified(self):
+        """Test that a matching ETag skips serialization with a 304"""
+        sample_product()
+        res = self.client.get(PRODUCTS_URL)
+        self.assertEqual(res.status_code, 200)
+        etag = res['ETag']
+
+        with self.assertNumQueries(1):
+            res = self.client.get(PRODUCTS_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, 304)
+
+    def test_changed_list_returns_new_etag(self):
+        """Test that updating a product invalidates the ETag"""
+        product = sample_product()
+        etag = self.client.get(PRODUCTS_URL)['ETag']
+        product.price = 120
+        product.save()
+
+        res = self.client.get(PRODUCTS_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, 200)
+        self.assertNotEqual(res['ETag'], etag)
+
+    def test_deleted_product_changes_etag(self):
+        """Test that removing a row changes the validator"""
+        sample_product()
+        other = sample_product(name='Kanat')
+        etag = self.client.get(PRODUCTS_URL)['ETag']
+        other.delete()
+
+        res = self.client.get(PRODUCTS_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, 200)
+
+
+class StockReservationTests(TestCase):
+
+    def setUp(self):
+        self.product = sample_product()
+        self.stock = Stock.objects.create(
+            product=self.product,
+            delivery_date=DELIVERY_DATE,
+            available=10
+        )
+        self.order = Order.objects.create(
+            customer=Customer.objects.create(
+                user=sample_user(),
+                address=sample_address(),
+                phone1='5331234578'
+            ),
+            delivery_date=DELIVERY_DATE
+        )
+
+    def add_item(self, quantity):
+        item = OrderItem.objects.create(product=self.product, quantity=quantity)
+        self.order.items.add(item)
+        return item
+
+    def available(self):
+        self.stock.refresh_from_db()
+        return self.stock.available
+
+    def test_adding_item_reserves_stock(self):
+        """Test that adding an item to an order decrements the stock"""
+        self.add_item(4)
+
+        self.assertEqual(self.available(), 6)
+
+    def test_editing_item_adjusts_reservation(self):
+        """Test that changing the quantity only moves the difference"""
+        item = self.add_item(4)
+        item.quantity = 7
+        item.save()
+        self.assertEqual(self.available(), 3)
+
+        item.quantity = 1
+        item.save()
+        self.assertEqual(self.available(), 9)
+
+    def test_soft_deleting_item_releases_stock(self):
+        """Test that soft-deleting or removing items returns the stock"""
+        item = self.add_item(4)
+        other = self.add_item(2)
+        item.is_deleted = True
+        item.save()
+        self.order.items.remove(other)
+
+        self.assertEqual(self.available(), 10)
+
+    def test_insufficient_stock_rejected(self):
+        """Test that reserving more than available fails"""
+        with self.assertRaises(InsufficientStock):
+            with transaction.atomic():
+                self.add_item(11)
+
+        self.assertEqual(self.available(), 10)
+
+    def test_untracked_product_is_not_limited(self):
+        """Test that products without a stock row can always be ordered"""
+        self.stock.delete()
+
+        self.add_item(100)
+
+        self.assertFalse(StockReservation.objects.exists())
+
+    def test_undelivering_order_reserves_stock_again(self):
+        """Test that an undelivered order holds its stock again"""
+        self.add_item(4)
+        self.order.is_delivered = True
+        self.order.save()
+        self.assertFalse(StockReservation.objects.exists())
+
+        self.order.is_delivered = False
+        self.order.save()
+
+        self.assertEqual(StockReservation.objects.get().quantity, 4)
+        self.assertEqual(self.available(), 6)
+
+    def test_stock_api_cannot_overwrite_available(self):
+        """Test that only restock changes the available quantity"""
+        client = APIClient()
+        client.force_authenticate(get_user_model().objects.create_superuser(
+            email='admin@emre.com',
+            password='123456'
+        ))
+        self.add_item(4)
+        url = reverse('product:stock-detail', args=[self.stock.pk])
+
+        res = client.patch(url, {'available': 50})
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(self.available(), 6)
+
+        res = client.post(
+            reverse('product:stock-restock', args=[self.stock.pk]),
+            {'quantity': 5}
+        )
+
+        self.assertEqual(res.data['available'], 11)
+
+    def test_stock_api_rejects_invalid_date(self):
+        """Test that a malformed date filter returns 400"""
+        client = APIClient()
+        client.force_authenticate(get_user_model().objects.create_superuser(
+            email='admin@emre.com',
+            password='123456'
+        ))
+
+        res = client.get(reverse('product:stock-list'), {'delivery_date': 'abc'})
+
+        self.assertEqual(res.status_code, 400)
+
+    def test_order_api_rejects_oversold_items(self):
+        """Test that creating an order beyond the stock returns 400"""
+        client = APIClient()
+        client.force_authenticate(self.order.customer.user)
+        item = OrderItem.objects.create(product=self.product, quantity=11)
+
+        res = client.post(ORDERS_URL, {
+            'customer': self.order.customer.pk,
+            'delivery_date': DELIVERY_DATE,
+            'items': [item.pk],
+        })
+
+        self.assertEqual(res.status_code, 400)
+        self.assertEqual(Order.objects.count(), 1)
+        self.assertEqual(self.available(), 10)
+
+
+class ConcurrentStockReservationTests(TransactionTestCase):
+
+    def test_parallel_reservations_never_oversell(self):
+        """Test that parallel reservations never take stock below zero"""
+        product = sample_product()
+        stock = Stock.objects.create(
+            product=product,
+            delivery_date=DELIVERY_DATE,
+            available=5
+        )
+        items = [
+            OrderItem.objects.create(product=product, quantity=1)
+            for _ in range(20)
+        ]
+        barrier = threading.Barrier(len(items))
+        reserved = []
+        errors = []
+
+        def reserve_item(item):
+            try:
+                barrier.wait()
+                reserve(item, DELIVERY_DATE)
+                reserved.append(item.pk)
+            except InsufficientStock:
+                pass
+            except Exception as error:
+                errors.append(error)
+            finally:
+                connection.close()
+
+        threads = [
+            threading.Thread(target=reserve_item, args=(item,))
+            for item in items
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        stock.refresh_from_db()
+        self.assertGreaterEqual(stock.available, 0)
+        self.assertGreater(len(reserved), 0)
+        self.assertLessEqual(len(reserved), 5)
+        self.assertEqual(stock.available + len(reserved), 5)
+        self.assertEqual(
+            StockReservation.objects.count(),
+            len(reserved)
+        )
+
+
+class ProductBatchApiTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_user('test@emre.com', '123456')
+        )
+
+    def test_batch_retrieve_products(self):
+        """Test fetching a cart of products with one query"""
+        products = [sample_product(name=f'Ürün {index}') for index in range(3)]
+        ids = [products[2].id, products[0].id]
+
+        etag = self.client.get(
+            PRODUCTS_URL,
+            {'ids': ','.join(map(str, ids))}
+        )['ETag']
+        with self.assertNumQueries(2):
+            res = self.client.get(
+                PRODUCTS_URL,
+                {'ids': ','.join(map(str, ids))}
+            )
+
+        self.assertEqual(
+            [product['id'] for product in res.data['results']],
+            ids
+        )
+        self.assertEqual(res.data['results'][0]['category']['name'], 'Tavuk')
+        self.assertEqual(res['ETag'], etag)
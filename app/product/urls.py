@@ -6,6 +6,7 @@ from product import views
 router = DefaultRouter()
 router.register("categories", views.CategoryViewSet)
 router.register('products', views.ProductViewSet)
+router.register('stocks', views.StockViewSet)
 
 
 
@@ -1,15 +1,25 @@
 from django.shortcuts import render
+from django.utils.dateparse import parse_date
 from rest_framework import viewsets
 from rest_framework.authentication import TokenAuthentication
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework.response import Response
 
+from core.mixins import (BatchRetrieveMixin, ConditionalGetMixin,
+                         NameSearchMixin)
 from core.models import Category, Product
 
-from .serializers import CategorySerializer, ProductSerializer, ProductCreateSerializer
+from .inventory import restock
+from .models import Stock
+from .serializers import (CategorySerializer, ProductCreateSerializer,
+                          ProductSerializer, RestockSerializer,
+                          StockSerializer, StockUpdateSerializer)
 
 
 # Create your views here.
-class CategoryViewSet(viewsets.ModelViewSet):
+class CategoryViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """
     A simple ViewSet for viewing and editing categories.
     """
@@ -17,14 +27,18 @@ class CategoryViewSet(viewsets.ModelViewSet):
     serializer_class = CategorySerializer
     authentication_classes = (TokenAuthentication,)
     permission_classes = (IsAdminUser,)
+    query_budget = {'list': 3, 'retrieve': 3}
 
 
-class ProductViewSet(viewsets.ModelViewSet):
+class ProductViewSet(NameSearchMixin, ConditionalGetMixin,
+                     BatchRetrieveMixin, viewsets.ModelViewSet):
     """Manage products in the  database"""
-    queryset = Product.objects.all()
+    queryset = Product.objects.select_related('category')
     serializer_class = ProductSerializer
     authentication_classes = (TokenAuthentication,)
     permission_classes = (IsAuthenticated,)
+    conditional_fields = ('updated_at', 'category__updated_at')
+    query_budget = {'list': 3, 'retrieve': 3}
 
     def get_serializer_class(self):
         if self.action == 'create':
@@ -36,4 +50,45 @@ class ProductViewSet(viewsets.ModelViewSet):
         name = self.request.query_params.get('category', None)
         if name is not None:
             queryset = queryset.filter(category__name=name)
-        return queryset
\ No newline at end of file
+        return queryset
+
+
+class StockViewSet(viewsets.ModelViewSet):
+    """Manage the available stock of products per delivery date"""
+    queryset = Stock.objects.all()
+    serializer_class = StockSerializer
+    authentication_classes = (TokenAuthentication,)
+    permission_classes = (IsAdminUser,)
+    query_budget = {'list': 2, 'retrieve': 2}
+
+    def get_serializer_class(self):
+        if self.action in ('update', 'partial_update'):
+            return StockUpdateSerializer
+        return super().get_serializer_class()
+
+    def get_queryset(self):
+        queryset = self.queryset
+        product = self.request.query_params.get('product', None)
+        delivery_date = self.request.query_params.get('delivery_date', None)
+        if product is not None:
+            queryset = queryset.filter(product__pk=product)
+        if delivery_date is not None:
+            try:
+                delivery_date = parse_date(delivery_date)
+            except ValueError:
+                raise ValidationError({'delivery_date': 'Geçersiz tarih'})
+            if delivery_date is None:
+                raise ValidationError({
+                    'delivery_date': 'Tarih YYYY-MM-DD formatında olmalı'
+                })
+            queryset = queryset.filter(delivery_date=delivery_date)
+        return queryset
+
+    @action(detail=True, methods=['post'])
+    def restock(self, request, pk=None):
+        """Add to the available quantity without overwriting reservations"""
+        stock = self.get_object()
+        serializer = RestockSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        restock(stock, serializer.validated_data['quantity'])
+        return Response(self.get_serializer(stock).data)
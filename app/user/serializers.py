@@ -57,19 +57,19 @@ class AuthTokenSerializer(serializers.Serializer):
 class CitySerializer(serializers.ModelSerializer):
     class Meta:
         model = City
-        fields = '__all__'
+        exclude = ['search_name']
 
 
 class DistrictSerializer(serializers.ModelSerializer):
     class Meta:
         model = District
-        fields = '__all__'
+        exclude = ['search_name']
 
 
 class NeighborhoodSerializer(serializers.ModelSerializer):
     class Meta:
         model = Neighborhood
-        fields = '__all__'
+        exclude = ['search_name']
 
 
 class AddressSerializer(serializers.ModelSerializer):
@@ -1,3 +1,102 @@
+from django.contrib.auth import get_user_model
 from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from core.models import Address, City, District, Neighborhood
+
+NEIGHBORHOODS_URL = reverse('neighborhood-list')
+ADDRESSES_URL = reverse('address-list')
+
+
+class NeighborhoodSearchApiTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_user('test@emre.com', '123456')
+        )
+        city = City.objects.create(name='İstanbul')
+        district = District.objects.create(city=city, name='Maltepe')
+        for name in ['Aydınevler', 'Altayçeşme', 'İdealtepe', 'Küçükyalı']:
+            Neighborhood.objects.create(district=district, name=name)
+
+    def names(self, params):
+        res = self.client.get(NEIGHBORHOODS_URL, params)
+        self.assertEqual(res.status_code, 200)
+        return [neighborhood['name'] for neighborhood in res.data]
+
+    def test_prefix_search_ignores_diacritics(self):
+        """Test prefix search matches with or without Turkish letters"""
+        self.assertEqual(self.names({'prefix': 'AYDIN'}), ['Aydınevler'])
+        self.assertEqual(self.names({'prefix': 'ide'}), ['İdealtepe'])
+        self.assertEqual(
+            self.names({'prefix': 'a'}),
+            ['Altayçeşme', 'Aydınevler']
+        )
+
+    def test_contains_search(self):
+        """Test searching anywhere in the name"""
+        self.assertEqual(self.names({'search': 'çe'}), ['Altayçeşme'])
+        self.assertEqual(self.names({'search': 'YALI'}), ['Küçükyalı'])
+
+    def test_search_name_not_serialized(self):
+        """Test that the internal search column is not in the response"""
+        res = self.client.get(NEIGHBORHOODS_URL)
+
+        self.assertNotIn('search_name', res.data[0])
+
+
+class AddressBatchApiTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_user('test@emre.com', '123456')
+        )
+        city = City.objects.create(name='İstanbul')
+        district = District.objects.create(city=city, name='Maltepe')
+        neighborhood = Neighborhood.objects.create(
+            district=district,
+            name='Aydınevler'
+        )
+        self.addresses = [
+            Address.objects.create(
+                city=city,
+                district=district,
+                neighborhood=neighborhood,
+                extra_info=f'Poyraz sokak No {index}'
+            )
+            for index in range(3)
+        ]
+
+    def test_batch_retrieve_keeps_order_and_reports_missing(self):
+        """Test fetching addresses by ids in one query"""
+        first, second, third = [address.id for address in self.addresses]
+
+        with self.assertNumQueries(1):
+            res = self.client.get(
+                ADDRESSES_URL,
+                {'ids': f'{third},999,{first}'}
+            )
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(
+            [address['id'] for address in res.data['results']],
+            [third, first]
+        )
+        self.assertEqual(res.data['results'][0]['district'], 'Maltepe')
+        self.assertEqual(res.data['missing'], [999])
+
+    def test_batch_size_is_limited(self):
+        """Test that too many or malformed ids are rejected"""
+        too_many = ','.join(str(index) for index in range(51))
+
+        self.assertEqual(
+            self.client.get(ADDRESSES_URL, {'ids': too_many}).status_code,
+            400
+        )
+        self.assertEqual(
+            self.client.get(ADDRESSES_URL, {'ids': 'a,b'}).status_code,
+            400
+        )
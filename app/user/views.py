@@ -4,6 +4,7 @@ from rest_framework.authtoken.views import ObtainAuthToken
 from rest_framework.permissions import IsAuthenticatedOrReadOnly
 from rest_framework.settings import api_settings
 
+from core.mixins import BatchRetrieveMixin, NameSearchMixin
 from core.models import Address, City, District, Neighborhood
 
 from .serializers import (AddressSerializer, AuthTokenSerializer,
@@ -33,18 +34,20 @@ class ManageUserView(generics.RetrieveUpdateAPIView):
         return self.request.user
 
 
-class CityViewSet(viewsets.ModelViewSet):
+class CityViewSet(NameSearchMixin, viewsets.ModelViewSet):
     queryset = City.objects.all()
     authentication_classes = (TokenAuthentication,)
     serializer_class = CitySerializer
     permission_classes = (IsAuthenticatedOrReadOnly,)
+    query_budget = {'list': 2, 'retrieve': 2}
 
 
-class DistrictViewSet(viewsets.ModelViewSet):
+class DistrictViewSet(NameSearchMixin, viewsets.ModelViewSet):
     queryset = District.objects.all()
     authentication_classes = (TokenAuthentication,)
     serializer_class = DistrictSerializer
     permission_classes = (IsAuthenticatedOrReadOnly,)
+    query_budget = {'list': 2, 'retrieve': 2}
 
     def get_queryset(self):
         queryset = self.queryset
@@ -55,11 +58,12 @@ class DistrictViewSet(viewsets.ModelViewSet):
         return queryset
 
 
-class NeighborhoodViewSet(viewsets.ModelViewSet):
+class NeighborhoodViewSet(NameSearchMixin, viewsets.ModelViewSet):
     queryset = Neighborhood.objects.all()
     authentication_classes = (TokenAuthentication,)
     serializer_class = NeighborhoodSerializer
     permission_classes = (IsAuthenticatedOrReadOnly,)
+    query_budget = {'list': 2, 'retrieve': 2}
 
     def get_queryset(self):
         queryset = self.queryset
@@ -69,8 +73,11 @@ class NeighborhoodViewSet(viewsets.ModelViewSet):
         return queryset
 
 
-class AddressViewSet(viewsets.ModelViewSet):
-    queryset = Address.objects.all()
+class AddressViewSet(BatchRetrieveMixin, viewsets.ModelViewSet):
+    queryset = Address.objects.select_related(
+        'city', 'district', 'neighborhood'
+    )
     authentication_classes = (TokenAuthentication,)
     serializer_class = AddressSerializer
     permission_classes = (IsAuthenticatedOrReadOnly,)
+    query_budget = {'list': 2, 'retrieve': 2}